@@ -1,12 +1,14 @@
 from fastapi import APIRouter, Header, HTTPException
-import os, configparser, csv
-from pathlib import Path
+import os
 from typing import Optional, Dict, Any
-from ..services.config_loader import load_settings, save_base
+from ..services.config_loader import (STORE, check_length_range, load_settings, save_base,
+                                      invalidate_settings, migrate_config)
+from ..services.quote_cache import QUOTE_CACHE
+from ..services.history_log import HISTORY
+from ..services.money import check_rounding
 from functools import lru_cache
 from pydantic import BaseModel
 
-DATA_DIR = Path(__file__).resolve().parents[1] / "data"
 ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")  # встановиш змінну середовища
 
 router = APIRouter(prefix="/api/admin", tags=["admin"])
@@ -21,10 +23,28 @@ def check_token(x_admin_token: Optional[str] = Header(None, alias="X-Admin-Token
 @router.post("/reload")
 def reload_config(x_admin_token: Optional[str] = Header(None)):
     check_token(x_admin_token)
-    # скидаємо кеш лоадера
-    load_settings.cache_clear()  # type: ignore[attr-defined]
+    # скидаємо кеш лоадера в усіх воркерах (спільний лічильник поколінь)
+    invalidate_settings()
     return {"ok": True}
 
+@router.post("/config/migrate")
+def migrate_config_route(x_admin_token: Optional[str] = Header(None)):
+    """Дописати дефолти і переписати legacy item.N у джерелі (разова дія)."""
+    check_token(x_admin_token)
+    return {"ok": True, "changed": migrate_config()}
+
+@router.get("/cache")
+def quote_cache_stats(x_admin_token: Optional[str] = Header(None)):
+    """Лічильники кешу розрахунків: hits/misses/evictions/expirations."""
+    check_token(x_admin_token)
+    return QUOTE_CACHE.stats()
+
+@router.get("/history/stats")
+def history_stats(x_admin_token: Optional[str] = Header(None)):
+    """Стан write-behind журналу: черга, записані/відкинуті/невдалі записи."""
+    check_token(x_admin_token)
+    return HISTORY.stats()
+
 @router.put("/variables")
 def update_variables(
     payload: Dict[str, Any],
@@ -36,22 +56,18 @@ def update_variables(
       "min_height": 150, "extra_price": 22, "rounding": "ceil10" }
     """
     check_token(x_admin_token)
-    ini_path = DATA_DIR / "config.ini"
-    cfg = configparser.ConfigParser()
-    cfg.read(ini_path, encoding="utf-8")
-    if "variables" not in cfg:
-        cfg["variables"] = {}
 
     # дозволені ключі
     allowed = {"min_length","max_length","min_width","min_height","extra_price","rounding"}
+    values: Dict[str, str] = {}
     for k,v in payload.items():
         if k not in allowed:
             raise HTTPException(400, f"Unknown key: {k}")
         if k == "rounding":
-            vv = str(v).strip().lower()
-            if vv not in {"nearest10","ceil10"}:
-                raise HTTPException(400, "rounding must be nearest10|ceil10")
-            cfg["variables"][k] = vv
+            try:
+                values[k] = check_rounding(v)
+            except ValueError as e:
+                raise HTTPException(400, str(e))
         else:
             # цілі значення для *_length/width/height, float для extra_price
             try:
@@ -61,15 +77,22 @@ def update_variables(
                     int(v)
             except Exception:
                 raise HTTPException(400, f"Invalid value for {k}")
-            cfg["variables"][k] = str(v)
-
-    # атомічний запис
-    tmp = ini_path.with_suffix(".ini.tmp")
-    with open(tmp, "w", encoding="utf-8") as f:
-        cfg.write(f)
-    tmp.replace(ini_path)
-
-    load_settings.cache_clear()  # type: ignore[attr-defined]
+            values[k] = str(v)
+
+    def _apply(cfg):
+        for sect in ("variables", "base"):
+            if not cfg.has_section(sect):
+                cfg.add_section(sect)
+        for k, v in values.items():
+            # округлення калькулятор читає з [base]
+            cfg.set("base" if k == "rounding" else "variables", k, v)
+        check_length_range(cfg)  # разом з тим, що вже в конфігу: можна змінити лише одну межу
+
+    # атомарний запис через сховище (lock + temp/rename, снапшот скидається сам)
+    try:
+        STORE.update(_apply)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
     s = load_settings()
     return {
         "ok": True,
@@ -98,39 +121,12 @@ def update_prices(
     except Exception:
         raise HTTPException(400, "Body must contain numeric 'high' and 'low'")
 
-    csv_path = DATA_DIR / "prices.csv"
-    tmp = csv_path.with_suffix(".csv.tmp")
-    with open(tmp, "w", newline="", encoding="utf-8") as f:
-        w = csv.writer(f)
-        w.writerow([high])
-        w.writerow([low])
-    tmp.replace(csv_path)
-
-    load_settings.cache_clear()  # type: ignore[attr-defined]
+    # ставки живуть у [base] того ж конфігу, що читає калькулятор
+    save_base(None, int(high), int(low))
     s = load_settings()
     return {"ok": True, "price_per_meter": {"high": s.price_per_meter_high, "low": s.price_per_meter_low}}
 
-class Position(BaseModel):
-    name: str
-    percent: float
-
-# тимчасове сховище в пам’яті
-DB: dict[str, float] = {}
-
-@router.get("/positions")
-def list_positions():
-    # повертаємо як словник {name: percent}
-    return DB
-
-@router.post("/positions")
-def upsert_position(p: Position):
-    DB[p.name] = p.percent
-    return {"ok": True}
-
-@router.delete("/positions/{name}")
-def delete_position(name: str):
-    DB.pop(name, None)
-    return {"ok": True}
+# /positions — routers/admin_positions.py (пункти group:colors)
 
 class BaseSave(BaseModel):
     rounding: str
@@ -144,5 +140,7 @@ def save_base_route(body: BaseSave):
         pl = int(float(str(body.price_low).replace(',', '.')))
         s = save_base(body.rounding, ph, pl)
         return {"rounding": s.rounding, "price_high": s.price_high, "price_low": s.price_low}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
@@ -1,13 +1,40 @@
-from fastapi import APIRouter, HTTPException
-from ..schemas.calc_io import CalcInput, CalcOutput, CalcConfig
-from ..services.config_loader import load_settings
-from ..services.calc_engine import compute
+import hashlib
+import io
+import os
+import tempfile
+from typing import List, Literal, Optional
+from anyio import to_thread
+from fastapi import APIRouter, Header, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from ..schemas.calc_io import CalcInput, CalcOutput, CalcConfig, CalcBatchInput, CalcBatchOutput
+from ..services.config_loader import get_snapshot, group_to_dict
+from ..services.calc_engine import canonical_options, compute_batch, batch_rows, get_model, payload_as_of
+from ..services.price_grid import render_grid, grid_lengths, grid_size
+from ..services.bulk_pricing import price_stream, detect_format
+from ..services.quote_cache import cached_compute
+from ..services.history_log import HISTORY
+from ..services.live_model import current_model, current_snapshot
+from ..services.config_events import CONFIG_EVENTS
+from ..services.pricing_bundle import render_bundle, render_vectors
+
+# захист від випадкових гігантських запитів
+BATCH_MAX = int(os.getenv("CALC_BATCH_MAX", "100000"))
+
+# /compute і /config: async — рахуємо прямо на event loop зі снапшота в пам'яті
+# (I/O конфігу — фоном, див. services/live_model.py); thread — старі def-хендлери в threadpool
+CALC_ROUTES = os.getenv("CALC_ROUTES", "async").strip().lower()
 
 router = APIRouter(prefix="/api/calc", tags=["calc"])
 
-@router.get("/config", response_model=CalcConfig)
-def get_config():
-    s = load_settings()
+# ---------- /config: готові байти + ETag ----------
+
+CONFIG_MAX_AGE = int(os.getenv("CALC_CONFIG_MAX_AGE", "0"))
+CONFIG_CACHE_CONTROL = f"public, max-age={CONFIG_MAX_AGE}, must-revalidate"
+
+# ((версія снапшота, чинна версія прайсу), etag, тіло) — рендеримо один раз на пару
+_CONFIG_RENDERED: tuple[tuple[int, int], str, bytes] | None = None
+
+def _config_dict(s, pl=None) -> dict:
     return {
         "variables": {
             "min_length": s.min_length,
@@ -17,20 +44,208 @@ def get_config():
             "extra_price": s.extra_price,
             "rounding":   s.rounding_mode,
         },
-        "price_per_meter": {
-            "high": s.price_per_meter_high,
-            "low":  s.price_per_meter_low,
+        "price_per_meter": {  # чинна зараз версія прайсу, інакше [base]
+            "high": pl.price_high if pl else s.price_per_meter_high,
+            "low":  pl.price_low if pl else s.price_per_meter_low,
         },
         "positions": s.positions,  # <-- уже dict з лоадера
+        "groups": [group_to_dict(g) for g in s.groups],
     }
 
-@router.post("/compute", response_model=CalcOutput)
-def post_compute(payload: CalcInput):
+def render_config(snap=None) -> tuple[str, bytes]:
+    """(ETag, JSON-байти) для поточної (або переданої) версії конфігу."""
+    global _CONFIG_RENDERED
+    snap = snap or get_snapshot()
+    pl = snap.prices.at() if snap.prices else None
+    key = (snap.version, pl.id if pl else 0)
+    r = _CONFIG_RENDERED
+    if r is None or r[0] != key:
+        body = CalcConfig.model_validate(_config_dict(snap.settings, pl)).model_dump_json().encode("utf-8")
+        etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        r = _CONFIG_RENDERED = (key, etag, body)
+    return r[1], r[2]
+
+def _etag_matches(header: str | None, etag: str) -> bool:
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match — слабке порівняння: W/"x" == "x"
+    return any(t.strip().removeprefix("W/") == etag for t in header.split(","))
+
+def _config_response(etag: str, body: bytes, if_none_match: Optional[str]) -> Response:
+    headers = {"ETag": etag, "Cache-Control": CONFIG_CACHE_CONTROL}
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+def get_config(if_none_match: Optional[str] = Header(None)):
+    return _config_response(*render_config(), if_none_match)
+
+async def get_config_async(if_none_match: Optional[str] = Header(None)):
+    snap = await current_snapshot()
+    return _config_response(*render_config(snap), if_none_match)
+
+def _compute(payload: CalcInput, model=None) -> CalcOutput:
     try:
         body = payload.model_dump() if hasattr(payload, "model_dump") else (
             payload.dict() if hasattr(payload, "dict") else payload
         )
-        return compute(body)
+        m = model or get_model(payload_as_of(body))
+        out = cached_compute(body, m)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
-    
\ No newline at end of file
+    if HISTORY.enabled:
+        HISTORY.submit(body, out.price_total, m)  # put_nowait у чергу фонового записувача; на БД не чекаємо
+    return out
+
+def post_compute(payload: CalcInput):
+    return _compute(payload)
+
+async def post_compute_async(payload: CalcInput):
+    return _compute(payload, await current_model(payload.as_of))
+
+# ---------- /bundle: модель для розрахунку на клієнті + еталонні вектори ----------
+
+@router.get("/bundle")
+async def get_bundle(if_none_match: Optional[str] = Header(None)):
+    """
+    Детермінований опис моделі (services/pricing_bundle.py); ETag = version,
+    однаковий у всіх воркерах. Клієнт рахує локально, сервер — перевіряє.
+    """
+    version, body = render_bundle(await current_model())
+    return _config_response(f'"{version}"', body, if_none_match)
+
+@router.get("/bundle/vectors")
+async def get_bundle_vectors(if_none_match: Optional[str] = Header(None)):
+    """Вхід → вихід calc_engine.compute() для перевірки клієнтської реалізації."""
+    m = await current_model()
+    version, body = await to_thread.run_sync(render_vectors, m)  # ~800 розрахунків — не на event loop
+    return _config_response(f'"{version}"', body, if_none_match)
+
+@router.get("/config/events")
+async def get_config_events(last_event_id: Optional[str] = Header(None)):
+    """
+    SSE: подія `config` з ETag поточного конфігу одразу і після кожної зміни
+    (адмінка, інший воркер, правка файлу/БД); heartbeat-коментар раз на 15 с.
+    Клієнт перезапитує /config лише коли ETag змінився.
+    """
+    return StreamingResponse(
+        CONFIG_EVENTS.stream(last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},  # nginx не буферизує
+    )
+
+_ASYNC = CALC_ROUTES != "thread"
+router.add_api_route("/config", get_config_async if _ASYNC else get_config,
+                     methods=["GET"], response_model=CalcConfig)
+router.add_api_route("/compute", post_compute_async if _ASYNC else post_compute,
+                     methods=["POST"], response_model=CalcOutput)
+
+def _column(value, n: int, default):
+    # одне значення (або None) розмножуємо на всі рядки
+    if value is None:
+        return [default] * n
+    if isinstance(value, list):
+        return value
+    return [value] * n
+
+def _options_column(value, n: int):
+    # один вибір на всі рядки канонізуємо раз; None — груп немає в жодному рядку
+    if value is None:
+        return None
+    if isinstance(value, list):
+        return [canonical_options(o) if o else () for o in value]
+    return [canonical_options(value)] * n
+
+@router.post("/compute/batch", response_model=CalcBatchOutput)
+def post_compute_batch(payload: CalcBatchInput, format: Literal["columns", "rows"] = "columns"):
+    n = len(payload.L)
+    if n > BATCH_MAX:
+        raise HTTPException(status_code=413, detail=f"batch too large (max {BATCH_MAX})")
+    try:
+        m = get_model(payload.as_of)  # як /compute: версія прайсу на as_of, одна на всю пачку
+        cols = compute_batch(
+            payload.L,
+            _column(payload.W, n, 0),
+            _column(payload.H, n, 0),
+            _column(payload.position, n, ""),
+            model=m,
+            options=_options_column(payload.options, n),
+        )
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # віддаємо готовий JSON: повторна валідація response_model на 10⁴ рядків — зайва
+    if format == "rows":
+        return JSONResponse({"count": n, "items": batch_rows(cols)})
+    return JSONResponse(cols)
+
+# ~100 байт на рядок CSV → до ~100 МБ за одну відповідь
+GRID_MAX_ROWS = int(os.getenv("CALC_GRID_MAX_ROWS", "1000000"))
+
+@router.get("/grid")
+def get_price_grid(
+    format: Literal["ndjson", "csv"] = "csv",
+    step: int = 10,
+    min_length: Optional[int] = None,
+    max_length: Optional[int] = None,
+    widths: Optional[List[int]] = Query(None),
+    heights: Optional[List[int]] = Query(None),
+    positions: Optional[List[str]] = Query(None),
+    gzip: bool = False,
+):
+    """
+    Повний прайс-лист L×W×H×опція потоком (chunked). Пам'ять не залежить від розміру сітки.
+    За замовчуванням: L — min..max крок 10 мм, W/H — мінімальні, усі опції кольору.
+    """
+    m = get_model()  # одна версія конфігу на весь прогін
+    try:
+        lengths = grid_lengths(m, step, min_length, max_length)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not lengths:
+        raise HTTPException(status_code=422, detail="min_length must not exceed max_length")
+    ws = widths or [m.min_width]
+    hs = heights or [m.min_height]
+    ps = positions or list(m.positions)
+    if grid_size(lengths, ws, hs, ps) > GRID_MAX_ROWS:
+        raise HTTPException(status_code=413, detail=f"grid too large (max {GRID_MAX_ROWS} rows)")
+
+    body = render_grid(format, lengths, ws, hs, ps, gzip=gzip, model=m)
+    media = "application/x-ndjson" if format == "ndjson" else "text/csv; charset=utf-8"
+    headers = {
+        "Content-Disposition": f'attachment; filename="price-grid-v{m.version}.{format}"',
+        "X-Config-Version": str(m.version),
+    }
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(body, media_type=media, headers=headers)
+
+# тіло файлу замовлень до цього розміру тримаємо в RAM, далі — на диску
+BULK_SPOOL_BYTES = int(os.getenv("CALC_BULK_SPOOL_BYTES", str(4 * 1024 * 1024)))
+
+@router.post("/bulk")
+async def post_bulk(request: Request, format: Optional[Literal["csv", "jsonl"]] = None):
+    """
+    Файл замовлень (CSV/JSONL) сирим тілом запиту → NDJSON з результатом/помилкою
+    на кожен рядок і підсумком наприкінці. Формат — з ?format= або Content-Type.
+    """
+    fmt = format or detect_format(request.headers.get("content-type"))
+    spool = tempfile.SpooledTemporaryFile(max_size=BULK_SPOOL_BYTES)
+    try:
+        async for chunk in request.stream():
+            # після BULK_SPOOL_BYTES це запис на диск — не на event loop
+            await to_thread.run_sync(spool.write, chunk)
+    except BaseException:
+        spool.close()
+        raise
+    spool.seek(0)
+    src = io.TextIOWrapper(spool, encoding="utf-8-sig", newline="")
+
+    def body():  # синхронний генератор — Starlette ітерує його в threadpool
+        try:
+            yield from price_stream(src, fmt)
+        finally:
+            src.close()
+
+    return StreamingResponse(body(), media_type="application/x-ndjson")
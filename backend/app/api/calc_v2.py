@@ -0,0 +1,70 @@
+# backend/app/api/calc_v2.py
+"""
+/api/v2/calc/compute — той самий розрахунок, що й v1, але без зайвих кроків:
+
+  - тіло парситься і валідується одним викликом TypeAdapter.validate_json
+    (JSON → CalcInputV2 у pydantic-core, без проміжного dict і без аліасів
+    L/length/dimensions.L — лише L, W, H, position, options);
+  - далі одразу quote() через кеш, без normalize_input()/model_dump();
+  - відповідь — готові байти від заздалегідь зібраного серіалізатора,
+    без response_model і повторної валідації;
+  - запит обслуговує простий starlette Route (FAST_ROUTE), який main.py ставить
+    першим у таблиці маршрутів: без лінійного перебору ~20 маршрутів і без
+    dependency-solving FastAPI. APIRoute у router — лише для OpenAPI/доків.
+
+v1 (/api/calc/compute) лишається як є — для старих клієнтів.
+"""
+import json
+
+from fastapi import APIRouter, Request
+from fastapi.responses import Response
+from pydantic import TypeAdapter, ValidationError
+from starlette.routing import Match, Route
+
+from ..schemas.calc_io import CalcInputV2, CalcOutput
+from ..services.calc_engine import canonical_options
+from ..services.history_log import HISTORY
+from ..services.live_model import current_model
+from ..services.quote_cache import cached_quote
+
+router = APIRouter(prefix="/api/v2/calc", tags=["calc"])
+
+# будуються один раз на процес
+_INPUT = TypeAdapter(CalcInputV2)
+_OUTPUT = TypeAdapter(CalcOutput)
+
+def _error(status: int, detail: bytes) -> Response:
+    return Response(content=b'{"detail":' + detail + b"}", status_code=status, media_type="application/json")
+
+@router.post(
+    "/compute",
+    responses={200: {"model": CalcOutput}},
+    openapi_extra={"requestBody": {
+        "required": True,
+        "content": {"application/json": {"schema": CalcInputV2.model_json_schema()}},
+    }},
+)
+async def post_compute_v2(request: Request):
+    try:
+        p = _INPUT.validate_json(await request.body())
+    except ValidationError as e:
+        return _error(422, e.json(include_url=False).encode())
+    options = canonical_options(p.options) if p.options else ()
+    try:
+        m = await current_model(p.as_of)
+        out = cached_quote(p.L, p.W, p.H, p.position.strip(), options, m)
+    except Exception as e:
+        return _error(400, json.dumps(str(e), ensure_ascii=False).encode())
+    if HISTORY.enabled:
+        HISTORY.submit({"L": p.L, "W": p.W, "H": p.H, "position": p.position, "options": p.options}, out.price_total, m)
+    return Response(content=_OUTPUT.dump_json(out), media_type="application/json")
+
+class _FastRoute(Route):
+    # як APIRoute: кладемо себе в scope["route"] — з нього MetricsMiddleware бере шаблон шляху
+    def matches(self, scope):
+        match, child = super().matches(scope)
+        if match != Match.NONE:
+            child["route"] = self
+        return match, child
+
+FAST_ROUTE = _FastRoute("/api/v2/calc/compute", post_compute_v2, methods=["POST"])
@@ -0,0 +1,20 @@
+# backend/app/api/metrics.py
+from anyio import to_thread
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from ..core.metrics import render
+
+router = APIRouter(tags=["metrics"])
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    # limiter читаємо в event loop — ДО того, як сам рендер займе потік
+    limiter = to_thread.current_default_thread_limiter()
+    st = limiter.statistics()
+    pool = {"total": limiter.total_tokens, "borrowed": st.borrowed_tokens, "waiting": st.tasks_waiting}
+    # рендер може перечитати конфіг (файл/БД) — не блокуємо ним loop
+    body = await to_thread.run_sync(render, pool)
+    return PlainTextResponse(body, media_type=CONTENT_TYPE)
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""
+/ws/calc — живий розрахунок для сторінки калькулятора через один WebSocket.
+
+Протокол (JSON-текст у обидва боки):
+    клієнт → {"seq": 17, "L": 1200, "W": 500, "H": 150, "position": "...", "options": {...}}
+    сервер → {"seq": 17, "version": 42, "result": {...CalcOutput...}}
+           | {"seq": 17, "error": "..."}
+
+Повідомлення — патч стану сесії: поля зливаються з попередніми, null
+прибирає поле, {"reset": true} починає стан з нуля. seq — зростаючий
+номер від клієнта, сервер лише повертає його у відповіді.
+
+Пачки «злипаються»: читач лише записує останній стан і будить відправника;
+відправник рахує тільки найсвіжіший стан на момент пробудження. Поки йде
+розрахунок/відправка, нові повідомлення просто перезаписують стан — тож
+на серію натискань приходить одна відповідь із seq останнього.
+
+Писати в сокет можуть і читач (помилки формату), і відправник — тому
+кожна відправка йде під lock-ом сесії (_send), кадри не перемежовуються.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+
+from fastapi import APIRouter, WebSocket
+from pydantic import ValidationError
+from starlette.websockets import WebSocketDisconnect
+
+from ..core.metrics import register_collector
+from ..schemas.calc_io import CalcInput
+from ..services.history_log import HISTORY
+from ..services.live_model import current_model
+from ..services.quote_cache import cached_compute
+
+router = APIRouter(tags=["calc"])
+
+# лічильники для /metrics (оновлюються лише з event loop)
+WS_STATS = {"sessions": 0, "sessions_total": 0, "received": 0, "computed": 0}
+
+@register_collector
+def _metrics():
+    yield "gauge", "ws_calc_sessions", "Open /ws/calc sessions.", WS_STATS["sessions"]
+    yield "counter", "ws_calc_messages_total", "Updates received on /ws/calc.", WS_STATS["received"]
+    yield ("counter", "ws_calc_quotes_total", "Quotes computed on /ws/calc (received minus coalesced).",
+           WS_STATS["computed"])
+
+class _Session:
+    __slots__ = ("state", "seq", "wake", "send_lock")
+
+    def __init__(self) -> None:
+        self.state: dict = {}
+        self.seq: int = 0
+        self.wake = asyncio.Event()
+        self.send_lock = asyncio.Lock()
+
+async def _send(ws: WebSocket, s: _Session, text: str) -> None:
+    async with s.send_lock:
+        await ws.send_text(text)
+
+def _error(seq, msg: str) -> str:
+    return json.dumps({"seq": seq, "error": msg}, ensure_ascii=False)
+
+async def _reply(seq: int, state: dict) -> str:
+    try:
+        payload = CalcInput.model_validate(state)
+    except ValidationError as e:
+        return _error(seq, "; ".join(f"{'.'.join(map(str, x['loc']))}: {x['msg']}" for x in e.errors()))
+    try:  # невалідний as_of / збій читання конфігу — кадр з помилкою, а не мертвий відправник
+        m = await current_model(payload.as_of)
+        body = payload.model_dump()
+        out = cached_compute(body, m)
+    except Exception as e:
+        return _error(seq, str(e))
+    WS_STATS["computed"] += 1
+    if HISTORY.enabled:
+        HISTORY.submit(body, out.price_total, m)
+    return f'{{"seq":{seq},"version":{m.version},"result":{out.model_dump_json()}}}'
+
+async def _pusher(ws: WebSocket, s: _Session) -> None:
+    while True:
+        await s.wake.wait()
+        s.wake.clear()
+        # знімок на момент пробудження; все, що прийде під час розрахунку, — наступним колом
+        await _send(ws, s, await _reply(s.seq, dict(s.state)))
+
+def _merge(s: _Session, msg: dict) -> None:
+    if msg.pop("reset", False):
+        s.state.clear()
+    for k, v in msg.items():
+        if v is None:
+            s.state.pop(k, None)
+        else:
+            s.state[k] = v
+
+@router.websocket("/ws/calc")
+async def ws_calc(ws: WebSocket):
+    await ws.accept()
+    s = _Session()
+    WS_STATS["sessions"] += 1
+    WS_STATS["sessions_total"] += 1
+    pusher = asyncio.create_task(_pusher(ws, s))
+    try:
+        while True:
+            message = await ws.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            raw = message.get("text") or message.get("bytes") or b""
+            WS_STATS["received"] += 1
+            try:
+                msg = json.loads(raw)
+            except ValueError:
+                await _send(ws, s, _error(None, "invalid JSON"))
+                continue
+            if not isinstance(msg, dict) or not isinstance(msg.get("seq"), int):
+                await _send(ws, s, _error(None, "expected an object with integer 'seq'"))
+                continue
+            s.seq = msg.pop("seq")
+            _merge(s, msg)
+            s.wake.set()
+            if pusher.done():  # відправник упав (клієнт пішов) — закриваємось
+                break
+    except WebSocketDisconnect:
+        pass
+    finally:
+        WS_STATS["sessions"] -= 1
+        pusher.cancel()
+        with contextlib.suppress(asyncio.CancelledError, Exception):  # помилка відправки = клієнт уже пішов
+            await pusher
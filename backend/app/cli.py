@@ -0,0 +1,319 @@
+# backend/app/cli.py
+"""
+Офлайн-утиліти бекенду. Запуск з кореня репозиторію (або /app у Docker):
+
+    python -m backend.app.cli grid --format csv --width 500 --width 600 -o grid.csv
+    python -m backend.app.cli bulk orders.csv -o priced.ndjson
+    python -m backend.app.cli rollups-rebuild
+    python -m backend.app.cli history-compact --config old.ini   # calc_history → quote_history
+    python -m backend.app.cli config-import backend/config.ini   # INI → БД (CONFIG_SOURCE=db)
+    python -m backend.app.cli config-export backup.ini           # БД → INI
+    python -m backend.app.cli config-migrate                     # дефолти + legacy item.N у джерело
+    python -m backend.app.cli config-cache                       # config.ini.cache для швидкого старту
+    python -m backend.app.cli check-readonly                     # розрахунки не пишуть у ФС (CI)
+    python -m backend.app.cli golden-vectors -o vectors.json     # еталонні вектори compute()
+    python -m backend.app.cli golden-vectors --check vectors.json  # регресія рушія (код 1)
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+
+def _open_out(path: str | None):
+    if not path or path == "-":
+        return sys.stdout.buffer
+    return open(path, "wb")
+
+# ---------- grid: повний прайс-лист ----------
+
+def cmd_grid(args: argparse.Namespace) -> int:
+    from .services.calc_engine import get_model
+    from .services.price_grid import render_grid, grid_lengths
+
+    m = get_model()
+    lengths = grid_lengths(m, args.step, args.min_length, args.max_length)
+    out = _open_out(args.output)
+    try:
+        for part in render_grid(
+            args.format, lengths,
+            args.width or [m.min_width],
+            args.height or [m.min_height],
+            args.position or None,
+            gzip=args.gzip, model=m,
+        ):
+            out.write(part)
+    finally:
+        if out is not sys.stdout.buffer:
+            out.close()
+    return 0
+
+# ---------- bulk: файл замовлень → NDJSON ----------
+
+def cmd_bulk(args: argparse.Namespace) -> int:
+    from .services.bulk_pricing import BulkStats, price_stream, detect_format
+
+    fmt = args.format or detect_format(args.input)
+    stats = BulkStats()
+    out = _open_out(args.output)
+    last = 0
+    try:
+        with open(args.input, encoding="utf-8-sig", newline="") as src:
+            for part in price_stream(src, fmt, stats):
+                out.write(part)
+                if args.progress and stats.rows - last >= args.progress:
+                    last = stats.rows
+                    print(f"... {stats.rows} rows, {stats.errors} errors", file=sys.stderr)
+    finally:
+        if out is not sys.stdout.buffer:
+            out.close()
+    d = stats.as_dict()
+    print(
+        f"rows={d['rows']} ok={d['ok']} errors={d['errors']} "
+        f"time={d['seconds']}s throughput={d['rows_per_s']} rows/s",
+        file=sys.stderr,
+    )
+    return 1 if stats.errors and args.strict else 0
+
+# ---------- rollups-rebuild: перерахунок агрегатів ----------
+
+def cmd_rollups_rebuild(args: argparse.Namespace) -> int:
+    from .core.db import SessionLocal
+    from .services.rollups import rebuild
+
+    with SessionLocal() as s:
+        n = rebuild(s, chunk=args.chunk)
+        s.commit()
+    print(f"rollups rebuilt from {n} history rows", file=sys.stderr)
+    return 0
+
+# ---------- history-compact: старі JSON-рядки → quote_history ----------
+
+def cmd_history_compact(args: argparse.Namespace) -> int:
+    import time
+    from .core.db import SessionLocal
+    from .services.calc_engine import compile_model, get_model
+    from .services.history_store import convert_legacy
+
+    if args.config:
+        from .services.config_loader import ConfigSnapshot, settings_from_ini
+
+        try:
+            settings = settings_from_ini(args.config)
+        except OSError as e:
+            print(e, file=sys.stderr)
+            return 2
+        # version=0 — не перетинається з версіями снапшотів процесу (від 1)
+        m = compile_model(ConfigSnapshot(version=0, generation=0, stamp=None,
+                                         settings=settings, loaded_at=time.time()))
+    else:
+        m = get_model()
+    t = time.perf_counter()
+    with SessionLocal() as s:
+        moved, kept = convert_legacy(s, m, chunk=args.chunk, dry_run=args.dry_run)
+    verb = "would move" if args.dry_run else "moved"
+    print(f"{verb} {moved} rows to quote_history, {kept} left in calc_history "
+          f"({time.perf_counter() - t:.1f}s)", file=sys.stderr)
+    return 0
+
+# ---------- config-import / config-export: INI ↔ БД ----------
+
+def cmd_config_import(args: argparse.Namespace) -> int:
+    from pathlib import Path
+    from .services import config_db
+    from .services.config_loader import CONFIG_PATH
+
+    path = Path(args.path) if args.path else CONFIG_PATH
+    version = config_db.import_ini(path)
+    print(f"imported {path} → config version {version}", file=sys.stderr)
+    return 0
+
+def cmd_config_export(args: argparse.Namespace) -> int:
+    from pathlib import Path
+    from .services import config_db
+
+    config_db.export_ini(Path(args.path))
+    print(f"exported config version {config_db.read_version()} → {args.path}", file=sys.stderr)
+    return 0
+
+# ---------- config-migrate: разова міграція джерела ----------
+
+def cmd_config_migrate(args: argparse.Namespace) -> int:
+    from .services.config_loader import migrate_config, CONFIG_PATH, CONFIG_SOURCE
+
+    changed = migrate_config()
+    where = "db" if CONFIG_SOURCE == "db" else CONFIG_PATH
+    print(f"{where}: {'migrated' if changed else 'already up to date'}", file=sys.stderr)
+    return 0
+
+# ---------- config-cache: передрозібраний конфіг для холодного старту ----------
+
+def cmd_config_cache(args: argparse.Namespace) -> int:
+    from .services.config_loader import CONFIG_CACHE_ENABLED, CONFIG_CACHE_PATH, write_config_cache
+
+    if not CONFIG_CACHE_ENABLED:
+        print("config cache disabled (CONFIG_CACHE=0 or CONFIG_SOURCE=db)", file=sys.stderr)
+        return 0
+    written = write_config_cache()
+    print(f"{CONFIG_CACHE_PATH}: {'written' if written else 'up to date'}", file=sys.stderr)
+    return 0
+
+# ---------- check-readonly: шлях розрахунку не пише у ФС ----------
+
+def cmd_check_readonly(args: argparse.Namespace) -> int:
+    import os
+    os.environ["READONLY_GUARD"] = "raise"  # до імпорту main — щоб middleware увімкнувся
+    os.environ.setdefault("HISTORY_ENABLED", "0")
+
+    from fastapi.testclient import TestClient
+    from .core import readonly_guard
+    from .main import app
+    from .services.config_loader import invalidate_settings
+
+    readonly_guard.install("raise")
+    failed = 0
+    with TestClient(app) as client:  # lifespan: міграція/прогрів — поза перевіркою
+        cfg = client.get("/api/calc/config").json()
+        pos = next(iter(cfg.get("positions") or {}), "")
+        body = {"L": 1200, "W": 600, "H": 200, "position": pos}
+        checks = [
+            ("GET", "/api/calc/config", None),
+            ("POST", "/api/calc/compute", body),
+            ("POST", "/api/v2/calc/compute", body),
+            ("POST", "/api/calc/compute/batch", {"L": [500, 1500, 3000], "W": 600, "H": 200, "position": pos}),
+            ("GET", "/api/calc/grid?format=csv&step=500", None),
+            ("GET", "/api/calc/bundle/vectors", None),
+        ]
+        for _ in range(2):
+            invalidate_settings()  # змушуємо запит перечитати конфіг — найризиковіший шлях
+            for method, url, payload in checks:
+                try:
+                    r = client.request(method, url, json=payload)
+                except Exception as e:
+                    guard = _guard_error(e, readonly_guard.WriteInReadPath)
+                    if guard is None:
+                        raise
+                    failed += 1
+                    print(f"FAIL --- {method} {url}: {guard}", file=sys.stderr)
+                    continue
+                ok = r.status_code < 400
+                failed += not ok
+                print(f"{'ok  ' if ok else 'FAIL'} {r.status_code} {method} {url}", file=sys.stderr)
+    for scope, event, target in readonly_guard.VIOLATIONS:
+        print(f"write in {scope}: {event} {target}", file=sys.stderr)
+    if failed or readonly_guard.VIOLATIONS:
+        first = readonly_guard.VIOLATIONS[0] if readonly_guard.VIOLATIONS else None
+        where = f"; first: {first[1]} {first[2]} during {first[0]}" if first else ""
+        print(f"check-readonly FAILED: {failed} failed requests, "
+              f"{len(readonly_guard.VIOLATIONS)} writes in read path{where}", file=sys.stderr)
+        return 1
+    print(f"check-readonly ok: {len(checks) * 2} requests, no writes", file=sys.stderr)
+    return 0
+
+def _guard_error(e: BaseException, kind: type) -> BaseException | None:
+    """WriteInReadPath — сам або загорнутий у ExceptionGroup/__cause__ (TestClient, anyio)."""
+    if isinstance(e, kind):
+        return e
+    for sub_e in getattr(e, "exceptions", ()) or ():
+        found = _guard_error(sub_e, kind)
+        if found is not None:
+            return found
+    cause = e.__cause__ or e.__context__
+    return _guard_error(cause, kind) if cause is not None else None
+
+# ---------- golden-vectors: еталон compute() для клієнтів і регресій ----------
+
+def cmd_golden_vectors(args: argparse.Namespace) -> int:
+    import json
+    from .services.calc_engine import get_model
+    from .services.pricing_bundle import bundle_dict, check_vectors, render_vectors
+
+    m = get_model()
+    if args.check:
+        with open(args.check, encoding="utf-8") as f:
+            doc = json.load(f)
+        version = bundle_dict(m)["version"]
+        if doc.get("bundle") != version:
+            print(f"note: vectors are for bundle {doc.get('bundle')}, current config is {version}", file=sys.stderr)
+        bad = check_vectors(doc, m)
+        for i, want, got in bad[:20]:
+            diff = {k: (want.get(k), got.get(k)) for k in want.keys() | got.keys() if want.get(k) != got.get(k)}
+            print(f"#{i} {doc['vectors'][i]['in']}: {diff}", file=sys.stderr)
+        print(f"{len(doc.get('vectors', [])) - len(bad)} ok, {len(bad)} mismatched", file=sys.stderr)
+        return 1 if bad else 0
+    version, body = render_vectors(m)
+    out = _open_out(args.output)
+    try:
+        out.write(body)
+    finally:
+        if out is not sys.stdout.buffer:
+            out.close()
+    print(f"bundle {version}: vectors written", file=sys.stderr)
+    return 0
+
+# ---------- entry point ----------
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(prog="python -m backend.app.cli")
+    sub = p.add_subparsers(dest="cmd", required=True)
+
+    g = sub.add_parser("grid", help="прайс-лист L×W×H×опція у CSV/NDJSON")
+    g.add_argument("--format", choices=["csv", "ndjson"], default="csv")
+    g.add_argument("--step", type=int, default=10, help="крок довжини, мм")
+    g.add_argument("--min-length", type=int, default=None)
+    g.add_argument("--max-length", type=int, default=None)
+    g.add_argument("--width", type=int, action="append", help="можна кілька разів")
+    g.add_argument("--height", type=int, action="append", help="можна кілька разів")
+    g.add_argument("--position", action="append", help="опція кольору (за замовчуванням — усі)")
+    g.add_argument("--gzip", action="store_true")
+    g.add_argument("-o", "--output", default="-", help="файл або '-' для stdout")
+    g.set_defaults(func=cmd_grid)
+
+    b = sub.add_parser("bulk", help="порахувати файл замовлень CSV/JSONL")
+    b.add_argument("input", help="шлях до .csv / .jsonl")
+    b.add_argument("--format", choices=["csv", "jsonl"], default=None, help="за замовчуванням — з розширення")
+    b.add_argument("-o", "--output", default="-", help="файл або '-' для stdout")
+    b.add_argument("--progress", type=int, default=0, metavar="N", help="звіт у stderr кожні N рядків")
+    b.add_argument("--strict", action="store_true", help="код виходу 1, якщо були помилки")
+    b.set_defaults(func=cmd_bulk)
+
+    r = sub.add_parser("rollups-rebuild", help="перерахувати агрегати дашбордів з журналу розрахунків")
+    r.add_argument("--chunk", type=int, default=5000, help="рядків історії за одну вибірку")
+    r.set_defaults(func=cmd_rollups_rebuild)
+
+    hc = sub.add_parser("history-compact", help="перенести calc_history у компактну quote_history")
+    hc.add_argument("--config", default=None,
+                    help="INI, за яким рахувалась стара історія (за замовчуванням — поточний конфіг)")
+    hc.add_argument("--chunk", type=int, default=5000, help="рядків за одну транзакцію")
+    hc.add_argument("--dry-run", action="store_true", help="лише порахувати, нічого не змінювати")
+    hc.set_defaults(func=cmd_history_compact)
+
+    ci = sub.add_parser("config-import", help="завантажити config.ini у БД (нова версія)")
+    ci.add_argument("path", nargs="?", default=None, help="за замовчуванням — backend/config.ini")
+    ci.set_defaults(func=cmd_config_import)
+
+    ce = sub.add_parser("config-export", help="вивантажити конфіг з БД у INI-файл")
+    ce.add_argument("path")
+    ce.set_defaults(func=cmd_config_export)
+
+    cm = sub.add_parser("config-migrate", help="дописати дефолти і переписати legacy item.N у джерелі")
+    cm.set_defaults(func=cmd_config_migrate)
+
+    cc = sub.add_parser("config-cache", help="записати config.ini.cache (передрозібраний конфіг)")
+    cc.set_defaults(func=cmd_config_cache)
+
+    cr = sub.add_parser("check-readonly", help="перевірити, що розрахунки не пишуть у файлову систему")
+    cr.set_defaults(func=cmd_check_readonly)
+
+    gv = sub.add_parser("golden-vectors", help="еталонні вектори compute() (або перевірка файлу)")
+    gv.add_argument("-o", "--output", default="-", help="файл або '-' для stdout")
+    gv.add_argument("--check", metavar="FILE", help="перерахувати вектори з файлу і порівняти")
+    gv.set_defaults(func=cmd_golden_vectors)
+
+    return p
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""
+Фази старту застосунку для /readyz.
+
+/healthz — процес живий; /readyz — прогрів у lifespan завершено
+(конфіг, модель, OpenAPI), тобто перший справжній запит не платитиме за старт.
+"""
+
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+class BootState:
+    def __init__(self) -> None:
+        self.t0 = time.perf_counter()     # імпорт app.main — найраніша точка, яку бачимо
+        self.phases: dict[str, float] = {}
+        self.info: dict[str, object] = {}
+        self.ready = False
+        self.ready_after: float | None = None
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        t = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = round((time.perf_counter() - t) * 1000, 2)
+
+    def mark_ready(self) -> None:
+        self.ready = True
+        self.ready_after = round((time.perf_counter() - self.t0) * 1000, 2)
+
+    def as_dict(self) -> dict:
+        return {
+            "ready": self.ready,
+            "since_import_ms": self.ready_after,
+            "phases_ms": self.phases,
+            **self.info,
+        }
+
+BOOT = BootState()
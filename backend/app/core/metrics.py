@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+"""
+Метрики процесу у форматі Prometheus (text exposition 0.0.4), без залежностей.
+
+MetricsMiddleware — чистий ASGI middleware: на кожен запит два perf_counter,
+bisect по межах кошиків і кілька інкрементів у dict. Лічильники оновлюються
+лише з потоку event loop (middleware виконується там, навіть для sync-ендпоінтів),
+тож lock не потрібен. Маршрут — шаблон (scope["route"].path), а не сирий
+шлях, щоб кількість серій не залежала від параметрів; невідомі шляхи
+зводимо в "<unmatched>".
+
+Gauges рахуються лише під час scrape (/metrics): версія/вік снапшота
+конфігу, кеш розрахунків, черга історії, лаг event loop (фонова задача
+LoopLagMonitor) і зайнятість threadpool Starlette (anyio limiter).
+
+Шари вище (api/*) не імпортуються звідси: свої лічильники вони віддають
+через register_collector() — функцію, що на scrape повертає
+(тип, назва, опис, значення).
+
+Кожен воркер uvicorn має власні лічильники — Prometheus бачить той воркер,
+на який потрапив scrape (для агрегату — multiprocess-експортер або 1 воркер).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from bisect import bisect_left
+from typing import Callable, Iterable
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+
+# межі кошиків латентності, секунди
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LOOP_LAG_INTERVAL = float(os.getenv("METRICS_LOOP_LAG_INTERVAL", "0.5"))
+
+class _RouteStats:
+    __slots__ = ("buckets", "sum", "count", "status")
+
+    def __init__(self) -> None:
+        self.buckets = [0] * (len(BUCKETS) + 1)  # не кумулятивно; останній — +Inf
+        self.sum = 0.0
+        self.count = 0
+        self.status: dict[str, int] = {}
+
+class Registry:
+    def __init__(self) -> None:
+        self.routes: dict[tuple[str, str], _RouteStats] = {}
+        self.in_flight = 0
+        self.started = time.time()
+
+    def observe(self, method: str, route: str, status: int, seconds: float) -> None:
+        key = (method, route)
+        st = self.routes.get(key)
+        if st is None:
+            st = self.routes[key] = _RouteStats()
+        st.buckets[bisect_left(BUCKETS, seconds)] += 1
+        st.sum += seconds
+        st.count += 1
+        cls = f"{status // 100}xx"
+        st.status[cls] = st.status.get(cls, 0) + 1
+
+REGISTRY = Registry()
+
+class MetricsMiddleware:
+    def __init__(self, app, registry: Registry = REGISTRY) -> None:
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        reg = self.registry
+        status = 500  # якщо відповідь так і не почалась — рахуємо як помилку
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        reg.in_flight += 1
+        t0 = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            reg.in_flight -= 1
+            route = scope.get("route")
+            reg.observe(scope["method"], getattr(route, "path", "<unmatched>"), status, time.perf_counter() - t0)
+
+# --------------------------- Лаг event loop --------------------------- #
+
+class LoopLagMonitor:
+    """Спить interval і міряє, наскільки пізніше прокинулась: це і є лаг loop."""
+
+    def __init__(self, interval: float = LOOP_LAG_INTERVAL) -> None:
+        self.interval = interval
+        self.last = 0.0
+        self.max = 0.0
+        self._task: asyncio.Task | None = None
+
+    async def _run(self) -> None:
+        while True:
+            t = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.perf_counter() - t - self.interval)
+            self.last = lag
+            if lag > self.max:
+                self.max = lag
+
+    def start(self) -> None:
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+LOOP_LAG = LoopLagMonitor()
+
+# ---------- зовнішні джерела (api/* тощо) ----------
+
+Sample = tuple[str, str, str, float]  # ("gauge" | "counter", назва, опис, значення)
+_COLLECTORS: list[Callable[[], Iterable[Sample]]] = []
+
+def register_collector(fn: Callable[[], Iterable[Sample]]) -> Callable[[], Iterable[Sample]]:
+    """Додати функцію, яку render() викликає на кожен scrape (ідемпотентно; можна як декоратор)."""
+    if fn not in _COLLECTORS:
+        _COLLECTORS.append(fn)
+    return fn
+
+# ------------------------------ Рендер ------------------------------ #
+
+def _esc(v: str) -> str:
+    return v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _labels(**kw) -> str:
+    return "{" + ",".join(f'{k}="{_esc(str(v))}"' for k, v in kw.items()) + "}"
+
+def _num(v) -> str:
+    if v is None:
+        return "NaN"
+    return repr(float(v)) if isinstance(v, float) else str(v)
+
+def _gauge(name: str, help_: str, value, **labels) -> list[str]:
+    return [f"# HELP {name} {help_}", f"# TYPE {name} gauge",
+            f"{name}{_labels(**labels) if labels else ''} {_num(value)}"]
+
+def _counter(name: str, help_: str, value) -> list[str]:
+    return [f"# HELP {name} {help_}", f"# TYPE {name} counter", f"{name} {_num(value)}"]
+
+def _http_lines(reg: Registry) -> Iterable[str]:
+    routes = sorted(reg.routes.items())
+    yield "# HELP http_requests_total HTTP requests by route template and status class."
+    yield "# TYPE http_requests_total counter"
+    for (method, route), st in routes:
+        for cls, n in sorted(st.status.items()):
+            yield f"http_requests_total{_labels(method=method, route=route, status=cls)} {n}"
+    yield "# HELP http_request_duration_seconds Request latency by route template."
+    yield "# TYPE http_request_duration_seconds histogram"
+    for (method, route), st in routes:
+        acc = 0
+        for le, n in zip(BUCKETS + (float("inf"),), st.buckets):
+            acc += n
+            le_s = "+Inf" if le == float("inf") else repr(le)
+            yield f"http_request_duration_seconds_bucket{_labels(method=method, route=route, le=le_s)} {acc}"
+        yield f"http_request_duration_seconds_sum{_labels(method=method, route=route)} {st.sum!r}"
+        yield f"http_request_duration_seconds_count{_labels(method=method, route=route)} {st.count}"
+    yield from _gauge("http_requests_in_flight", "Requests currently being served.", reg.in_flight)
+
+def render(threadpool: dict | None = None, registry: Registry = REGISTRY) -> str:
+    """Усе в text exposition; threadpool — статистика limiter-а (береться в event loop)."""
+    from ..services.config_loader import get_snapshot
+    from ..services.history_log import HISTORY
+    from ..services.quote_cache import QUOTE_CACHE
+
+    lines = list(_http_lines(registry))
+
+    snap = get_snapshot()
+    lines += _gauge("config_snapshot_version", "Local config snapshot version (bumps on every reload).", snap.version)
+    lines += _gauge("config_snapshot_generation", "Shared cross-worker config generation.", snap.generation)
+    lines += _gauge("config_snapshot_age_seconds", "Seconds since the config snapshot was loaded.",
+                    round(time.time() - snap.loaded_at, 3))
+
+    qc = QUOTE_CACHE.stats()
+    lines += _counter("quote_cache_hits_total", "Quote cache hits.", qc["hits"])
+    lines += _counter("quote_cache_misses_total", "Quote cache misses.", qc["misses"])
+    lines += _counter("quote_cache_evictions_total", "Quote cache LRU evictions.", qc["evictions"])
+    lines += _gauge("quote_cache_entries", "Quote cache size.", qc["size"])
+    lines += _gauge("quote_cache_hit_ratio", "Quote cache hits / lookups since start.", qc["hit_ratio"])
+
+    hs = HISTORY.stats()
+    lines += _gauge("history_queue_depth", "Quotes waiting for the history writer.", hs["queued"])
+    lines += _counter("history_dropped_total", "Quotes dropped because the history queue was full.", hs["dropped"])
+    lines += _counter("history_written_total", "Quotes written to quote_history.", hs["written"])
+
+    from ..services.config_events import CONFIG_EVENTS
+    ev = CONFIG_EVENTS.stats()
+    lines += _gauge("config_events_subscribers", "Open SSE config event streams.", ev["subscribers"])
+    lines += _counter("config_events_sent_total", "Config change events broadcast.", ev["sent"])
+    for collect in _COLLECTORS:
+        for kind, name, help_, value in collect():
+            lines += (_counter if kind == "counter" else _gauge)(name, help_, value)
+
+    lines += _gauge("event_loop_lag_seconds", "Last measured event loop lag.", round(LOOP_LAG.last, 6))
+    lines += _gauge("event_loop_lag_max_seconds", "Max event loop lag since start.", round(LOOP_LAG.max, 6))
+
+    if threadpool:
+        lines += _gauge("threadpool_tokens_total", "Starlette threadpool size (anyio limiter).", threadpool["total"])
+        lines += _gauge("threadpool_tokens_borrowed", "Threads busy with sync handlers.", threadpool["borrowed"])
+        lines += _gauge("threadpool_tasks_waiting", "Sync handlers queued for a free thread.", threadpool["waiting"])
+        lines += _gauge("threadpool_saturation_ratio", "borrowed / total.",
+                        round(threadpool["borrowed"] / threadpool["total"], 4) if threadpool["total"] else None)
+
+    lines += _gauge("process_start_time_seconds", "Process start time (unix).", round(registry.started, 3))
+    return "\n".join(lines) + "\n"
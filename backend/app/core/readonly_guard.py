@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+Перевірка, що шлях розрахунку нічого не пише у файлову систему.
+
+Працює через audit hook (sys.addaudithook): ловимо open() з прапорами
+запису та chmod/rename/remove/mkdir/... — але лише всередині readonly_scope()
+(contextvar, тож він доїжджає і в threadpool sync-ендпоінтів).
+
+ENV READONLY_GUARD:
+    off   (за замовчуванням) — hook не ставиться взагалі, нуль накладних
+    log   — порушення пишемо в лог і в VIOLATIONS
+    raise — ще й кидаємо WriteInReadPath (запит падає з 500)
+
+Middleware вмикає scope для GUARDED_PREFIXES. Для CI є
+`python -m backend.app.cli check-readonly` — ганяє розрахунки під raise.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import sys
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+log = logging.getLogger(__name__)
+
+GUARD_MODE = os.getenv("READONLY_GUARD", "off").strip().lower()
+
+# запити, що мусять бути строго read-only (bulk свідомо спулить тіло на диск)
+GUARDED_PREFIXES = (
+    "/api/calc/compute", "/api/calc/config", "/api/calc/grid", "/api/calc/bundle",
+    "/api/v2/calc/compute", "/ws/calc",
+)
+
+_WRITE_FLAGS = os.O_WRONLY | os.O_RDWR | os.O_CREAT | os.O_TRUNC | os.O_APPEND
+_WRITE_EVENTS = frozenset({
+    "os.chmod", "os.chown", "os.rename", "os.remove", "os.rmdir", "os.mkdir",
+    "os.truncate", "os.link", "os.symlink", "os.utime", "shutil.rmtree",
+})
+
+_SCOPE: ContextVar[str | None] = ContextVar("readonly_scope", default=None)
+_INSTALLED = False
+
+VIOLATIONS: list[tuple[str, str, str]] = []  # (scope, event, ціль)
+
+class WriteInReadPath(RuntimeError):
+    pass
+
+def _hook(event: str, args: tuple) -> None:
+    scope = _SCOPE.get()
+    if scope is None:
+        return
+    if event == "open":
+        path, _mode, flags = args
+        if not (flags & _WRITE_FLAGS):
+            return
+    elif event not in _WRITE_EVENTS:
+        return
+    else:
+        path = args[0] if args else ""
+    _SCOPE.set(None)  # щоб лог/виняток нижче не зациклились на собі
+    try:
+        VIOLATIONS.append((scope, event, str(path)))
+        log.error("write in read-only path %s: %s %s", scope, event, path)
+    finally:
+        _SCOPE.set(scope)
+    if GUARD_MODE == "raise":
+        raise WriteInReadPath(f"{event} {path} during {scope}")
+
+def install(mode: str | None = None) -> None:
+    """Поставити audit hook (один раз на процес; зняти його неможливо)."""
+    global _INSTALLED, GUARD_MODE
+    if mode is not None:
+        GUARD_MODE = mode
+    if not _INSTALLED:
+        sys.addaudithook(_hook)
+        _INSTALLED = True
+
+@contextmanager
+def readonly_scope(label: str) -> Iterator[None]:
+    token = _SCOPE.set(label)
+    try:
+        yield
+    finally:
+        _SCOPE.reset(token)
+
+class ReadOnlyGuardMiddleware:
+    """Чистий ASGI middleware: GUARDED_PREFIXES виконуються в readonly_scope."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+        install()
+
+    async def __call__(self, scope, receive, send):
+        path = scope.get("path", "")
+        if scope["type"] not in ("http", "websocket") or not path.startswith(GUARDED_PREFIXES):
+            return await self.app(scope, receive, send)
+        with readonly_scope(f"{scope.get('method', 'WS')} {path}"):
+            return await self.app(scope, receive, send)
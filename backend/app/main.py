@@ -1,10 +1,71 @@
 # backend/app/main.py
+from contextlib import asynccontextmanager
+from .core.boot import BOOT  # першим — відлік часу старту
+from anyio import to_thread
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+import logging
 import os
+import time
+
+from .core.metrics import LOOP_LAG, METRICS_ENABLED, MetricsMiddleware
+from .core.readonly_guard import GUARD_MODE, ReadOnlyGuardMiddleware
+
+log = logging.getLogger(__name__)
+
+# на read-only файловій системі міграцію робимо при збірці образу (cli config-migrate)
+CONFIG_MIGRATE_ON_START = os.getenv("CONFIG_MIGRATE_ON_START", "1") == "1"
+
+# ---------- 0) Lifespan: міграція конфігу, прогрів, фонові сервіси ----------
+def _warm_up(app: FastAPI) -> None:
+    """Усе, за що інакше заплатив би перший запит. Час кожної фази — у /readyz."""
+    from .services.config_loader import migrate_config, get_snapshot, write_config_cache
+    from .services.calc_engine import compute, get_model
+    from .api.calc import render_config
+
+    if CONFIG_MIGRATE_ON_START:
+        with BOOT.phase("config_migrate"):
+            try:
+                if migrate_config():
+                    log.info("config migrated (defaults / legacy item.N)")
+            except OSError as e:
+                log.warning("config migration skipped: %s", e)
+    with BOOT.phase("config_load"):
+        get_snapshot()       # перший снапшот + mmap лічильника поколінь — до запитів
+    with BOOT.phase("config_cache"):
+        try:
+            BOOT.info["config_cache_written"] = write_config_cache()
+        except OSError as e:  # read-only ФС — просто без кешу
+            log.warning("config cache not written: %s", e)
+    with BOOT.phase("model"):
+        m = get_model()
+        compute({"L": m.min_length, "W": m.min_width, "H": m.min_height}, m)
+        render_config()
+    with BOOT.phase("openapi"):
+        app.openapi()        # перший /docs не будує схему на запиті
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    from .services.history_log import HISTORY
+    from .services.config_events import CONFIG_EVENTS
+    BOOT.phases["import"] = round((time.perf_counter() - BOOT.t0) * 1000, 2)
+    # у потоці threadpool: заодно стартує сам пул (~20 мс, які інакше платив би перший sync-запит)
+    await to_thread.run_sync(_warm_up, app)
+    HISTORY.start()          # no-op, якщо HISTORY_ENABLED не задано
+    if METRICS_ENABLED:
+        LOOP_LAG.start()
+    CONFIG_EVENTS.start()    # SSE /api/calc/config/events: спостерігач поза контекстом запиту
+    BOOT.mark_ready()
+    try:
+        yield
+    finally:
+        await CONFIG_EVENTS.stop()
+        await LOOP_LAG.stop()
+        HISTORY.stop()       # дописуємо чергу перед виходом
 
 # ---------- 1) Створюємо FastAPI ----------
-app = FastAPI(title="BETOOMORE Dashboard API")
+app = FastAPI(title="BETOOMORE Dashboard API", lifespan=lifespan)
 
 # ---------- 2) CORS (можна лишити дефолт у DEV) ----------
 ALLOW_ORIGIN_REGEX = os.getenv("ALLOW_ORIGIN_REGEX", r"https?://.*")
@@ -24,22 +85,47 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# READONLY_GUARD=log|raise — розрахунки не мають права писати у ФС (core/readonly_guard.py)
+if GUARD_MODE != "off":
+    app.add_middleware(ReadOnlyGuardMiddleware)
+
+# METRICS_ENABLED=0 — вимкнути /metrics і лічильники (core/metrics.py); зовнішній шар
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # ---------- 3) Health ----------
 @app.get("/healthz")
 def healthz():
     return {"ok": True}
 
+@app.get("/readyz")
+def readyz():
+    # 503, доки lifespan не прогрів конфіг/модель/OpenAPI
+    return JSONResponse(BOOT.as_dict(), status_code=200 if BOOT.ready else 503)
+
 # ---------- 4) Імпорти роутерів ПІСЛЯ створення app ----------
 # УВАГА: тільки відносні імпорти з поточного пакета 'app'
 from .routers.admin_positions import router as admin_positions_router
 from .routers.admin_groups import router as admin_groups_router
 from .routers.admin_base_routes import router as admin_base_router
 from .api.calc import router as calc_router
+from .api.calc_v2 import router as calc_v2_router, FAST_ROUTE as calc_v2_fast_route
 from .api.admin import router as admin_router
+from .routers.admin_stats import router as admin_stats_router
+from .routers.admin_price_lists import router as admin_price_lists_router
+from .api.metrics import router as metrics_router
+from .api.ws_calc import router as ws_calc_router
 
 # ---------- 5) Підключаємо роутери (порядок важливий, щоб не ловити циклічні імпорти) ----------
 app.include_router(admin_positions_router)
 app.include_router(calc_router)
+app.include_router(calc_v2_router)        # /api/v2/calc (строгий вхід, байти на виході) — для OpenAPI
+app.router.routes.insert(0, calc_v2_fast_route)  # гарячий шлях v2 — першим, повз FastAPI-обгортку
+app.include_router(ws_calc_router)        # /ws/calc (живий розрахунок)
 app.include_router(admin_router)          # /api/admin (логін/токен)
 app.include_router(admin_base_router)     # /api/admin/base (базові ставки)
 app.include_router(admin_groups_router)   # /api/admin/groups (групи/категорії)
+app.include_router(admin_stats_router)    # /api/admin/stats (дашборди з агрегатів)
+app.include_router(admin_price_lists_router)  # /api/admin/price-lists (версії прайсу з датами)
+if METRICS_ENABLED:
+    app.include_router(metrics_router)    # /metrics (Prometheus)
@@ -1,9 +1,16 @@
+import sys
 from logging.config import fileConfig
+from pathlib import Path
 from sqlalchemy import engine_from_config, pool
 from alembic import context
-from ..models.base import Base
-from ..models import coeff, history  # noqa
-from ..core.config import settings
+
+# alembic вантажить env.py як окремий файл, без пакета — тож відносні імпорти
+# не працюють; додаємо корінь репозиторію (де лежить пакет backend) у sys.path
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+
+from backend.app.models.base import Base
+from backend.app.models import coeff, history, rollup, config_store, price_list  # noqa
+from backend.app.core.config import settings
 
 config = context.config
 if config.config_file_name:
@@ -0,0 +1,47 @@
+"""initial: coeff, calc_history
+
+Revision ID: 0001_initial
+Revises:
+Create Date: 2026-10-17
+
+Таблиці могли бути створені раніше через create_all (app.db уже має coeff),
+тому створюємо лише відсутні.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001_initial"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if "coeff" not in existing:
+        op.create_table(
+            "coeff",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("key", sa.String(120), nullable=False),
+            sa.Column("value", sa.Float(), nullable=False),
+            sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        )
+        op.create_index("ix_coeff_key", "coeff", ["key"], unique=True)
+
+    if "calc_history" not in existing:
+        op.create_table(
+            "calc_history",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+            sa.Column("input_json", sa.JSON(), nullable=False),
+            sa.Column("output_json", sa.JSON(), nullable=False),
+            sa.Column("user_id", sa.String(), nullable=True),
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("calc_history")
+    op.drop_index("ix_coeff_key", table_name="coeff")
+    op.drop_table("coeff")
@@ -0,0 +1,40 @@
+"""quote rollups: daily, per option, length buckets
+
+Revision ID: 0002_quote_rollups
+Revises: 0001_initial
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0002_quote_rollups"
+down_revision = "0001_initial"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "quote_rollup_daily",
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("quotes", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("total_sum", sa.BigInteger(), nullable=False, server_default="0"),
+    )
+    op.create_table(
+        "quote_rollup_option",
+        sa.Column("position", sa.String(255), primary_key=True),
+        sa.Column("quotes", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("total_sum", sa.BigInteger(), nullable=False, server_default="0"),
+    )
+    op.create_table(
+        "quote_rollup_length",
+        sa.Column("bucket", sa.Integer(), primary_key=True),
+        sa.Column("quotes", sa.BigInteger(), nullable=False, server_default="0"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("quote_rollup_length")
+    op.drop_table("quote_rollup_option")
+    op.drop_table("quote_rollup_daily")
@@ -0,0 +1,36 @@
+"""config store: config_entry, config_state
+
+Revision ID: 0003_config_store
+Revises: 0002_quote_rollups
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0003_config_store"
+down_revision = "0002_quote_rollups"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "config_entry",
+        sa.Column("section", sa.String(120), primary_key=True),
+        sa.Column("key", sa.String(120), primary_key=True),
+        sa.Column("value", sa.Text(), nullable=False, server_default=""),
+        sa.Column("seq", sa.Integer(), nullable=False, server_default="0"),
+    )
+    state = op.create_table(
+        "config_state",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("version", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    op.bulk_insert(state, [{"id": 1, "version": 0}])
+
+
+def downgrade() -> None:
+    op.drop_table("config_state")
+    op.drop_table("config_entry")
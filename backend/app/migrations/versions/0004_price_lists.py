@@ -0,0 +1,32 @@
+"""price lists: price_list_version
+
+Revision ID: 0004_price_lists
+Revises: 0003_config_store
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0004_price_lists"
+down_revision = "0003_config_store"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "price_list_version",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("effective_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("price_high", sa.Integer(), nullable=False),
+        sa.Column("price_low", sa.Integer(), nullable=False),
+        sa.Column("note", sa.String(255), nullable=False, server_default=""),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    op.create_index("ix_price_list_version_effective_at", "price_list_version", ["effective_at"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_price_list_version_effective_at", table_name="price_list_version")
+    op.drop_table("price_list_version")
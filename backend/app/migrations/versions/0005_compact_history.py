@@ -0,0 +1,47 @@
+"""compact history: config_snapshot, quote_history
+
+Revision ID: 0005_compact_history
+Revises: 0004_price_lists
+Create Date: 2026-10-17
+
+Старі рядки calc_history лишаються як є; перенести їх —
+`python -m backend.app.cli history-compact`.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0005_compact_history"
+down_revision = "0004_price_lists"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "config_snapshot",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("digest", sa.String(64), nullable=False, unique=True),
+        sa.Column("body", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    op.create_table(
+        "quote_history",
+        sa.Column("id", sa.BigInteger().with_variant(sa.Integer(), "sqlite"), primary_key=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("config_id", sa.Integer(), sa.ForeignKey("config_snapshot.id"), nullable=False),
+        sa.Column("L", sa.Integer(), nullable=False),
+        sa.Column("W", sa.Integer(), nullable=False),
+        sa.Column("H", sa.Integer(), nullable=False),
+        sa.Column("position_idx", sa.SmallInteger(), nullable=False),
+        sa.Column("total", sa.Integer(), nullable=False),
+        sa.Column("options", sa.JSON(), nullable=True),
+        sa.Column("user_id", sa.String(64), nullable=True),
+    )
+    op.create_index("ix_quote_history_created_at", "quote_history", ["created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_quote_history_created_at", table_name="quote_history")
+    op.drop_table("quote_history")
+    op.drop_table("config_snapshot")
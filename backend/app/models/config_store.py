@@ -0,0 +1,19 @@
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import String, Text, Integer, BigInteger, DateTime, func
+from ..models.base import Base
+
+# Конфіг калькулятора в БД (CONFIG_SOURCE=db): ті самі секції/ключі, що й у config.ini
+
+class ConfigEntry(Base):
+    __tablename__ = "config_entry"
+    section: Mapped[str] = mapped_column(String(120), primary_key=True)
+    key: Mapped[str] = mapped_column(String(120), primary_key=True)
+    value: Mapped[str] = mapped_column(Text, default="")
+    seq: Mapped[int] = mapped_column(Integer, default=0)   # порядок як у файлі
+
+class ConfigState(Base):
+    __tablename__ = "config_state"
+    id: Mapped[int] = mapped_column(primary_key=True)       # завжди один рядок, id=1
+    version: Mapped[int] = mapped_column(BigInteger, default=0)
+    updated_at: Mapped["DateTime"] = mapped_column(DateTime(timezone=True),
+        server_default=func.now(), onupdate=func.now())
@@ -1,7 +1,10 @@
+from datetime import datetime
 from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import DateTime, func, JSON
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Integer, SmallInteger, String, Text, func, JSON
 from ..models.base import Base
 
+# Старий журнал: повні JSON входу/виходу на кожен розрахунок. Нові записи йдуть у
+# quote_history; перенести старі — `python -m backend.app.cli history-compact`.
 class CalcHistory(Base):
     __tablename__ = "calc_history"
     id: Mapped[int] = mapped_column(primary_key=True)
@@ -10,3 +13,26 @@ class CalcHistory(Base):
     input_json: Mapped[dict] = mapped_column(JSON)
     output_json: Mapped[dict] = mapped_column(JSON)
     user_id: Mapped[str | None] = mapped_column(default=None)
+
+# Модель ціноутворення, якою рахували: JSON bundle (services/pricing_bundle.py),
+# адресований його ж версією — кожен різний конфіг/прайс зберігається один раз
+class StoredConfig(Base):
+    __tablename__ = "config_snapshot"
+    id: Mapped[int] = mapped_column(primary_key=True)
+    digest: Mapped[str] = mapped_column(String(64), unique=True)
+    body: Mapped[str] = mapped_column(Text)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+# Компактний журнал: лише типізовані колонки + посилання на конфіг
+class QuoteRecord(Base):
+    __tablename__ = "quote_history"
+    id: Mapped[int] = mapped_column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
+    config_id: Mapped[int] = mapped_column(ForeignKey("config_snapshot.id"))
+    L: Mapped[int] = mapped_column(Integer)
+    W: Mapped[int] = mapped_column(Integer)
+    H: Mapped[int] = mapped_column(Integer)
+    position_idx: Mapped[int] = mapped_column(SmallInteger)   # номер у sorted(position_bp) конфігу; -1 — без опції
+    total: Mapped[int] = mapped_column(Integer)               # price_total, грн
+    options: Mapped[dict | None] = mapped_column(JSON(none_as_null=True), default=None)  # {група: [пункти]}; NULL — без опцій
+    user_id: Mapped[str | None] = mapped_column(String(64), default=None)
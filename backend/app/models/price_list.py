@@ -0,0 +1,15 @@
+from datetime import datetime
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import String, Integer, DateTime, func
+from ..models.base import Base
+
+# Версії прайсу з датою набуття чинності: рядки не змінюються, нова ціна — новий рядок
+
+class PriceListVersion(Base):
+    __tablename__ = "price_list_version"
+    id: Mapped[int] = mapped_column(primary_key=True)
+    effective_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), unique=True, index=True)
+    price_high: Mapped[int] = mapped_column(Integer)
+    price_low: Mapped[int] = mapped_column(Integer)
+    note: Mapped[str] = mapped_column(String(255), default="")
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
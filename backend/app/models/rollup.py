@@ -0,0 +1,23 @@
+from datetime import date
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import Date, String, Integer, BigInteger
+from ..models.base import Base
+
+# Агрегати по журналу розрахунків (quote_history + стара calc_history), які оновлюються інкрементально разом із кожною пачкою історії
+
+class QuoteDaily(Base):
+    __tablename__ = "quote_rollup_daily"
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    quotes: Mapped[int] = mapped_column(BigInteger, default=0)
+    total_sum: Mapped[int] = mapped_column(BigInteger, default=0)   # сума price_total, грн
+
+class QuoteOption(Base):
+    __tablename__ = "quote_rollup_option"
+    position: Mapped[str] = mapped_column(String(255), primary_key=True)  # "" — без опції
+    quotes: Mapped[int] = mapped_column(BigInteger, default=0)
+    total_sum: Mapped[int] = mapped_column(BigInteger, default=0)
+
+class QuoteLengthBucket(Base):
+    __tablename__ = "quote_rollup_length"
+    bucket: Mapped[int] = mapped_column(Integer, primary_key=True)  # нижня межа кошика, мм
+    quotes: Mapped[int] = mapped_column(BigInteger, default=0)
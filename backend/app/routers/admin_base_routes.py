@@ -28,4 +28,7 @@ def update_base(payload: dict):
     Оновити базові ставки.
     Очікуємо будь-яку підмножину ключів: rounding(str), price_high(int), price_low(int).
     """
-    return set_base(payload)
+    try:
+        return set_base(payload)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -1,12 +1,13 @@
 from __future__ import annotations
 from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from typing import List, Literal
 from .admin_base import admin_token_required
 from ..utils import list_groups, save_group, delete_group, get_group
 
 router = APIRouter(prefix="/api/admin/groups", tags=["admin:groups"])
 
+# mul: +value %; div: ділення на (1 + value/100); add/sub: ±value грн (див. calc_engine._OPS)
 Op = Literal["mul", "add", "sub", "div"]
 
 class GroupItem(BaseModel):
@@ -14,6 +15,12 @@ class GroupItem(BaseModel):
     op: Op = "mul"
     value: float = 0
 
+    @model_validator(mode="after")
+    def _divisor_positive(self):
+        if self.op == "div" and self.value <= -100:
+            raise ValueError("div value must be greater than -100 (divisor 1 + value/100 > 0)")
+        return self
+
 class GroupPayload(BaseModel):
     name: str = Field(min_length=1)  # id == name
     mode: Literal["single", "multi"] = "single"
@@ -1,11 +1,7 @@
 # app/routers/admin_positions.py
 from fastapi import APIRouter, Depends, HTTPException, Header
 from pydantic import BaseModel, Field, validator
-from configparser import ConfigParser
-from pathlib import Path
-from ..utils import read_ini, write_ini
-
-CONFIG_PATH = Path("config.ini")
+from ..services.config_loader import get_snapshot, update_positions
 
 def verify_admin(x_admin_token: str = Header(..., alias="X-Admin-Token")):
     # TODO: підстав свій реальний спосіб перевірки (env/конфіг тощо)
@@ -20,6 +16,12 @@ class PositionItem(BaseModel):
     name: str = Field(..., min_length=1, max_length=128)
     percent: float
 
+    @validator("name")
+    def plain_name(cls, v):
+        if "|" in v:  # роздільник у item.N = "назва|op|значення"
+            raise ValueError("name must not contain '|'")
+        return v.strip()
+
     @validator("percent")
     def clamp_percent(cls, v):
         if v < -100 or v > 1000:
@@ -28,27 +30,17 @@ class PositionItem(BaseModel):
 
 router = APIRouter(prefix="/api/admin/positions", tags=["admin-positions"])
 
+# Опції кольору — це пункти group:colors (їх і читає калькулятор); тут лише
+# зручний словник {назва: %} поверх них.
+
 def _load_positions() -> dict[str, float]:
-    cfg = ConfigParser()
-    cfg.read(CONFIG_PATH, encoding="utf-8")
-    if not cfg.has_section("positions"):
-        return {}
-    return {k: cfg.getfloat("positions", k) for k in cfg["positions"]}
+    return dict(get_snapshot().settings.positions)
 
 def _save_positions(data: dict[str, float]):
-    cfg = ConfigParser()
-    cfg.read(CONFIG_PATH, encoding="utf-8")
-    if not cfg.has_section("positions"):
-        cfg.add_section("positions")
-    # атомарний перезапис секції
-    for k in list(cfg["positions"].keys()):
-        cfg.remove_option("positions", k)
-    for k, v in data.items():
-        cfg.set("positions", k, str(v))
-    tmp = CONFIG_PATH.with_suffix(".ini.tmp")
-    with tmp.open("w", encoding="utf-8") as f:
-        cfg.write(f)
-    tmp.replace(CONFIG_PATH)
+    def _replace(cur: dict[str, float]) -> None:
+        cur.clear()
+        cur.update(data)
+    update_positions(_replace)
 
 @router.get("", dependencies=[Depends(verify_admin)])
 def list_positions():
@@ -67,16 +59,17 @@ def replace_positions(payload: dict[str, float]):
 
 @router.post("", dependencies=[Depends(verify_admin)])
 def upsert_position(item: PositionItem):
-    data = _load_positions()
-    data[item.name] = item.percent
-    _save_positions(data)
+    update_positions(lambda data: data.__setitem__(item.name, item.percent))
     return {"ok": True}
 
 @router.delete("/{name}", dependencies=[Depends(verify_admin)])
 def delete_position(name: str):
-    data = _load_positions()
-    if name not in data:
+    def _drop(data: dict[str, float]) -> None:
+        if name not in data:
+            raise KeyError(name)
+        del data[name]
+    try:
+        update_positions(_drop)
+    except KeyError:
         raise HTTPException(404, "not found")
-    del data[name]
-    _save_positions(data)
     return {"ok": True}
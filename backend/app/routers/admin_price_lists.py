@@ -0,0 +1,51 @@
+# backend/app/routers/admin_price_lists.py
+from __future__ import annotations
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel, Field
+from .admin_base import admin_token_required
+from ..services import price_lists
+
+router = APIRouter(prefix="/api/admin/price-lists", tags=["admin:price-lists"])
+
+# Версії прайсу з датою набуття чинності (services/price_lists.py).
+# Незмінні: нову ціну додаємо новою версією, скасувати можна лише заплановану.
+
+class PriceListPayload(BaseModel):
+    price_high: int = Field(gt=0)
+    price_low: int = Field(gt=0)
+    effective_at: Optional[datetime] = None   # None — з цієї миті; без зони — UTC
+    note: str = Field("", max_length=255)
+
+def _enabled() -> None:
+    if not price_lists.PRICE_LISTS_ENABLED:
+        raise HTTPException(400, "price lists are disabled (set PRICE_LISTS_ENABLED=1)")
+
+@router.get("", dependencies=[Depends(admin_token_required)])
+def price_lists_list():
+    """Усі версії за effective_at + id чинної зараз (null — діють ставки з [base])."""
+    _enabled()
+    idx = price_lists.load_index()
+    active = idx.at()
+    return {"active": active.id if active else None, "items": [p.as_dict() for p in idx.lists]}
+
+@router.post("", dependencies=[Depends(admin_token_required)])
+def price_lists_create(payload: PriceListPayload):
+    _enabled()
+    try:
+        pl = price_lists.create_price_list(payload.price_high, payload.price_low,
+                                           payload.effective_at, payload.note)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    return pl.as_dict()
+
+@router.delete("/{list_id}", dependencies=[Depends(admin_token_required)])
+def price_lists_delete(list_id: int):
+    _enabled()
+    try:
+        if not price_lists.delete_price_list(list_id):
+            raise HTTPException(404, "Price list not found")
+    except ValueError as e:
+        raise HTTPException(409, str(e))
+    return {"ok": True}
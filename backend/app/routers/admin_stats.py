@@ -0,0 +1,32 @@
+# backend/app/routers/admin_stats.py
+from fastapi import APIRouter, Depends, Query
+from .admin_base import admin_token_required
+
+router = APIRouter(prefix="/api/admin/stats", tags=["admin:stats"])
+
+# Дашборди читають лише агрегатні таблиці (див. services/rollups.py).
+# SQLAlchemy/engine імпортуємо в хендлерах: старт не платить за БД, якої калькулятору не треба.
+
+@router.get("/daily", dependencies=[Depends(admin_token_required)])
+def stats_daily(days: int = Query(30, ge=1, le=3660)):
+    """Кількість розрахунків і середня сума по днях."""
+    from ..core.db import SessionLocal
+    from ..services import rollups
+    with SessionLocal() as s:
+        return rollups.read_daily(s, days)
+
+@router.get("/options", dependencies=[Depends(admin_token_required)])
+def stats_options():
+    """Кількість і середня сума по опціях кольору."""
+    from ..core.db import SessionLocal
+    from ..services import rollups
+    with SessionLocal() as s:
+        return rollups.read_options(s)
+
+@router.get("/lengths", dependencies=[Depends(admin_token_required)])
+def stats_lengths():
+    """Розподіл довжин по кошиках."""
+    from ..core.db import SessionLocal
+    from ..services import rollups
+    with SessionLocal() as s:
+        return rollups.read_lengths(s)
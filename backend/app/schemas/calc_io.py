@@ -1,5 +1,10 @@
-from pydantic import BaseModel, Field, PositiveInt
-from typing import Dict, Optional
+from datetime import datetime
+from pydantic import BaseModel, ConfigDict, Field, PlainSerializer, PositiveInt
+from typing import Annotated, Dict, List, Optional
+
+# момент, на який рахувати (версії прайсу, services/price_lists.py); у model_dump — ISO-рядок,
+# щоб вхід можна було покласти в JSON історії як є
+AsOf = Annotated[datetime, PlainSerializer(lambda d: d.isoformat(), return_type=str)]
 
 class CalcInput(BaseModel):
     L: Optional[int] = None
@@ -9,6 +14,9 @@ class CalcInput(BaseModel):
     width: Optional[int] = None
     height: Optional[int] = None
     position: Optional[str] = None  # назва вибраної опції кольору
+    # інші групи: {"edge": "фаска", "mounting": ["кронштейн", "анкер"]} — single: рядок, multi: список
+    options: Optional[Dict[str, List[str] | str]] = None
+    as_of: Optional[AsOf] = None  # None — ціни, чинні зараз
 
 class CalcOutput(BaseModel):
     price_per_meter: float
@@ -18,8 +26,46 @@ class CalcOutput(BaseModel):
     surcharge_color_percent: float
     surcharge_color_amount: float
     price_total: int
+    surcharge_options: Dict[str, float] = Field(default_factory=dict)  # група → сума, грн
 
 class CalcConfig(BaseModel):
     variables: Dict[str, float | int | str]   # тут буде і 'rounding'
     price_per_meter: Dict[str, float]         # {"high":..., "low":...}
     positions: Dict[str, float]
+    groups: List[dict] = []                   # інші групи опцій (id, name, mode, items)
+
+# ---------- v2 (/api/v2/calc/compute): строгий вхід без аліасів ----------
+
+class CalcInputV2(BaseModel):
+    # strict: лише JSON-цілі (без "12", 12.0), без зайвих ключів
+    model_config = ConfigDict(strict=True, extra="forbid")
+
+    L: int = Field(ge=0)
+    W: int = Field(0, ge=0)
+    H: int = Field(0, ge=0)
+    position: str = ""
+    options: Dict[str, List[str] | str] = Field(default_factory=dict)
+    as_of: Optional[AsOf] = None
+
+# ---------- Пакетний розрахунок (/api/calc/compute/batch) ----------
+
+class CalcBatchInput(BaseModel):
+    # колонки однакової довжини; W/H/position можна передати одним значенням на всі рядки
+    L: List[int]
+    W: List[int] | int | None = None
+    H: List[int] | int | None = None
+    position: List[str] | str | None = None
+    # інші групи опцій: один {група: пункт | [пункти]} на всі рядки або список по рядках (null — без опцій)
+    options: List[Optional[Dict[str, List[str] | str]]] | Dict[str, List[str] | str] | None = None
+    as_of: Optional[AsOf] = None  # один момент на всю пачку; None — ціни, чинні зараз
+
+class CalcBatchOutput(BaseModel):
+    count: int
+    price_per_meter: List[float]
+    price_base: List[int]
+    surcharge_width: List[float]
+    surcharge_height: List[float]
+    surcharge_color_percent: List[float]
+    surcharge_color_amount: List[float]
+    price_total: List[int]
+    surcharge_options: List[Dict[str, float]]
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""
+Пакетне ціноутворення файлів замовлень (CSV або JSONL).
+
+Файл читається рядок за рядком, рядки рахуються шматками по одній моделі
+і одразу кодуються у NDJSON:
+    {"row": 1, "ok": true, "id": "...", "result": {...CalcOutput...}}
+    {"row": 2, "ok": false, "error": "..."}
+    ...
+    {"summary": {"rows": ..., "ok": ..., "errors": ..., "seconds": ..., "rows_per_s": ...}}
+
+Для розбору використовуємо сам compute(), тож працюють усі його аліаси
+(L/length/dimensions.L, position/color/colors, коми у числах).
+У CSV вкладені ключі пишемо через крапку: "dimensions.L".
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import time
+from dataclasses import dataclass, field
+from typing import Iterator, TextIO
+
+from .calc_engine import PricingModel, compute, get_model
+
+CHUNK_ROWS = 1000
+
+@dataclass
+class BulkStats:
+    rows: int = 0
+    ok: int = 0
+    errors: int = 0
+    started: float = field(default_factory=time.perf_counter)
+    finished: float | None = None
+
+    @property
+    def seconds(self) -> float:
+        return (self.finished or time.perf_counter()) - self.started
+
+    def as_dict(self) -> dict:
+        sec = self.seconds
+        return {
+            "rows": self.rows,
+            "ok": self.ok,
+            "errors": self.errors,
+            "seconds": round(sec, 3),
+            "rows_per_s": round(self.rows / sec, 1) if sec > 0 else None,
+        }
+
+# ------------------------------ Розбір ------------------------------ #
+
+def _nest(flat: dict) -> dict:
+    """{"dimensions.L": "700"} → {"dimensions": {"L": "700"}}."""
+    out: dict = {}
+    for k, v in flat.items():
+        if k is None:
+            continue  # зайві комірки рядка без заголовка
+        k = k.strip()
+        if "." in k:
+            head, tail = k.split(".", 1)
+            sub = out.setdefault(head, {})
+            if isinstance(sub, dict):
+                sub[tail] = v
+        else:
+            out[k] = v
+    return out
+
+def iter_records(src: TextIO, fmt: str) -> Iterator[tuple[int, dict | None, str | None]]:
+    """(номер рядка даних, запис або None, помилка або None) — по одному за раз."""
+    if fmt == "csv":
+        reader = csv.DictReader(src)
+        for n, row in enumerate(reader, start=1):
+            yield n, _nest(row), None
+    elif fmt == "jsonl":
+        n = 0
+        for line in src:
+            if not line.strip():
+                continue
+            n += 1
+            try:
+                rec = json.loads(line)
+            except ValueError as e:
+                yield n, None, f"invalid JSON: {e}"
+                continue
+            if not isinstance(rec, dict):
+                yield n, None, "row must be a JSON object"
+                continue
+            yield n, rec, None
+    else:
+        raise ValueError("format must be csv|jsonl")
+
+# --------------------------- Розрахунок ---------------------------- #
+
+def _price_one(n: int, rec: dict | None, err: str | None, m: PricingModel) -> dict:
+    if err is None:
+        try:
+            res = compute(rec, m)
+            if res.price_base <= 0:
+                err = "length is missing or zero"
+        except Exception as e:
+            err = str(e) or e.__class__.__name__
+    out: dict = {"row": n, "ok": err is None}
+    rid = rec.get("id") if rec else None
+    if rid is not None:
+        out["id"] = rid
+    if err is None:
+        out["result"] = res.model_dump()
+    else:
+        out["error"] = err
+    return out
+
+def price_stream(src: TextIO, fmt: str, stats: BulkStats | None = None,
+                 model: PricingModel | None = None) -> Iterator[bytes]:
+    """
+    NDJSON-байти результатів шматками по CHUNK_ROWS рядків + підсумковий рядок.
+    Пам'ять — O(CHUNK_ROWS) незалежно від розміру файлу.
+    """
+    m = model or get_model()
+    st = stats or BulkStats()
+    dumps = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+    buf: list[str] = []
+    for n, rec, err in iter_records(src, fmt):
+        r = _price_one(n, rec, err, m)
+        st.rows += 1
+        if r["ok"]:
+            st.ok += 1
+        else:
+            st.errors += 1
+        buf.append(dumps(r))
+        if len(buf) >= CHUNK_ROWS:
+            yield ("\n".join(buf) + "\n").encode("utf-8")
+            buf.clear()
+    st.finished = time.perf_counter()
+    buf.append(dumps({"summary": {**st.as_dict(), "config_version": m.version}}))
+    yield ("\n".join(buf) + "\n").encode("utf-8")
+
+def detect_format(name_or_type: str | None) -> str:
+    """csv|jsonl за розширенням файлу або Content-Type."""
+    s = (name_or_type or "").lower()
+    return "jsonl" if ("json" in s or s.endswith(".ndjson")) else "csv"
@@ -1,25 +1,264 @@
-from math import ceil
-from decimal import Decimal, ROUND_HALF_UP
+import logging
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Mapping
 from ..schemas.calc_io import CalcInput, CalcOutput
-from ..services.config_loader import load_settings
+from ..services.config_loader import ConfigSnapshot, Group, get_snapshot
+from .money import DEFAULT_ROUNDING, ROUNDING, div_half_even, to_bp, to_kop
+from .price_lists import PriceList, as_timestamp
 
-def _interpolate_price_per_meter(length_mm: float) -> float:
-    s = load_settings()
-    if length_mm < s.min_length:
-        return s.price_per_meter_high
-    if length_mm <= s.max_length:
-        delta = (s.price_per_meter_high - s.price_per_meter_low) / (s.max_length - s.min_length)
-        return s.price_per_meter_high - (length_mm - s.min_length) * delta
-    return s.price_per_meter_low
+log = logging.getLogger(__name__)
 
-def _round_nearest_10(x: float) -> int:
-    d = (Decimal(str(x)) / Decimal("10")).quantize(Decimal("0"), rounding=ROUND_HALF_UP)
-    return int(d * Decimal("10"))
+# ревізія математики quote(): міняти при будь-якій зміні формул/округлення —
+# клієнтські реалізації (frontend/src/lib/pricing.ts) звіряються з нею
+ENGINE_REVISION = 4
 
-def _round_ceil_10(x: float) -> int:
-    return int(ceil(x / 10.0) * 10)
+# ------------------------- Групи опцій ------------------------- #
+#
+# Кожна group:* (крім colors — це старі positions, див. нижче) компілюється
+# в CompiledGroup: для кожного пункту — трійка (bp, коп., dbp) у цілих одиницях
+# (money.to_bp / money.to_kop). Оператори пункту:
+#   mul → +value %               (running × (1 + value/100))
+#   div → ділення на 1 + value/100 (running / (1 + value/100); value > −100)
+#   add → +value грн             sub → −value грн
+# Вибрані групи застосовуються по черзі (порядок секцій у конфігу) до
+# поточної суми після кольору:
+#   amount = running * (bp − dbp) / (10000 + dbp) + коп.;  running += amount
+# тобто running × (1 + bp/10⁴) / (1 + dbp/10⁴) − running; без div (dbp = 0) це
+# просто running * bp / 10000 (amount — до копійки, половини до парного).
+# У multi-групі вибрані пункти сумуються: (Σbp, Σкоп., Σdbp) — два div-пункти
+# по 20 % ділять на 1.4. Для груп до MULTI_TABLE_MAX пунктів ці суми
+# пораховані наперед для всіх підмножин (таблиця за бітовою маскою) —
+# розрахунок лишається O(вибраних пунктів).
 
-def compute(payload):
+MULTI_TABLE_MAX = 10
+
+# op → множники (bp, коп., dbp) для value пункту; невідомий op — як mul (так його читає лоадер)
+_OPS = {"mul": (1, 0, 0), "div": (0, 0, 1), "add": (0, 1, 0), "sub": (0, -1, 0)}
+
+Options = tuple[tuple[str, tuple[str, ...]], ...]  # ((група, (пункти…)), …) — відсортовано
+
+@dataclass(frozen=True, slots=True)
+class CompiledGroup:
+    id: str
+    order: int
+    multi: bool
+    index: Mapping[str, int]                   # назва пункту → номер
+    factors: tuple[tuple[int, int, int], ...]  # номер → (bp, коп., dbp)
+    table: tuple[tuple[int, int, int], ...]    # multi: маска → (Σbp, Σкоп., Σdbp); () якщо пунктів забагато
+
+    def select(self, names: tuple[str, ...]) -> tuple[int, int, int] | None:
+        """(bp, коп., dbp) для вибору; None — якщо жоден пункт не впізнано."""
+        idx = self.index
+        if not self.multi:
+            for nm in names:
+                i = idx.get(nm)
+                if i is not None:
+                    return self.factors[i]
+            return None
+        hits = {idx[nm] for nm in names if nm in idx}
+        if not hits:
+            return None
+        if self.table:
+            mask = 0
+            for i in hits:
+                mask |= 1 << i
+            return self.table[mask]
+        bp = kop = dbp = 0
+        for i in hits:
+            p, c, d = self.factors[i]
+            bp += p
+            kop += c
+            dbp += d
+        return bp, kop, dbp
+
+def _subset_table(factors: tuple[tuple[int, int, int], ...]) -> tuple[tuple[int, int, int], ...]:
+    table = [(0, 0, 0)] * (1 << len(factors))
+    for mask in range(1, len(table)):
+        low = mask & -mask
+        p, c, d = table[mask ^ low]
+        fp, fc, fd = factors[low.bit_length() - 1]
+        table[mask] = (p + fp, c + fc, d + fd)
+    return tuple(table)
+
+def compile_group(g: Group, order: int) -> CompiledGroup:
+    index: dict[str, int] = {}
+    factors: list[tuple[int, int, int]] = []
+    for it in g.items:
+        if it.name in index:
+            continue  # дубль назви — діє перший пункт
+        kp, kf, kd = _OPS.get(it.op, _OPS["mul"])
+        if kd and to_bp(it.value) <= -10000:
+            log.warning("group %s: item %r div %s ignored (divisor must be > 0)", g.id, it.name, it.value)
+            kd = 0
+        index[it.name] = len(factors)
+        factors.append((kp * to_bp(it.value), kf * to_kop(it.value), kd * to_bp(it.value)))
+    multi = g.mode == "multi"
+    if multi and 10000 + sum(d for _, _, d in factors if d < 0) <= 0:
+        # усі від'ємні div разом дали б дільник ≤ 0 — не застосовуємо їх
+        log.warning("group %s: negative div items together make the divisor <= 0, ignored", g.id)
+        factors = [(p, c, d if d >= 0 else 0) for p, c, d in factors]
+    f = tuple(factors)
+    return CompiledGroup(
+        id=g.id,
+        order=order,
+        multi=multi,
+        index=index,
+        factors=f,
+        table=_subset_table(f) if multi and len(f) <= MULTI_TABLE_MAX else (),
+    )
+
+def _apply_groups(running: int, options: Options, m: "PricingModel") -> tuple[int, dict[str, float]]:
+    """running — копійки після кольору; → (копійки після груп, {група: сума в грн})."""
+    groups = m.groups
+    picked = [(g, names) for gid, names in options if (g := groups.get(gid)) is not None]
+    picked.sort(key=lambda t: t[0].order)
+    amounts: dict[str, float] = {}
+    for g, names in picked:
+        f = g.select(names)
+        if f is None:
+            continue
+        bp, kop, dbp = f
+        amount = div_half_even(running * (bp - dbp), 10000 + dbp) + kop
+        running += amount
+        amounts[g.id] = amount / 100
+    return running, amounts
+
+# ---------------------- Скомпільована модель ---------------------- #
+
+@dataclass(frozen=True, slots=True)
+class PricingModel:
+    """
+    Все, що потрібно compute(), пораховане один раз на версію конфігу:
+    параметри інтерполяції, ставки в копійках/bp, прив'язана функція округлення.
+
+    Ціна за метр на довжині L — точний дріб ppm_num(L) / span_den, де
+    span_den = max_length − min_length (або 1, якщо діапазон вироджений чи
+    перевернутий: div_half_even потребує додатного знаменника).
+    """
+    version: int
+    min_length: int
+    max_length: int
+    min_width: int
+    min_height: int
+    extra_price: float
+    extra_kop: int                     # extra_price у копійках
+    price_high: int
+    price_low: int
+    span_den: int                      # знаменник ціни за метр
+    drop: int                          # price_high − price_low
+    positions: Mapping[str, float]     # назва опції кольору → % (= bp / 100)
+    position_bp: Mapping[str, int]     # назва опції кольору → bp
+    groups: Mapping[str, CompiledGroup]  # інші групи опцій: id → скомпільована група
+    rounding_mode: str
+    round_total: Callable[[int], int]  # копійки → цілі грн (money.ROUNDING)
+    price_list: int = 0                # id версії прайсу (services/price_lists.py); 0 — ставки з [base]
+
+def compile_model(snap: ConfigSnapshot, pl: PriceList | None = None) -> PricingModel:
+    """pl — версія прайсу, чиї ціни за метр замінюють [base]."""
+    s = snap.settings
+    high = pl.price_high if pl else s.price_per_meter_high
+    low = pl.price_low if pl else s.price_per_meter_low
+    mode = s.rounding_mode
+    if mode not in ROUNDING:
+        # адмінка такого не збереже; старий/ручний конфіг — поводимось як раніше
+        log.warning("unknown rounding mode %r in config, using %s", mode, DEFAULT_ROUNDING)
+        mode = DEFAULT_ROUNDING
+    position_bp = {name: to_bp(pct) for name, pct in s.positions.items()}
+    if s.min_length > s.max_length:
+        # адмінка такого не збереже; ручний конфіг — до min_length high, далі low
+        log.warning("min_length %s > max_length %s in config, no interpolation", s.min_length, s.max_length)
+    return PricingModel(
+        version=snap.version,
+        min_length=s.min_length,
+        max_length=s.max_length,
+        min_width=s.min_width,
+        min_height=s.min_height,
+        extra_price=s.extra_price,
+        extra_kop=to_kop(s.extra_price),
+        price_high=high,
+        price_low=low,
+        span_den=max(s.max_length - s.min_length, 1),
+        drop=high - low,
+        positions={name: bp / 100 for name, bp in position_bp.items()},
+        position_bp=position_bp,
+        groups={g.id: compile_group(g, i) for i, g in enumerate(s.groups)},
+        rounding_mode=mode,
+        round_total=ROUNDING[mode],
+        price_list=pl.id if pl else 0,
+    )
+
+# Скомпільовані моделі за (версія снапшота, id версії прайсу): чинна зараз —
+# у _MODEL (перевірка без блокування), решта (as_of у минуле/майбутнє) — LRU
+# на PRICE_MODEL_CACHE записів; компілюються лише при першому зверненні.
+PRICE_MODEL_CACHE = int(os.getenv("PRICE_MODEL_CACHE", "16"))
+
+_MODEL: PricingModel | None = None
+_MODELS: OrderedDict[tuple[int, int], PricingModel] = OrderedDict()
+_MODELS_LOCK = threading.Lock()
+
+def _cached_model(snap: ConfigSnapshot, pl: PriceList | None) -> PricingModel:
+    key = (snap.version, pl.id if pl else 0)
+    with _MODELS_LOCK:
+        m = _MODELS.get(key)
+        if m is not None:
+            _MODELS.move_to_end(key)
+            return m
+    m = compile_model(snap, pl)
+    with _MODELS_LOCK:
+        _MODELS[key] = m
+        while len(_MODELS) > max(1, PRICE_MODEL_CACHE):
+            _MODELS.popitem(last=False)
+    return m
+
+def model_for(snap: ConfigSnapshot, as_of=None) -> PricingModel:
+    """
+    Модель для снапшота на момент as_of (datetime / ISO-рядок / unix-час;
+    None — зараз). Версію прайсу шукаємо в індексі снапшота (bisect), без БД.
+    """
+    global _MODEL
+    pl = snap.prices.at(as_timestamp(as_of)) if snap.prices else None
+    pid = pl.id if pl else 0
+    m = _MODEL
+    if m is not None and m.version == snap.version and m.price_list == pid:
+        return m
+    m = _cached_model(snap, pl)
+    if as_of is None:
+        _MODEL = m
+    return m
+
+def get_model(as_of=None) -> PricingModel:
+    """Модель для поточної версії конфігу (на момент as_of або зараз)."""
+    return model_for(get_snapshot(), as_of)
+
+# ---------------------------- Розрахунок ---------------------------- #
+
+def _ppm_num(L: int, m: PricingModel) -> int:
+    """Чисельник ціни за метр (грн) над m.span_den — точний, без float."""
+    if L < m.min_length:
+        return m.price_high * m.span_den
+    if L <= m.max_length:
+        return m.price_high * m.span_den - (L - m.min_length) * m.drop
+    return m.price_low * m.span_den
+
+def _interpolate_price_per_meter(length_mm: float, model: PricingModel | None = None) -> float:
+    """Ціна за метр у грн, до копійки."""
+    m = model or get_model()
+    return div_half_even(_ppm_num(int(length_mm), m) * 100, m.span_den) / 100
+
+def _to_int(x, default=0):
+    try:
+        return int(float(str(x).replace(",", ".")))
+    except Exception:
+        return default
+
+def normalize_input(payload) -> tuple[int, int, int, str]:
+    """
+    Вхід у будь-якому з підтримуваних форматів → (L, W, H, назва опції).
+    Приймає pydantic-модель або dict з аліасами (L/length/dimensions.L, position/color/colors).
+    """
     # 1) нормалізуємо в dict
     if hasattr(payload, "model_dump"):
         payload = payload.model_dump()
@@ -28,57 +267,146 @@ def compute(payload):
     if isinstance(payload, list):
         raise ValueError("payload must be object, not list")
 
-    s = load_settings()
-
     # 2) читаємо розміри з кількох можливих назв (і з вкладеного 'dimensions', якщо є)
-    def to_int(x, default=0):
-        try:
-            return int(float(str(x).replace(",", ".")))
-        except Exception:
-            return default
-
     dims = payload.get("dimensions") if isinstance(payload.get("dimensions"), dict) else {}
-    L = to_int(
+    L = _to_int(
         payload.get("L") or payload.get("l") or payload.get("length") or dims.get("L") or dims.get("length")
     )
-    W = to_int(
+    W = _to_int(
         payload.get("W") or payload.get("w") or payload.get("width")  or dims.get("W") or dims.get("width")
     )
-    H = to_int(
+    H = _to_int(
         payload.get("H") or payload.get("h") or payload.get("height") or dims.get("H") or dims.get("height")
     )
 
-    ppm = _interpolate_price_per_meter(L)
-    price_base = round(ppm * L / 1000)
-
-    surcharge_width  = 0.0
-    surcharge_height = 0.0
-    if W > s.min_width:
-        surcharge_width = s.extra_price * (W - s.min_width) * L / 1000
-    if H > s.min_height:
-        surcharge_height = s.extra_price * (H - s.min_height) * L / 1000
-
-    subtotal = price_base + surcharge_width + surcharge_height
-
     # 3) назва обраної опції кольору може приходити під різними ключами
     pos_name = str(
         payload.get("position") or payload.get("color") or payload.get("colors") or ""
     ).strip()
-    percent = float(s.positions.get(pos_name, 0.0))  # s.positions — dict name→%
+    return L, W, H, pos_name
 
-    surcharge_color_amount = subtotal * percent / 100.0
-    raw_total = subtotal + surcharge_color_amount
-    total = (
-        _round_nearest_10(raw_total) if s.rounding_mode == "nearest10"
-        else _round_ceil_10(raw_total)
-    )
+def payload_as_of(payload):
+    """as_of із запиту (для вибору версії прайсу) або None."""
+    if hasattr(payload, "model_dump"):
+        return getattr(payload, "as_of", None)
+    return payload.get("as_of") if isinstance(payload, dict) else None
+
+def normalize_options(payload) -> Options:
+    """
+    payload["options"] ({група: пункт | [пункти]}) → канонічний кортеж
+    ((група, (пункти…)), …), відсортований — годиться як ключ кешу.
+    """
+    if hasattr(payload, "model_dump"):
+        payload = payload.model_dump()
+    raw = payload.get("options") if isinstance(payload, dict) else None
+    if not isinstance(raw, dict) or not raw:
+        return ()
+    return canonical_options(raw)
+
+def canonical_options(raw: Mapping[str, object]) -> Options:
+    """Вже розпакований {група: пункт | [пункти]} → канонічний Options."""
+    out = []
+    for gid, sel in raw.items():
+        if sel is None:
+            continue
+        names = (sel,) if isinstance(sel, str) else tuple(sel)
+        names = tuple(sorted({str(n).strip() for n in names} - {""}))
+        if names:
+            out.append((str(gid).strip(), names))
+    out.sort()
+    return tuple(out)
+
+def quote(L: int, W: int, H: int, pos_name: str, m: PricingModel, options: Options = ()) -> CalcOutput:
+    """
+    Розрахунок по вже нормалізованих цілих розмірах і назві опції.
+    Усі суми — цілі копійки; кожна доплата округлюється до копійки (половини
+    до парного) з точного дробу, підсумок — m.round_total().
+    """
+    den = m.span_den
+    num = _ppm_num(L, m)
+    price_base = div_half_even(num * L, den * 1000)          # грн
+
+    extra = m.extra_kop
+    sw = div_half_even(extra * (W - m.min_width) * L, 1000) if W > m.min_width else 0
+    sh = div_half_even(extra * (H - m.min_height) * L, 1000) if H > m.min_height else 0
+
+    subtotal = price_base * 100 + sw + sh
+    bp = m.position_bp.get(pos_name, 0)
+    color = div_half_even(subtotal * bp, 10000) if bp else 0
+    running = subtotal + color
+    surcharge_options: dict[str, float] = {}
+    if options:
+        running, surcharge_options = _apply_groups(running, options, m)
 
     return CalcOutput(
-        price_per_meter=ppm,
-        price_base=int(price_base),
-        surcharge_width=round(surcharge_width, 2),
-        surcharge_height=round(surcharge_height, 2),
-        surcharge_color_percent=percent,
-        surcharge_color_amount=round(surcharge_color_amount, 2),
-        price_total=int(total),
-    )
\ No newline at end of file
+        price_per_meter=div_half_even(num * 100, den) / 100,
+        price_base=price_base,
+        surcharge_width=sw / 100,
+        surcharge_height=sh / 100,
+        surcharge_color_percent=bp / 100,
+        surcharge_color_amount=color / 100,
+        price_total=m.round_total(running),
+        surcharge_options=surcharge_options,
+    )
+
+def compute(payload, model: PricingModel | None = None):
+    L, W, H, pos_name = normalize_input(payload)
+    # одна модель на весь розрахунок — навіть якщо адмінка саме зберігає конфіг
+    return quote(L, W, H, pos_name, model or get_model(payload_as_of(payload)), normalize_options(payload))
+
+# ------------------------- Пакетний розрахунок ------------------------- #
+
+def compute_batch(L, W, H, positions, model: PricingModel | None = None,
+                  options: list[Options] | None = None) -> dict:
+    """
+    Та сама математика, що й compute(), але по колонках: кожен крок
+    проходить увесь масив одним циклом з локальними змінними.
+    Цілочисельна, як і quote(), — результати збігаються зі скалярним шляхом.
+    Вхід — послідовності однакової довжини (L, W, H — цілі мм, positions — назви,
+    options — канонічні Options по рядках або None, якщо груп не вибрано ніде).
+    """
+    m = model or get_model()
+    n = len(L)
+    if not (len(W) == len(H) == len(positions) == n):
+        raise ValueError("L, W, H and position must have the same length")
+    if options is not None and len(options) != n:
+        raise ValueError("options must have the same length as L")
+
+    mn, mx, den, drop = m.min_length, m.max_length, m.span_den, m.drop
+    top, bottom = m.price_high * den, m.price_low * den
+    min_w, min_h, extra = m.min_width, m.min_height, m.extra_kop
+    table, rnd, hed = m.position_bp, m.round_total, div_half_even
+    base_den = den * 1000
+
+    num = [top if l < mn else (top - (l - mn) * drop if l <= mx else bottom) for l in L]
+    base = [hed(x * l, base_den) for x, l in zip(num, L)]
+    sw = [hed(extra * (w - min_w) * l, 1000) if w > min_w else 0 for w, l in zip(W, L)]
+    sh = [hed(extra * (h - min_h) * l, 1000) if h > min_h else 0 for h, l in zip(H, L)]
+    subtotal = [b * 100 + x + y for b, x, y in zip(base, sw, sh)]
+    bp = [table.get(str(p or "").strip(), 0) for p in positions]
+    amount = [hed(s * p, 10000) if p else 0 for s, p in zip(subtotal, bp)]
+    running = [s + a for s, a in zip(subtotal, amount)]
+    surcharge: list[dict[str, float]] = [{} for _ in running]
+    if options is not None:
+        # групи — по рядку, як у quote(): порядок і вибір у кожного свої
+        for i, opts in enumerate(options):
+            if opts:
+                running[i], surcharge[i] = _apply_groups(running[i], opts, m)
+    total = [rnd(r) for r in running]
+
+    return {
+        "count": n,
+        "price_per_meter": [hed(x * 100, den) / 100 for x in num],
+        "price_base": base,
+        "surcharge_width": [x / 100 for x in sw],
+        "surcharge_height": [y / 100 for y in sh],
+        "surcharge_color_percent": [p / 100 for p in bp],
+        "surcharge_color_amount": [a / 100 for a in amount],
+        "price_total": total,
+        "surcharge_options": surcharge,
+    }
+
+def batch_rows(cols: dict) -> list[dict]:
+    """Колонки compute_batch() → список об'єктів у форматі CalcOutput."""
+    keys = [k for k in cols if k != "count"]
+    return [dict(zip(keys, vals)) for vals in zip(*(cols[k] for k in keys))]
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""
+Передрозібраний конфіг поруч із config.ini (config.ini.cache) для швидкого старту.
+
+Файл — компактний JSON уже нормалізованих налаштувань (те, з чого
+будується SettingsDTO) разом із sha256 від байтів джерела. Лоадер бере
+його, лише якщо хеш збігся з поточним config.ini; інакше парсить INI
+як завжди. Пишеться тільки на старті (lifespan) або з CLI — ніколи
+на шляху запиту.
+
+ENV CONFIG_CACHE=0 — вимкнути; CONFIG_CACHE_PATH — інший шлях.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+# міняємо, коли змінюється вміст/семантика SettingsDTO — старі кеші стають невалідними
+CACHE_FORMAT = 1
+
+def digest(source: bytes) -> str:
+    return hashlib.sha256(b"%d\n" % CACHE_FORMAT + source).hexdigest()
+
+def load(path: Path, want: str) -> dict | None:
+    """Вміст кешу, якщо він є і зроблений з того самого джерела; інакше None."""
+    try:
+        with open(path, "rb") as f:
+            doc = json.loads(f.read())
+    except (OSError, ValueError):
+        return None
+    if not isinstance(doc, dict) or doc.get("sha256") != want:
+        return None
+    return doc.get("settings")
+
+def save(path: Path, source_digest: str, settings: dict) -> None:
+    body = json.dumps({"sha256": source_digest, "settings": settings},
+                      ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(body)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+Зберігання конфігу калькулятора в БД (CONFIG_SOURCE=db).
+
+Рядки config_entry — це ті самі секції/ключі, що й у config.ini, тож
+лоадер працює з ними через звичний RawConfigParser. Поруч лежить один
+рядок config_state з лічильником версії: воркери опитують тільки його,
+а всі рядки перечитують лише коли версія змінилась.
+
+Запис — одна транзакція: збільшуємо версію і замінюємо рядки. Зміни
+адмінки (update_cfg) — read → зміна → запис у тій самій транзакції, яка
+починається з інкременту версії: цей UPDATE тримає блокування рядка
+config_state (PostgreSQL) чи запису в БД (sqlite) до COMMIT, тож
+записувачі з різних хостів стають у чергу, і кожен змінює вже результат
+попереднього — нічого не затирається.
+config.ini лишається форматом імпорту/експорту (див. cli.py config-import/export).
+"""
+
+from __future__ import annotations
+
+from configparser import RawConfigParser
+from pathlib import Path
+from typing import Callable
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+from ..core.db import SessionLocal
+from ..models.config_store import ConfigEntry, ConfigState
+from .config_store import ConfigConflict
+
+def read_version() -> int:
+    """Поточна версія конфігу в БД (один рядок, один SELECT)."""
+    with SessionLocal() as s:
+        v = s.execute(select(ConfigState.version).where(ConfigState.id == 1)).scalar()
+    return int(v or 0)
+
+def _read_rows(s) -> RawConfigParser:
+    cfg = RawConfigParser(interpolation=None)
+    rows = s.execute(
+        select(ConfigEntry.section, ConfigEntry.key, ConfigEntry.value).order_by(ConfigEntry.seq)
+    ).all()
+    for sect, key, value in rows:
+        if not cfg.has_section(sect):
+            cfg.add_section(sect)
+        cfg.set(sect, key, value)
+    return cfg
+
+def _bump(s) -> int:
+    """+1 до версії (перший UPDATE транзакції — він і є блокування до COMMIT). → нова версія."""
+    if not s.execute(update(ConfigState).where(ConfigState.id == 1)
+                     .values(version=ConfigState.version + 1)).rowcount:
+        s.execute(insert(ConfigState).values(id=1, version=1))
+    return int(s.execute(select(ConfigState.version).where(ConfigState.id == 1)).scalar_one())
+
+def _write_rows(s, cfg: RawConfigParser) -> None:
+    rows = []
+    for sect in cfg.sections():
+        for key, value in cfg.items(sect):
+            rows.append({"section": sect, "key": key, "value": value, "seq": len(rows)})
+    s.execute(delete(ConfigEntry))
+    if rows:
+        s.execute(insert(ConfigEntry), rows)
+
+def read_cfg() -> RawConfigParser:
+    with SessionLocal() as s:
+        return _read_rows(s)
+
+def write_cfg(cfg: RawConfigParser) -> int:
+    """Безумовна повна заміна конфігу + інкремент версії (імпорт INI). Повертає нову версію."""
+    with SessionLocal() as s, s.begin():
+        version = _bump(s)
+        _write_rows(s, cfg)
+    return version
+
+def update_cfg(mutate: Callable[[RawConfigParser], tuple[RawConfigParser, bool]]) -> int | None:
+    """
+    read → mutate(cfg) → запис в одній транзакції під блокуванням версії.
+    mutate повертає (cfg, чи є що писати). → нова версія або None, якщо не писали.
+    ConfigConflict — не дочекались блокування / рядок config_state створили паралельно.
+    """
+    try:
+        with SessionLocal() as s, s.begin():
+            version = _bump(s)
+            cfg, changed = mutate(_read_rows(s))
+            if not changed:
+                s.rollback()  # версію не чіпаємо
+                return None
+            _write_rows(s, cfg)
+        return version
+    except IntegrityError as e:  # перший запис у порожню БД з двох місць одночасно
+        raise ConfigConflict("config_state was created concurrently") from e
+    except OperationalError as e:  # sqlite: інший записувач тримав БД довше за busy-timeout
+        if "locked" in str(e).lower():
+            raise ConfigConflict("config database is locked by another writer") from e
+        raise
+
+# ------------------------ Імпорт / експорт ------------------------ #
+
+def import_ini(path: Path) -> int:
+    cfg = RawConfigParser(interpolation=None)
+    cfg.read(path, encoding="utf-8")
+    return write_cfg(cfg)
+
+def export_ini(path: Path) -> None:
+    cfg = read_cfg()
+    with Path(path).open("w", encoding="utf-8") as f:
+        cfg.write(f)
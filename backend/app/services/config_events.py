@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""
+Події зміни конфігу для відкритих вкладок калькулятора (SSE).
+
+Один спостерігач на процес (asyncio-задача) раз на CONFIG_EVENTS_POLL секунд
+дивиться peek_snapshot() — без I/O, лише mmap-лічильник поколінь; якщо пора
+перевірити джерело або інший воркер/адмінка зберегли конфіг, перечитує його
+в threadpool. Коли змінюється ETag /api/calc/config (хеш вмісту, однаковий
+у всіх воркерах) — будить усіх підписників.
+
+Підписник — це не черга і не таймер на з'єднання, а очікування одного
+спільного asyncio.Event: на кожну подію (або heartbeat раз на
+CONFIG_EVENTS_HEARTBEAT секунд) спостерігач ставить поточний Event і
+підміняє його новим. Тисячі неактивних з'єднань коштують лише свої
+корутини; поки підписників немає, спостерігач нічого не перевіряє.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import AsyncIterator
+
+from anyio import to_thread
+
+from .config_loader import get_snapshot, peek_snapshot
+
+log = logging.getLogger(__name__)
+
+CONFIG_EVENTS_POLL = float(os.getenv("CONFIG_EVENTS_POLL", "0.5"))
+CONFIG_EVENTS_HEARTBEAT = float(os.getenv("CONFIG_EVENTS_HEARTBEAT", "15"))
+# підказка EventSource, через скільки перепідключатись (мс)
+CONFIG_EVENTS_RETRY_MS = int(os.getenv("CONFIG_EVENTS_RETRY_MS", "3000"))
+
+def _event(etag: str, version: int) -> bytes:
+    # ETag у лапках — як у заголовку /config, тож id = If-None-Match для refetch
+    data = json.dumps({"etag": etag, "version": version}, separators=(",", ":"))
+    return f"id: {etag}\nevent: config\ndata: {data}\n\n".encode()
+
+class ConfigEvents:
+    def __init__(self, poll: float = CONFIG_EVENTS_POLL, heartbeat: float = CONFIG_EVENTS_HEARTBEAT) -> None:
+        self.poll = poll
+        self.heartbeat = heartbeat
+        self.etag = ""
+        self.version = 0
+        self.price_list = 0
+        self.subscribers = 0
+        self.sent = 0            # подій config (не рахуючи heartbeat)
+        self._wake: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+
+    # ---------------------------- спостерігач ---------------------------- #
+
+    async def _check(self) -> None:
+        from ..api.calc import render_config
+
+        snap, stale = peek_snapshot()
+        if stale:
+            snap = await to_thread.run_sync(get_snapshot)
+        # заплановані версії прайсу набувають чинності без нового снапшота
+        pl = snap.prices.at() if snap.prices else None
+        if snap.version == self.version and (pl.id if pl else 0) == self.price_list:
+            return
+        etag, _ = await to_thread.run_sync(render_config, snap)
+        changed = etag != self.etag
+        self.etag, self.version, self.price_list = etag, snap.version, (pl.id if pl else 0)
+        if changed:
+            self.sent += 1
+            self._broadcast()
+
+    def _broadcast(self) -> None:
+        wake, self._wake = self._wake, asyncio.Event()
+        if wake is not None:
+            wake.set()
+
+    async def _run(self) -> None:
+        next_beat = time.monotonic() + self.heartbeat
+        while True:
+            await asyncio.sleep(self.poll)
+            if not self.subscribers:
+                continue
+            try:
+                await self._check()
+            except Exception:  # наступне коло спробує ще раз
+                log.exception("config events check failed")
+            if time.monotonic() >= next_beat:
+                next_beat = time.monotonic() + self.heartbeat
+                self._broadcast()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._wake = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._broadcast()  # розбудити підписників, щоб стріми завершились
+
+    # ---------------------------- підписник ---------------------------- #
+
+    async def stream(self, last_event_id: str | None = None) -> AsyncIterator[bytes]:
+        """Тіло text/event-stream: поточний стан одразу, далі — зміни і heartbeat-коментарі."""
+        self.start()
+        self.subscribers += 1
+        try:
+            if not self.etag:
+                await self._check()
+            yield f"retry: {CONFIG_EVENTS_RETRY_MS}\n\n".encode()
+            sent = self.etag
+            if last_event_id != sent:  # після перепідключення без змін — нічого не шлемо
+                yield _event(self.etag, self.version)
+            while self._task is not None:
+                if self.etag != sent:  # зміна могла статись, поки ми віддавали попередню подію
+                    sent = self.etag
+                    yield _event(self.etag, self.version)
+                    continue
+                await self._wake.wait()
+                if self.etag == sent:
+                    yield b": ping\n\n"
+        finally:
+            self.subscribers -= 1
+
+    def stats(self) -> dict:
+        return {"subscribers": self.subscribers, "sent": self.sent, "etag": self.etag}
+
+CONFIG_EVENTS = ConfigEvents()
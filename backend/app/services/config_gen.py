@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+Спільний між процесами лічильник поколінь конфігу.
+
+Маленький файл (8 байт), відображений у пам'ять (mmap, MAP_SHARED) у кожному
+воркері uvicorn. Читання — це просто unpack 8 байт зі спільної сторінки,
+без системних викликів, тож його можна робити на кожен запит. Будь-який
+запис конфігу (або /api/admin/reload) збільшує лічильник під flock — і всі
+воркери на наступному запиті бачать, що снапшот треба перечитати.
+
+ENV CONFIG_GEN_PATH — шлях до файлу лічильника. За замовчуванням —
+у системному tmp, з іменем від шляху config.ini (щоб воркери одного
+деплою ділили один файл, а різні копії репозиторію — ні).
+Якщо файл створити не вдалося, лічильник вимкнений (завжди 0) — тоді
+воркери покладаються лише на перевірку mtime/версії джерела.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from pathlib import Path
+
+try:  # POSIX; на Windows — без міжпроцесного lock
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore[assignment]
+
+log = logging.getLogger(__name__)
+
+_FMT = "<Q"
+_SIZE = struct.calcsize(_FMT)
+
+class SharedGeneration:
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._fd: int | None = None
+        self._mm: mmap.mmap | None = None
+        self._lock = threading.Lock()
+        self._failed = False
+
+    def _open(self) -> mmap.mmap | None:
+        if self._mm is not None or self._failed:
+            return self._mm
+        with self._lock:
+            if self._mm is not None or self._failed:
+                return self._mm
+            try:
+                fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o666)
+                if os.fstat(fd).st_size < _SIZE:
+                    self._flock(fd)
+                    try:
+                        if os.fstat(fd).st_size < _SIZE:
+                            os.ftruncate(fd, _SIZE)  # нулі = покоління 0
+                    finally:
+                        self._funlock(fd)
+                self._fd = fd
+                self._mm = mmap.mmap(fd, _SIZE)
+            except OSError as e:
+                self._failed = True
+                log.warning("shared config generation disabled (%s): %s", self.path, e)
+        return self._mm
+
+    @staticmethod
+    def _flock(fd: int) -> None:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+
+    @staticmethod
+    def _funlock(fd: int) -> None:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+
+    def read(self) -> int:
+        mm = self._mm or self._open()
+        if mm is None:
+            return 0
+        return struct.unpack_from(_FMT, mm, 0)[0]
+
+    def bump(self) -> int:
+        """Атомарно +1 (flock між процесами, lock між потоками). Повертає нове значення."""
+        mm = self._open()
+        if mm is None or self._fd is None:
+            return 0
+        with self._lock:
+            self._flock(self._fd)
+            try:
+                value = struct.unpack_from(_FMT, mm, 0)[0] + 1
+                struct.pack_into(_FMT, mm, 0, value)
+            finally:
+                self._funlock(self._fd)
+        return value
+
+def default_gen_path(config_path: Path) -> Path:
+    env = os.getenv("CONFIG_GEN_PATH")
+    if env:
+        return Path(env)
+    tag = hashlib.sha1(str(config_path.resolve()).encode("utf-8")).hexdigest()[:12]
+    return Path(tempfile.gettempdir()) / f"betoomore-config-{tag}.gen"
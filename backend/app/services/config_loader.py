@@ -9,24 +9,56 @@
     mode=<single|multi>
     title=<людська назва>
     item.1 = Назва|<mul|add|sub|div>|<число>
+    (mul: +число %, div: ділення на 1 + число/100, add/sub: ±число грн)
 
 Приклади item.*:
     item.1 = базовий сірий колір|mul|0
     item.2 = базовий колір в масі +5%|mul|5    ← “%” допускаємо у файлі, але при читанні прибираємо
+
+Джерело конфігу — ENV CONFIG_SOURCE:
+    ini (за замовчуванням) — файл config.ini
+    db                     — таблиці config_entry/config_state (див. services/config_db.py);
+                             версію в БД перевіряємо не частіше, ніж раз на CONFIG_DB_POLL_SECONDS
+
+Кілька воркерів (uvicorn --workers N) дізнаються про записи один одного
+через спільний лічильник поколінь (services/config_gen.py).
+
+Шлях читання (load_settings/get_snapshot) НІЧОГО не пише: дефолти і чистка
+legacy item.N застосовуються лише до копії в пам'яті. Записати їх у джерело
+можна один раз — migrate_config() (старт застосунку, cli config-migrate,
+POST /api/admin/config/migrate).
+
+Для швидкого старту поруч лежить config.ini.cache — уже розібрані налаштування
+з хешем джерела (services/config_cache.py); пишеться лише на старті/з CLI.
 """
 
 from __future__ import annotations
 
 from configparser import RawConfigParser
 from dataclasses import dataclass, asdict
+import itertools
+import logging
 import os
+import threading
+import time
 from pathlib import Path
-from typing import Dict, List, Tuple
+from types import MappingProxyType
+from typing import Callable, Dict, List, Mapping, Tuple
+
+from . import config_cache
+from .config_gen import SharedGeneration, default_gen_path
+from .config_store import CONFIG_PATH, CONFIG_SOURCE, ConfigStore, new_cfg
+from .money import check_rounding
+from .price_lists import EMPTY_PRICES, PRICE_LISTS_ENABLED, PriceIndex
 
-CONFIG_PATH = Path(os.getenv("CONFIG_PATH") or (Path(__file__).resolve().parents[2] / "config.ini"))
+log = logging.getLogger(__name__)
 
-# Шлях до backend/config.ini
-CONFIG_PATH = Path(__file__).resolve().parents[2] / "config.ini"
+CONFIG_DB_POLL_SECONDS = float(os.getenv("CONFIG_DB_POLL_SECONDS", "1.0"))
+CONFIG_STAT_SECONDS = float(os.getenv("CONFIG_STAT_SECONDS", "1.0"))
+
+# передрозібраний конфіг (services/config_cache.py); для БД не потрібен
+CONFIG_CACHE_ENABLED = os.getenv("CONFIG_CACHE", "1") == "1" and CONFIG_SOURCE != "db"
+CONFIG_CACHE_PATH = Path(os.getenv("CONFIG_CACHE_PATH") or CONFIG_PATH.with_name(CONFIG_PATH.name + ".cache"))
 
 # ---------------------------- Моделі ---------------------------- #
 
@@ -40,7 +72,7 @@ class VariableSettings:
 
 @dataclass
 class BaseSettings:
-    rounding: str = "ceil10"       # napр.: ceil10 / ceil100 / round / floor …
+    rounding: str = "ceil10"       # режим з money.ROUNDING: ceil10 / ceil100 / nearest10 / nearest100 / round / floor
     price_high: int = 21101
     price_low: int = 18257
 
@@ -58,7 +90,7 @@ class Group:
     items: List[GroupItem]
 
 # Об'єкт, який очікує calc.py у get_config()
-@dataclass
+@dataclass(frozen=True)
 class SettingsDTO:
     min_length: int
     max_length: int
@@ -68,28 +100,26 @@ class SettingsDTO:
     rounding_mode: str
     price_per_meter_high: int
     price_per_meter_low: int
-    positions: dict[str, float]  # список груп для фронта (dict)
+    positions: Mapping[str, float]  # список груп для фронта (read-only dict)
+    groups: Tuple[Group, ...] = ()  # інші group:* (оздоблення, водовідвід, кріплення …)
+
+# Незмінний знімок конфігу: одна версія на кожне перечитування файлу
+@dataclass(frozen=True)
+class ConfigSnapshot:
+    version: int          # локальна версія снапшота в цьому процесі
+    generation: int       # спільне покоління (config_gen) на момент читання
+    stamp: tuple | None   # ini: (mtime_ns, inode, size) файлу; db: ("db", версія)
+    settings: SettingsDTO
+    loaded_at: float
+    prices: PriceIndex = EMPTY_PRICES   # версії прайсу з датами (services/price_lists.py)
 
 # -------------------------- Utils --------------------------- #
 
-def _new_cfg() -> RawConfigParser:
-    # interpolation=None — щоб '%' не ламався
-    return RawConfigParser(interpolation=None)
+# Усі читання/записи конфігу — тільки через STORE (lock, temp+rename, злиття записів)
+STORE = ConfigStore(CONFIG_PATH, CONFIG_SOURCE, on_saved=lambda: invalidate_settings())
 
 def _read_ini() -> RawConfigParser:
-    cfg = RawConfigParser(interpolation=None)  # ВАЖЛИВО: щоб '%' у item.* не ламав парсер
-    if CONFIG_PATH.exists():
-        try:
-            CONFIG_PATH.chmod(0o664)
-        except Exception:
-            pass
-        cfg.read(CONFIG_PATH, encoding="utf-8")
-    return cfg
-
-def _write_ini(cfg: RawConfigParser) -> None:
-    CONFIG_PATH.parent.mkdir(parents=True, exist_ok=True)
-    with CONFIG_PATH.open("w", encoding="utf-8") as f:
-        cfg.write(f)
+    return STORE.read()
 
 def _ensure(cfg: RawConfigParser, sect: str) -> None:
     if not cfg.has_section(sect):
@@ -126,6 +156,12 @@ def _read_variables(cfg: RawConfigParser) -> VariableSettings:
         extra_price=_get_float(cfg, s, "extra_price", 22.0),
     )
 
+def check_length_range(cfg: RawConfigParser) -> None:
+    """ValueError, якщо min_length > max_length — ціна за метр тоді не інтерполюється."""
+    v = _read_variables(cfg)
+    if v.min_length > v.max_length:
+        raise ValueError(f"min_length ({v.min_length}) must not exceed max_length ({v.max_length})")
+
 def _read_base(cfg: RawConfigParser) -> BaseSettings:
     s = "base"
     _ensure(cfg, s)
@@ -189,28 +225,29 @@ def _read_groups(cfg: RawConfigParser) -> List[Group]:
 def save_base(rounding: str | None, price_high: int | None, price_low: int | None) -> BaseSettings:
     """
     Оновлює секцію [base]. None — не змінюємо відповідне поле.
+    Невідомий режим округлення — ValueError (до запису).
     """
-    cfg = _read_ini()
-    _ensure(cfg, "base")
+    mode = check_rounding(rounding) if isinstance(rounding, str) and rounding.strip() else None
 
-    cur = _read_base(cfg)
-    if isinstance(rounding, str) and rounding.strip():
-        cfg.set("base", "rounding", rounding.strip())
-    else:
-        cfg.set("base", "rounding", cur.rounding)
+    def _apply(cfg: RawConfigParser) -> BaseSettings:
+        _ensure(cfg, "base")
 
-    if price_high is not None:
-        cfg.set("base", "price_high", str(int(price_high)))
-    else:
-        cfg.set("base", "price_high", str(cur.price_high))
+        cur = _read_base(cfg)
+        cfg.set("base", "rounding", mode or cur.rounding)
 
-    if price_low is not None:
-        cfg.set("base", "price_low", str(int(price_low)))
-    else:
-        cfg.set("base", "price_low", str(cur.price_low))
+        if price_high is not None:
+            cfg.set("base", "price_high", str(int(price_high)))
+        else:
+            cfg.set("base", "price_high", str(cur.price_high))
 
-    _write_ini(cfg)
-    return _read_base(cfg)
+        if price_low is not None:
+            cfg.set("base", "price_low", str(int(price_low)))
+        else:
+            cfg.set("base", "price_low", str(cur.price_low))
+
+        return _read_base(cfg)
+
+    return STORE.update(_apply)
 
 def list_groups() -> List[Dict]:
     cfg = _read_ini()
@@ -233,46 +270,65 @@ def save_group(payload: Dict) -> Dict:
     if not gid:
         raise ValueError("group.id is required")
 
-    cfg = _read_ini()
     sect = f"group:{gid}"
-    _ensure(cfg, sect)
-
     name = (payload.get("name") or gid.capitalize()).strip()
     mode = (payload.get("mode") or "single").strip().lower()
     if mode not in {"single", "multi"}:
         mode = "single"
 
-    cfg.set(sect, "title", name)
-    cfg.set(sect, "mode", mode)
+    def _apply(cfg: RawConfigParser) -> Dict:
+        _ensure(cfg, sect)
+        cfg.set(sect, "title", name)
+        cfg.set(sect, "mode", mode)
+
+        # Спершу чистимо старі item.*
+        for k in list(cfg[sect].keys()):
+            if k.startswith("item."):
+                cfg.remove_option(sect, k)
+
+        items = payload.get("items") or []
+        for i, it in enumerate(items, start=1):
+            nm = str(it.get("name", "")).strip() or f"item {i}"
+            op = str(it.get("op", "mul")).strip().lower()
+            if op not in {"mul", "add", "sub", "div"}:
+                op = "mul"
+            try:
+                val = float(str(it.get("value", 0)).replace("%", "").replace("+", ""))
+            except Exception:
+                val = 0.0
+            if op == "div" and val <= -100:
+                raise ValueError(f"{nm}: div value must be greater than -100")
+            cfg.set(sect, f"item.{i}", f"{nm}|{op}|{val}")
 
-    # Спершу чистимо старі item.*
-    for k in list(cfg[sect].keys()):
-        if k.startswith("item."):
-            cfg.remove_option(sect, k)
+        return group_to_dict(_read_group_from_section(cfg, sect))
 
-    items = payload.get("items") or []
-    for i, it in enumerate(items, start=1):
-        nm = str(it.get("name", "")).strip() or f"item {i}"
-        op = str(it.get("op", "mul")).strip().lower()
-        if op not in {"mul", "add", "sub", "div"}:
-            op = "mul"
-        try:
-            val = float(str(it.get("value", 0)).replace("%", "").replace("+", ""))
-        except Exception:
-            val = 0.0
-        cfg.set(sect, f"item.{i}", f"{nm}|{op}|{val}")
+    return STORE.update(_apply)
 
-    _write_ini(cfg)
-    return group_to_dict(_read_group_from_section(cfg, sect))
+def update_positions(change: Callable[[Dict[str, float]], None]) -> Dict[str, float]:
+    """
+    Опції кольору {назва: %} — це item.N групи group:colors, з яких калькулятор
+    бере надбавку. change(dict) мутує словник (порядок зберігається, нові — в кінець);
+    результат записується назад як "назва|mul|%". Виняток у change — нічого не пишемо.
+    """
+    sect = "group:colors"
+
+    def _apply(cfg: RawConfigParser) -> Dict[str, float]:
+        _ensure_defaults(cfg)  # групи ще немає — стартуємо з тих самих дефолтів, що бачить калькулятор
+        data = {it.name: it.value for it in _read_group_from_section(cfg, sect).items}
+        change(data)
+        for k in [k for k in cfg[sect] if k.startswith("item.")]:
+            cfg.remove_option(sect, k)
+        for i, (nm, val) in enumerate(data.items(), start=1):
+            cfg.set(sect, f"item.{i}", f"{nm}|mul|{float(val)}")
+        return data
+
+    return STORE.update(_apply)
 
 def delete_group(gid: str) -> bool:
-    cfg = _read_ini()
     sect = f"group:{gid}"
-    if not cfg.has_section(sect):
+    if not _read_ini().has_section(sect):
         return False
-    cfg.remove_section(sect)
-    _write_ini(cfg)
-    return True
+    return STORE.update(lambda cfg: cfg.remove_section(sect))
 
 # ---------------------- Допоміжні конвертори ------------------- #
 
@@ -321,8 +377,8 @@ def _ensure_defaults(cfg: RawConfigParser) -> None:
         cfg.set(gsect, "item.4", "індивідуальний поверхнево +20%|mul|20")
         cfg.set(gsect, "item.5", "індивідуальний в масі +25%|mul|25")
 
-def _migrate_percent_items(cfg: RawConfigParser) -> None:
-    """Прибираємо ‘%’ і ‘+’ у всіх item.N, якщо вони там є."""
+def _migrate_percent_items(cfg: RawConfigParser) -> bool:
+    """Прибираємо ‘%’ і ‘+’ у всіх item.N, якщо вони там є. True — якщо щось змінилось."""
     changed = False
     for sect in cfg.sections():
         if not sect.startswith("group:"):
@@ -333,10 +389,110 @@ def _migrate_percent_items(cfg: RawConfigParser) -> None:
             raw = (v or "")
             if "%" in raw or "+" in raw or "," in raw:
                 it = _parse_item(raw)  # перепарсимо і запишемо числом
-                cfg.set(sect, k, f"{it.name}|{it.op}|{it.value}")
-                changed = True
-    if changed:
-        _write_ini(cfg)
+                fixed = f"{it.name}|{it.op}|{it.value}"
+                # '%'/'+' у самій назві опції — не привід переписувати файл щоразу
+                if fixed != raw:
+                    cfg.set(sect, k, fixed)
+                    changed = True
+    return changed
+
+# ------------------------ Кеш снапшота ------------------------- #
+#
+# Парсимо конфіг лише тоді, коли:
+#   - хтось (будь-який воркер) записав конфіг або викликав reload — це видно
+#     зі спільного лічильника поколінь (mmap, див. config_gen.py), який
+#     перевіряємо на КОЖЕН запит без системних викликів;
+#   - змінилось саме джерело (mtime/inode/size файлу або версія в БД) — це
+#     ловить ручні правки; перевіряємо не частіше, ніж раз на
+#     CONFIG_STAT_SECONDS (для БД — CONFIG_DB_POLL_SECONDS).
+# Паралельні «промахи» чекають на один lock, тож перечитує тільки перший потік.
+
+_SNAPSHOT: ConfigSnapshot | None = None
+_SNAPSHOT_LOCK = threading.Lock()
+_VERSIONS = itertools.count(1)
+_NEXT_STAMP_CHECK = 0.0
+_STAMP_INTERVAL = CONFIG_DB_POLL_SECONDS if CONFIG_SOURCE == "db" else CONFIG_STAT_SECONDS
+
+CONFIG_GEN = SharedGeneration(default_gen_path(CONFIG_PATH))
+
+def _stat_stamp() -> tuple | None:
+    if CONFIG_SOURCE == "db":
+        from . import config_db
+        return ("db", config_db.read_version())  # один легкий SELECT версії
+    try:
+        st = CONFIG_PATH.stat()
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_ino, st.st_size)
+
+def invalidate_settings() -> None:
+    """Скидаємо снапшот у цьому процесі й сигналізуємо іншим воркерам перечитати конфіг."""
+    global _SNAPSHOT
+    _SNAPSHOT = None
+    CONFIG_GEN.bump()
+
+def _is_fresh(snap: ConfigSnapshot) -> bool:
+    global _NEXT_STAMP_CHECK
+    if snap.generation != CONFIG_GEN.read():
+        return False
+    now = time.monotonic()
+    if now < _NEXT_STAMP_CHECK:
+        return True
+    _NEXT_STAMP_CHECK = now + _STAMP_INTERVAL
+    return snap.stamp == _stat_stamp()
+
+def peek_snapshot() -> tuple[ConfigSnapshot | None, bool]:
+    """
+    Снапшот без жодного I/O (для event loop): (поточний або None, чи пора перевірити джерело).
+    Покоління читаємо з mmap; stat/SELECT версії — справа того, хто викличе get_snapshot().
+    """
+    snap = _SNAPSHOT
+    if snap is None:
+        return None, True
+    if snap.generation != CONFIG_GEN.read():
+        return snap, True
+    return snap, time.monotonic() >= _NEXT_STAMP_CHECK
+
+def get_snapshot() -> ConfigSnapshot:
+    """Поточний незмінний снапшот конфігу (перечитується лише за потреби)."""
+    snap = _SNAPSHOT
+    if snap is not None and _is_fresh(snap):
+        return snap
+    with _SNAPSHOT_LOCK:
+        snap = _SNAPSHOT
+        gen = CONFIG_GEN.read()
+        stamp = _stat_stamp()
+        if snap is not None and snap.generation == gen and snap.stamp == stamp:
+            return snap  # інший потік уже перечитав, поки ми чекали
+        return _rebuild_snapshot(stamp, gen)
+
+def _load_prices() -> PriceIndex:
+    if not PRICE_LISTS_ENABLED:
+        return EMPTY_PRICES
+    from .price_lists import load_index
+    try:
+        return load_index()
+    except Exception as e:  # БД недоступна — краще вчорашній індекс, ніж ціни з [base]
+        prev = _SNAPSHOT
+        log.warning("price lists not loaded, keeping previous index: %s", e)
+        return prev.prices if prev is not None else EMPTY_PRICES
+
+def _rebuild_snapshot(stamp: tuple | None, generation: int) -> ConfigSnapshot:
+    global _SNAPSHOT, _NEXT_STAMP_CHECK
+    # stamp і покоління беремо ДО читання: якщо конфіг зміниться під час
+    # парсингу, наступний виклик побачить розбіжність і перечитає ще раз
+    settings = _build_settings()
+    snap = ConfigSnapshot(
+        version=next(_VERSIONS),
+        generation=generation,
+        stamp=stamp,
+        settings=settings,
+        loaded_at=time.time(),
+        prices=_load_prices(),
+    )
+    _SNAPSHOT = snap
+    _NEXT_STAMP_CHECK = time.monotonic() + _STAMP_INTERVAL
+    return snap
 
 # ----------------------- Публічне API --------------------------- #
 
@@ -344,11 +500,110 @@ def load_settings() -> SettingsDTO:
     """
     Повертає об'єкт, який безпосередньо використовує backend/app/api/calc.py:
       s.min_length, s.rounding_mode, s.price_per_meter_high/low, s.positions
+    Значення береться з кешованого снапшота (див. get_snapshot()).
     """
-    cfg = _read_ini()
+    return get_snapshot().settings
+
+def _cfg_dict(cfg: RawConfigParser) -> Dict[str, Dict[str, str]]:
+    return {sect: dict(cfg.items(sect)) for sect in cfg.sections()}
+
+def _normalize(cfg: RawConfigParser) -> bool:
+    """Дефолти + чистка item.N (у пам'яті). True — якщо cfg змінився."""
+    before = _cfg_dict(cfg)
     _ensure_defaults(cfg)
     _migrate_percent_items(cfg)
+    return _cfg_dict(cfg) != before
+
+def migrate_config() -> bool:
+    """
+    Одноразова міграція джерела: дописує дефолти і переписує legacy item.N
+    (‘%’, ‘+’, ‘,’). Якщо міняти нічого — нічого й не пише. True — якщо записали.
+    """
+    if not _normalize(_read_ini()):
+        return False
+    changed = STORE.update(_normalize)  # повторно — вже під lock-ом, на свіжій копії
+    return bool(changed)
+
+def _source_bytes() -> bytes:
+    try:
+        return CONFIG_PATH.read_bytes()
+    except OSError:
+        return b""
+
+def _parse(data: bytes) -> RawConfigParser:
+    cfg = new_cfg()
+    cfg.read_string(data.decode("utf-8"), source=str(CONFIG_PATH))
+    _normalize(cfg)  # тільки в пам'яті — джерело не чіпаємо
+    return cfg
 
+def _build_settings() -> SettingsDTO:
+    if not CONFIG_CACHE_ENABLED:
+        cfg = _read_ini()
+        _normalize(cfg)  # тільки в пам'яті — джерело не чіпаємо
+        return _settings_from_cfg(cfg)
+    data = _source_bytes()
+    cached = config_cache.load(CONFIG_CACHE_PATH, config_cache.digest(data))
+    if cached is not None:
+        try:
+            return _settings_from_dict(cached)
+        except (KeyError, TypeError, ValueError):
+            pass  # битий кеш — просто парсимо джерело
+    return _settings_from_cfg(_parse(data))
+
+def write_config_cache() -> bool:
+    """
+    Зберегти передрозібраний конфіг поруч із config.ini (старт/CLI, не запит).
+    True — якщо записали; False — кеш уже актуальний або вимкнений.
+    """
+    if not CONFIG_CACHE_ENABLED:
+        return False
+    data = _source_bytes()
+    want = config_cache.digest(data)
+    if config_cache.load(CONFIG_CACHE_PATH, want) is not None:
+        return False
+    config_cache.save(CONFIG_CACHE_PATH, want, _settings_to_dict(_settings_from_cfg(_parse(data))))
+    return True
+
+def _settings_to_dict(s: SettingsDTO) -> Dict:
+    return {
+        "min_length": s.min_length,
+        "max_length": s.max_length,
+        "min_width": s.min_width,
+        "min_height": s.min_height,
+        "extra_price": s.extra_price,
+        "rounding_mode": s.rounding_mode,
+        "price_per_meter_high": s.price_per_meter_high,
+        "price_per_meter_low": s.price_per_meter_low,
+        "positions": list(s.positions.items()),  # список пар — зберігаємо порядок
+        "groups": [[g.id, g.name, g.mode, [[it.name, it.op, it.value] for it in g.items]] for g in s.groups],
+    }
+
+def _settings_from_dict(d: Dict) -> SettingsDTO:
+    return SettingsDTO(
+        min_length=int(d["min_length"]),
+        max_length=int(d["max_length"]),
+        min_width=int(d["min_width"]),
+        min_height=int(d["min_height"]),
+        extra_price=float(d["extra_price"]),
+        rounding_mode=str(d["rounding_mode"]),
+        price_per_meter_high=int(d["price_per_meter_high"]),
+        price_per_meter_low=int(d["price_per_meter_low"]),
+        positions=MappingProxyType({str(k): float(v) for k, v in d["positions"]}),
+        groups=tuple(
+            Group(id=gid, name=name, mode=mode, items=[GroupItem(name=n, op=op, value=float(v)) for n, op, v in items])
+            for gid, name, mode, items in d["groups"]
+        ),
+    )
+
+def settings_from_ini(path) -> SettingsDTO:
+    """Налаштування з довільного INI (не з джерела конфігу) — для офлайн-утиліт."""
+    cfg = new_cfg()
+    if not cfg.read(path, encoding="utf-8"):
+        raise OSError(f"cannot read {path}")
+    _normalize(cfg)  # як і для живого конфігу: дефолти + legacy item.N
+    return _settings_from_cfg(cfg)
+
+def _settings_from_cfg(cfg: RawConfigParser) -> SettingsDTO:
     vars_ = _read_variables(cfg)
     base_ = _read_base(cfg)
     groups_ = _read_groups(cfg)
@@ -359,7 +614,7 @@ def load_settings() -> SettingsDTO:
             for it in getattr(g, "items", []) or []:
                 positions_map[getattr(it, "name", "item")] = float(getattr(it, "value", 0))
 
-    return SettingsDTO(
+    settings = SettingsDTO(
         min_length=vars_.min_length,
         max_length=vars_.max_length,
         min_width=vars_.min_width,
@@ -368,5 +623,7 @@ def load_settings() -> SettingsDTO:
         rounding_mode=base_.rounding,
         price_per_meter_high=base_.price_high,
         price_per_meter_low=base_.price_low,
-        positions=positions_map,  # ← тепер завжди dict
+        positions=MappingProxyType(positions_map),  # ← тепер завжди dict (read-only)
+        groups=tuple(g for g in groups_ if g.id != "colors"),
     )
+    return settings
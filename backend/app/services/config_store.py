@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+"""
+Єдине сховище конфігу калькулятора — всі читання/записи йдуть тільки сюди.
+
+Запис (ConfigStore.update):
+  - advisory-lock (flock на config.ini.lock) між процесами + lock між потоками;
+  - під lock-ом перечитуємо свіжий конфіг, застосовуємо зміну і пишемо
+    у тимчасовий файл поруч, fsync, потім атомарний os.replace();
+  - паралельні записувачі «злипаються»: поки один потік пише, інші лише
+    ставлять свої зміни в чергу, і наступний прохід застосовує їх усі
+    за одне перечитування і один запис (жодна зміна не губиться).
+
+Читання (ConfigStore.read) lock не бере: завдяки rename читач завжди бачить
+або старий, або новий файл цілком. Калькулятор узагалі читає не файл,
+а незмінний снапшот (config_loader.get_snapshot), тож запис адмінки його
+ніколи не блокує.
+
+Джерело — config.ini (ENV CONFIG_PATH, за замовчуванням backend/config.ini)
+або БД при CONFIG_SOURCE=db (див. config_db.py). У БД замість flock —
+одна транзакція на прохід, що блокує рядок версії config_state до COMMIT
+(config_db.update_cfg); якщо блокування не дочекались, прохід
+повторюється на свіжому конфігу (з випадковою паузою, що росте), до
+CONFIG_WRITE_RETRIES разів.
+"""
+
+from __future__ import annotations
+
+import os
+import random
+import tempfile
+import threading
+import time
+from configparser import RawConfigParser
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator, TypeVar
+
+try:  # POSIX; на Windows — тільки lock між потоками
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore[assignment]
+
+# Шлях до backend/config.ini
+CONFIG_PATH = Path(os.getenv("CONFIG_PATH") or (Path(__file__).resolve().parents[2] / "config.ini"))
+CONFIG_SOURCE = os.getenv("CONFIG_SOURCE", "ini").strip().lower()
+CONFIG_WRITE_RETRIES = int(os.getenv("CONFIG_WRITE_RETRIES", "8"))
+
+T = TypeVar("T")
+
+def new_cfg() -> RawConfigParser:
+    # interpolation=None — щоб '%' у item.* не ламав парсер
+    return RawConfigParser(interpolation=None)
+
+def clone_cfg(cfg: RawConfigParser) -> RawConfigParser:
+    out = new_cfg()
+    out.read_dict({s: dict(cfg.items(s)) for s in cfg.sections()})
+    return out
+
+class ConfigConflict(RuntimeError):
+    """Паралельний записувач у БД (інший хост/процес) не дав записати — прохід можна повторити."""
+
+class _Pending:
+    __slots__ = ("mutator", "done", "result", "error")
+
+    def __init__(self, mutator: Callable[[RawConfigParser], object]) -> None:
+        self.mutator = mutator
+        self.done = threading.Event()
+        self.result: object = None
+        self.error: BaseException | None = None
+
+class ConfigStore:
+    def __init__(self, path: Path, source: str = "ini",
+                 on_saved: Callable[[], None] | None = None) -> None:
+        self.path = path
+        self.source = source
+        self.on_saved = on_saved
+        self._mu = threading.Lock()
+        self._pending: list[_Pending] = []
+        self._leader = False
+        self.writes = 0       # фізичних записів
+        self.coalesced = 0    # змін, що «приїхали» в чужому записі
+        self.conflicts = 0    # повторів після ConfigConflict (тільки БД)
+
+    # ---------------------------- читання ---------------------------- #
+
+    def read(self) -> RawConfigParser:
+        """Свіжа копія конфігу. Нічого не пише і не блокується записувачами."""
+        if self.source == "db":
+            from . import config_db
+            return config_db.read_cfg()
+        cfg = new_cfg()
+        if self.path.exists():
+            cfg.read(self.path, encoding="utf-8")
+        return cfg
+
+    # ---------------------------- запис ---------------------------- #
+
+    def update(self, mutator: Callable[[RawConfigParser], T]) -> T:
+        """
+        Застосувати mutator(cfg) до актуального конфігу і зберегти атомарно.
+        Повертає результат mutator; якщо він кинув виняток — конфіг не змінюється.
+        """
+        p = _Pending(mutator)
+        with self._mu:
+            self._pending.append(p)
+            lead = not self._leader
+            self._leader = True
+        if lead:
+            self._drain()
+        p.done.wait()
+        if p.error is not None:
+            raise p.error
+        return p.result  # type: ignore[return-value]
+
+    def replace(self, cfg: RawConfigParser) -> None:
+        """Повна заміна вмісту (імпорт, сумісність зі старим write_ini)."""
+        data = {s: dict(cfg.items(s)) for s in cfg.sections()}
+
+        def _set_all(cur: RawConfigParser) -> None:
+            for s in cur.sections():
+                cur.remove_section(s)
+            cur.read_dict(data)
+
+        self.update(_set_all)
+
+    def _drain(self) -> None:
+        while True:
+            with self._mu:
+                batch, self._pending = self._pending, []
+                if not batch:
+                    self._leader = False
+                    return
+            self._apply(batch)
+
+    @staticmethod
+    def _mutate(batch: list[_Pending], cfg: RawConfigParser) -> tuple[RawConfigParser, int]:
+        """Застосувати всі зміни пачки; невдала зміна відкочується лише сама. → (cfg, скільки вдалось)."""
+        ok = 0
+        for p in batch:
+            p.result, p.error = None, None
+            backup = clone_cfg(cfg)
+            try:
+                p.result = p.mutator(cfg)
+                ok += 1
+            except Exception as e:
+                p.error = e
+                cfg = backup
+        return cfg, ok
+
+    def _apply(self, batch: list[_Pending]) -> None:
+        saved = False
+        try:
+            with self._locked():
+                for attempt in range(max(1, CONFIG_WRITE_RETRIES)):
+                    try:
+                        ok = self._read_mutate_save(batch)
+                    except ConfigConflict:
+                        self.conflicts += 1
+                        if attempt + 1 >= max(1, CONFIG_WRITE_RETRIES):
+                            raise
+                        # не дочекались блокування — трохи чекаємо і застосовуємо ще раз на свіжому
+                        time.sleep(random.uniform(0, 0.01 * 2 ** attempt))
+                        continue
+                    if ok:
+                        saved = True
+                        self.writes += 1
+                        self.coalesced += ok - 1
+                    break
+        except Exception as e:  # запис не вдався — повідомляємо всім, хто чекав
+            for p in batch:
+                if p.error is None:
+                    p.error = e
+        finally:
+            if saved and self.on_saved:
+                self.on_saved()
+            for p in batch:
+                p.done.set()
+
+    def _read_mutate_save(self, batch: list[_Pending]) -> int:
+        """Один прохід: свіжий конфіг → зміни пачки → запис. → скільки змін вдалось."""
+        if self.source == "db":
+            from . import config_db
+            applied = 0
+
+            def mutate(cfg: RawConfigParser) -> tuple[RawConfigParser, bool]:
+                nonlocal applied
+                cfg, applied = self._mutate(batch, cfg)
+                return cfg, bool(applied)
+
+            config_db.update_cfg(mutate)
+            return applied
+        cfg, ok = self._mutate(batch, self.read())
+        if ok:
+            self._save(cfg)
+        return ok
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        if self.source == "db" or fcntl is None:
+            yield  # БД: блокування версії в транзакції config_db.update_cfg
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path.with_name(self.path.name + ".lock"), os.O_RDWR | os.O_CREAT, 0o664)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+    def _save(self, cfg: RawConfigParser) -> None:
+        # temp у тій самій теці → fsync → rename: читач ніколи не бачить напівзаписаний файл
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=self.path.name + ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                cfg.write(f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.chmod(tmp, 0o664)
+            os.replace(tmp, self.path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
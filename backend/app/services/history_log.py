@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+"""
+Write-behind журнал розрахунків у quote_history (компактні рядки, див. history_store.py).
+
+Запит лише кладе запис у обмежену чергу (put_nowait) і ніколи не чекає на БД.
+Фоновий потік збирає пачки (до HISTORY_BATCH_SIZE записів або раз на
+HISTORY_FLUSH_SECONDS), розбирає вхід у типізовані колонки і вставляє їх
+одним executemany.
+
+Якщо БД повільна чи недоступна — черга заповнюється, нові записи
+відкидаються (лічильник dropped), невдалі пачки рахуються у failed_rows,
+а флешер робить експоненційну паузу до HISTORY_RETRY_MAX_SECONDS.
+
+ENV:
+    HISTORY_ENABLED           — 1/true, щоб увімкнути (за замовчуванням вимкнено)
+    HISTORY_QUEUE_SIZE        — місткість черги, 10000
+    HISTORY_BATCH_SIZE        — максимум записів в одній вставці, 500
+    HISTORY_FLUSH_SECONDS     — максимальна затримка пачки, 1.0
+    HISTORY_RETRY_MAX_SECONDS — стеля паузи після помилки БД, 30
+
+У тій самій транзакції оновлюються агрегати для дашбордів (services/rollups.py).
+Таблиці створюють міграції (cd backend && alembic upgrade head).
+Працює і на SQLite за замовчуванням, і на Postgres (psycopg).
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+
+log = logging.getLogger(__name__)
+
+def _env_flag(name: str) -> bool:
+    return os.getenv(name, "").strip().lower() in {"1", "true", "yes", "on"}
+
+class HistoryWriter:
+    def __init__(self, enabled: bool, maxsize: int, batch_size: int,
+                 flush_seconds: float, retry_max_seconds: float) -> None:
+        self.enabled = enabled
+        self.batch_size = max(1, batch_size)
+        self.flush_seconds = flush_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self._q: queue.Queue[dict] = queue.Queue(maxsize=maxsize)
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        # лічильники
+        self.enqueued = 0
+        self.dropped = 0
+        self.written = 0
+        self.failed_rows = 0
+        self.batches = 0
+        self.last_error: str | None = None
+
+    # ---------- шлях запиту ----------
+
+    def submit(self, input_json: dict, price_total: int, model, user_id: str | None = None) -> bool:
+        """
+        Неблокуюче: True — запис у черзі, False — відкинуто (черга повна / вимкнено).
+        model — PricingModel, якою рахували (з неї — config_id); нормалізація входу — у флешері.
+        """
+        if not self.enabled:
+            return False
+        row = {
+            "created_at": datetime.now(timezone.utc),
+            "input_json": input_json,
+            "price_total": price_total,
+            "model": model,
+            "user_id": user_id,
+        }
+        try:
+            self._q.put_nowait(row)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+        with self._lock:
+            self.enqueued += 1
+        return True
+
+    # ---------- життєвий цикл ----------
+
+    def start(self) -> None:
+        if not self.enabled or (self._thread and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="history-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Зупиняємо флешер, дописавши те, що вже в черзі (в межах timeout)."""
+        if not self._thread:
+            return
+        self._stop.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    # ---------- фоновий флешер ----------
+
+    def _collect(self) -> list[dict]:
+        try:
+            first = self._q.get(timeout=self.flush_seconds)
+        except queue.Empty:
+            return []
+        batch = [first]
+        deadline = time.monotonic() + self.flush_seconds
+        while len(batch) < self.batch_size:
+            left = deadline - time.monotonic()
+            try:
+                batch.append(self._q.get(timeout=left) if left > 0 else self._q.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        backoff = 0.0
+        while True:
+            batch = self._collect()
+            if batch:
+                if self._flush(batch):
+                    backoff = 0.0
+                else:
+                    backoff = min(self.retry_max_seconds, (backoff or 0.5) * 2)
+                    # поки чекаємо — черга заповнюється і submit() починає відкидати
+                    self._stop.wait(backoff)
+            elif self._stop.is_set():
+                return
+
+    def _flush(self, batch: list[dict]) -> bool:
+        from sqlalchemy import insert
+        from ..core.db import SessionLocal
+        from ..models.history import QuoteRecord
+        from .history_store import CONFIG_IDS, compact_batch
+        from .rollups import apply_delta
+
+        try:
+            # config_snapshot, рядки і агрегати — одна транзакція: все або нічого
+            with SessionLocal() as session:
+                rows, delta = compact_batch(session, batch, CONFIG_IDS)
+                session.execute(insert(QuoteRecord), rows)
+                apply_delta(session, delta)
+                session.commit()
+                CONFIG_IDS.committed(session)
+        except Exception as e:  # БД недоступна / таблиці немає — не валимо процес
+            with self._lock:
+                self.failed_rows += len(batch)
+                self.last_error = f"{e.__class__.__name__}: {e}"[:500]
+            log.warning("history flush failed (%d rows): %s", len(batch), e)
+            return False
+        with self._lock:
+            self.written += len(batch)
+            self.batches += 1
+        return True
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "running": bool(self._thread and self._thread.is_alive()),
+                "queued": self._q.qsize(),
+                "queue_size": self._q.maxsize,
+                "enqueued": self.enqueued,
+                "dropped": self.dropped,
+                "written": self.written,
+                "failed_rows": self.failed_rows,
+                "batches": self.batches,
+                "last_error": self.last_error,
+            }
+
+HISTORY = HistoryWriter(
+    enabled=_env_flag("HISTORY_ENABLED"),
+    maxsize=int(os.getenv("HISTORY_QUEUE_SIZE", "10000")),
+    batch_size=int(os.getenv("HISTORY_BATCH_SIZE", "500")),
+    flush_seconds=float(os.getenv("HISTORY_FLUSH_SECONDS", "1.0")),
+    retry_max_seconds=float(os.getenv("HISTORY_RETRY_MAX_SECONDS", "30")),
+)
@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+"""
+Компактний журнал розрахунків: quote_history + config_snapshot.
+
+Рядок історії — лише типізовані числа (L, W, H, номер опції кольору,
+price_total) і config_id. Сам конфіг — JSON bundle моделі, якою рахували
+(services/pricing_bundle.py: ставки, чинна версія прайсу, опції, округлення),
+у config_snapshot під його ж версією-хешем: скільки б розрахунків не
+було, кожен різний конфіг лежить у БД один раз. position_idx — номер
+назви в sorted(position_bp) цього bundle, -1 — без опції (або невідома,
+вона й рахується як 0 %). Інші групи опцій — маленький JSON лише там,
+де їх вибрали.
+
+Рядок config_snapshot створюється в тій самій транзакції, що й рядки
+історії, які на нього посилаються (INSERT … ON CONFLICT DO NOTHING, потім
+SELECT): пачка або записується разом з конфігом, або не записується зовсім,
+і паралельний воркер з тим самим конфігом її не валить.
+
+Для флешера (history_log.py) і конвертера старих calc_history
+(`python -m backend.app.cli history-compact`).
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from datetime import datetime, timezone
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..models.history import CalcHistory, QuoteRecord, StoredConfig
+from .calc_engine import PricingModel, normalize_input, normalize_options
+from .pricing_bundle import render_bundle
+from .rollups import RollupDelta
+
+log = logging.getLogger(__name__)
+
+def _insert_config(session: Session, digest: str, body: str) -> None:
+    """INSERT рядка config_snapshot, якщо такого digest ще немає (в транзакції session)."""
+    dialect = session.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        # паралельна транзакція з тим самим digest: чекаємо її COMMIT і нічого не вставляємо
+        session.execute(dialect_insert(StoredConfig).values(digest=digest, body=body)
+                        .on_conflict_do_nothing(index_elements=["digest"]))
+        return
+    try:  # інші БД: savepoint, щоб дубль не відкотив усю пачку
+        with session.begin_nested():
+            session.execute(insert(StoredConfig).values(digest=digest, body=body))
+    except IntegrityError:
+        pass
+
+def _config_id(session: Session, digest: str, body: str) -> int:
+    """id рядка config_snapshot з цим digest; створює в транзакції session, якщо ще немає."""
+    cid = session.execute(select(StoredConfig.id).where(StoredConfig.digest == digest)).scalar()
+    if cid is None:
+        _insert_config(session, digest, body)
+        cid = session.execute(select(StoredConfig.id).where(StoredConfig.digest == digest)).scalar_one()
+    return cid
+
+class ConfigIds:
+    """
+    (версія моделі, версія прайсу) → (config_id, {назва опції: номер}); кеш на процес.
+    У спільний кеш id потрапляє лише після COMMIT транзакції, що могла його
+    створити (committed(session)); до того він живе в session.info.
+    """
+
+    def __init__(self, maxsize: int = 64) -> None:
+        self.maxsize = maxsize
+        self._ids: dict[tuple[int, int], tuple[int, dict[str, int]]] = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, session: Session, m: PricingModel) -> tuple[int, dict[str, int]]:
+        key = (m.version, m.price_list)
+        hit = self._ids.get(key)
+        if hit is not None:
+            return hit
+        pending = session.info.setdefault("config_ids", {})
+        hit = pending.get(key)
+        if hit is not None:
+            return hit
+        digest, body = render_bundle(m)
+        hit = pending[key] = (
+            _config_id(session, digest, body.decode("utf-8")),
+            {name: i for i, name in enumerate(sorted(m.position_bp))},
+        )
+        return hit
+
+    def committed(self, session: Session) -> None:
+        """Після session.commit(): id, знайдені/створені в цій транзакції, — у спільний кеш."""
+        pending = session.info.pop("config_ids", None)
+        if not pending:
+            return
+        with self._lock:
+            if len(self._ids) + len(pending) > self.maxsize:
+                self._ids.clear()
+            self._ids.update(pending)
+
+    @staticmethod
+    def discard(session: Session) -> None:
+        """Після rollback: id з відкоченої транзакції могли й не дожити до БД."""
+        session.info.pop("config_ids", None)
+
+CONFIG_IDS = ConfigIds()
+
+def compact(session: Session, created_at: datetime, input_json: dict, total: int, m: PricingModel,
+            user_id: str | None = None, ids: ConfigIds = CONFIG_IDS) -> tuple[dict, str]:
+    """
+    Запис журналу → (рядок quote_history, назва опції для агрегатів; "" — без опції).
+    config_id — з транзакції session: рядок треба вставити в ній же.
+    """
+    L, W, H, pos = normalize_input(input_json)
+    options = normalize_options(input_json)
+    cid, index = ids.resolve(session, m)
+    idx = index.get(pos, -1)
+    row = {
+        "created_at": created_at,
+        "config_id": cid,
+        "L": L,
+        "W": W,
+        "H": H,
+        "position_idx": idx,
+        "total": int(total),
+        "options": {g: list(names) for g, names in options} or None,
+        "user_id": user_id,
+    }
+    return row, pos if idx >= 0 else ""
+
+def compact_batch(session: Session, batch: list[dict],
+                  ids: ConfigIds = CONFIG_IDS) -> tuple[list[dict], RollupDelta]:
+    """Пачка з черги HistoryWriter → рядки quote_history + приріст агрегатів (config_id — у session)."""
+    rows = []
+    delta = RollupDelta()
+    for r in batch:
+        row, pos = compact(session, r["created_at"], r["input_json"], r["price_total"], r["model"],
+                           r.get("user_id"), ids)
+        rows.append(row)
+        delta.add(row["created_at"], row["L"], pos, row["total"])
+    return rows, delta
+
+# ------------------------ Конвертер calc_history ------------------------ #
+
+def convert_legacy(session: Session, m: PricingModel, chunk: int = 5000,
+                   dry_run: bool = False, ids: ConfigIds = CONFIG_IDS) -> tuple[int, int]:
+    """
+    Переносить calc_history → quote_history пачками (config_snapshot, вставка
+    і видалення — в одній транзакції на пачку), конфіг — модель m (та, що
+    діяла, коли писалась стара історія). Лишаються рядки, які не вдається
+    розібрати, і ті, чия опція кольору невідома m, — їх агрегати й далі
+    читають зі старої таблиці; скільки і чому — в лог. Повертає (перенесено,
+    лишилось). Агрегати не змінюються: ті самі розрахунки, лише в іншій таблиці.
+    """
+    moved = 0
+    broken = unknown = 0  # з kept: не розібрались / опції немає в m
+    last = 0
+    while True:
+        legacy = session.execute(
+            select(CalcHistory.id, CalcHistory.created_at, CalcHistory.input_json,
+                   CalcHistory.output_json, CalcHistory.user_id)
+            .where(CalcHistory.id > last).order_by(CalcHistory.id).limit(chunk)
+        ).all()
+        if not legacy:
+            break
+        last = legacy[-1].id
+        rows, done = [], []
+        for r in legacy:
+            inp = r.input_json if isinstance(r.input_json, dict) else {}
+            try:
+                row, pos = compact(session, r.created_at or datetime.now(timezone.utc), inp,
+                                   int((r.output_json or {}).get("price_total") or 0), m, r.user_id, ids)
+            except Exception:
+                broken += 1
+                continue
+            # L не розібрався або назви опції немає в m — не втрачаємо оригінал
+            if row["L"] <= 0:
+                broken += 1
+                continue
+            if not pos and normalize_input(inp)[3]:
+                unknown += 1
+                continue
+            rows.append(row)
+            done.append(r.id)
+        moved += len(rows)
+        if dry_run or not rows:
+            continue
+        session.execute(insert(QuoteRecord), rows)
+        session.execute(delete(CalcHistory).where(CalcHistory.id.in_(done)))
+        session.commit()
+        ids.committed(session)
+    if dry_run:
+        session.rollback()  # config_snapshot, вставлений для config_id, теж не лишаємо
+        ids.discard(session)
+    kept = broken + unknown
+    if kept:
+        log.warning("history-compact: %d rows left in calc_history (%d unparsable or without length, "
+                    "%d with a colour option unknown to the config)", kept, broken, unknown)
+    return moved, kept
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""
+Снапшот/модель для async-маршрутів — без I/O на event loop.
+
+Звичайний get_snapshot() раз на CONFIG_STAT_SECONDS робить stat() файлу
+(або SELECT версії в БД) — для event loop це заборонено. Тут:
+  - є снапшот і він свіжий → віддаємо одразу (лише читання mmap-лічильника);
+  - пора перевірити джерело або інший воркер записав конфіг → віддаємо
+    поточний снапшот, а перевірку/перечитування запускаємо фоновою задачею
+    в threadpool (одна на процес);
+  - снапшота ще немає (старт, або цей процес сам щойно зберіг конфіг) →
+    чекаємо перечитування в threadpool: власні записи видно одразу.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+
+from anyio import to_thread
+
+from .calc_engine import PricingModel, model_for
+from .config_loader import ConfigSnapshot, get_snapshot, peek_snapshot
+
+log = logging.getLogger(__name__)
+
+_REFRESH: asyncio.Task | None = None
+
+async def _refresh() -> None:
+    try:
+        await to_thread.run_sync(get_snapshot)
+    except Exception:  # наступний запит спробує ще раз
+        log.exception("background config refresh failed")
+
+def _schedule_refresh() -> None:
+    global _REFRESH
+    if _REFRESH is None or _REFRESH.done():
+        _REFRESH = asyncio.get_running_loop().create_task(_refresh())
+
+async def current_snapshot() -> ConfigSnapshot:
+    snap, stale = peek_snapshot()
+    if snap is None:
+        return await to_thread.run_sync(get_snapshot)
+    if stale:
+        _schedule_refresh()
+    return snap
+
+async def current_model(as_of=None) -> PricingModel:
+    """Модель на момент as_of (None — зараз); версія прайсу — з індексу снапшота."""
+    return model_for(await current_snapshot(), as_of)
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""
+Гроші в цілих копійках і режими округлення підсумку.
+
+Рушій рахує всі суми в копійках (int), частки — в базисних пунктах
+(1 bp = 0.01 %). Значення з конфігу (грн, %) переводимо в ці одиниці один
+раз при компіляції моделі (to_kop / to_bp), далі — лише цілочисельні
+множення й ділення, без float і без Decimal на кожен розрахунок.
+
+ROUNDING — реєстр режимів округлення підсумку: копійки → цілі гривні.
+Режим вибирається при компіляції моделі; невідомий режим адмінка не
+збереже (check_rounding).
+"""
+
+from __future__ import annotations
+
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Callable
+
+def div_half_even(n: int, d: int) -> int:
+    """n / d до цілого, половини до парного (як round()); d > 0, n — будь-якого знаку."""
+    q, r = divmod(n, d)
+    r += r
+    if r > d or (r == d and q & 1):
+        q += 1
+    return q
+
+def _to_units(x, scale: int) -> int:
+    # через десятковий запис: 22.1 → 2210, а не 2209.999…
+    return int((Decimal(str(x)) * scale).quantize(Decimal("0"), rounding=ROUND_HALF_UP))
+
+def to_kop(uah) -> int:
+    """Гривні (число або рядок з конфігу) → копійки, половини від нуля."""
+    return _to_units(uah, 100)
+
+def to_bp(percent) -> int:
+    """Відсотки → базисні пункти (0.01 %), половини від нуля."""
+    return _to_units(percent, 100)
+
+# ---------------------- Округлення підсумку ---------------------- #
+#
+# Кожна функція: копійки (int) → цілі гривні (int). «nearest*» і «round» —
+# половини від нуля (як Decimal ROUND_HALF_UP), «ceil*» — вгору, «floor» — вниз.
+
+def _ceil(step: int) -> Callable[[int], int]:
+    k = step * 100
+    return lambda kop: -(-kop // k) * step
+
+def _nearest(step: int) -> Callable[[int], int]:
+    k = step * 100
+    half = k // 2
+    return lambda kop: (kop + half) // k * step if kop >= 0 else -((half - kop) // k * step)
+
+ROUNDING: dict[str, Callable[[int], int]] = {
+    "ceil10": _ceil(10),
+    "ceil100": _ceil(100),
+    "nearest10": _nearest(10),
+    "nearest100": _nearest(100),
+    "round": _nearest(1),
+    "floor": lambda kop: kop // 100,
+}
+
+ROUNDING_MODES = tuple(ROUNDING)
+DEFAULT_ROUNDING = "ceil10"
+
+def check_rounding(mode) -> str:
+    """Нормалізований режим округлення або ValueError зі списком допустимих."""
+    m = str(mode or "").strip().lower()
+    if m not in ROUNDING:
+        raise ValueError(f"unknown rounding mode {mode!r}; expected one of: {', '.join(ROUNDING_MODES)}")
+    return m
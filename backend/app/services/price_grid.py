@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+Генератор повного прайс-листа: L × W × H × опція кольору.
+
+Сітка ніколи не збирається в пам'яті цілком: для кожної комбінації
+(опція, W, H) рахуємо шматок довжин через compute_batch() і одразу
+віддаємо його як NDJSON/CSV байти. Уся генерація йде по одній моделі
+(одна версія конфігу на весь прогін).
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+import zlib
+from typing import Iterable, Iterator, List, Sequence
+
+from .calc_engine import PricingModel, compute_batch, get_model
+
+# колонки рядка сітки (вхід + результат compute())
+GRID_FIELDS = [
+    "L", "W", "H", "position",
+    "price_per_meter", "price_base", "surcharge_width", "surcharge_height",
+    "surcharge_color_percent", "surcharge_color_amount", "price_total",
+]
+_OUT_FIELDS = GRID_FIELDS[4:]
+
+CHUNK_ROWS = 2000  # скільки довжин рахуємо за один compute_batch()
+
+def grid_lengths(model: PricingModel, step: int = 10,
+                 start: int | None = None, stop: int | None = None) -> range:
+    """Довжини від min_length до max_length включно з кроком step (мм)."""
+    if step <= 0:
+        raise ValueError("step must be positive")
+    lo = model.min_length if start is None else start
+    hi = model.max_length if stop is None else stop
+    return range(lo, hi + 1, step)
+
+def grid_size(lengths: Sequence[int], widths: Sequence[int],
+              heights: Sequence[int], positions: Sequence[str]) -> int:
+    return len(lengths) * len(widths) * len(heights) * len(positions)
+
+def iter_grid_chunks(model: PricingModel, lengths: Sequence[int], widths: Sequence[int],
+                     heights: Sequence[int], positions: Sequence[str]) -> Iterator[List[list]]:
+    """Шматки рядків сітки (списки значень у порядку GRID_FIELDS)."""
+    for pos in positions:
+        for w in widths:
+            for h in heights:
+                for i in range(0, len(lengths), CHUNK_ROWS):
+                    ls = lengths[i:i + CHUNK_ROWS]
+                    n = len(ls)
+                    cols = compute_batch(ls, [w] * n, [h] * n, [pos] * n, model)
+                    outs = [cols[k] for k in _OUT_FIELDS]
+                    yield [[l, w, h, pos, *vals] for l, *vals in zip(ls, *outs)]
+
+# ----------------------------- Формати ----------------------------- #
+
+def _ndjson(chunks: Iterable[List[list]]) -> Iterator[bytes]:
+    dumps = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+    for rows in chunks:
+        yield "".join(dumps(dict(zip(GRID_FIELDS, r))) + "\n" for r in rows).encode("utf-8")
+
+def _csv(chunks: Iterable[List[list]]) -> Iterator[bytes]:
+    buf = io.StringIO()
+    w = csv.writer(buf, lineterminator="\n")
+    yield (",".join(GRID_FIELDS) + "\n").encode("utf-8")  # заголовок — навіть для порожньої сітки
+    for rows in chunks:
+        w.writerows(rows)
+        yield buf.getvalue().encode("utf-8")
+        buf.seek(0)
+        buf.truncate()
+
+def _gzip(parts: Iterable[bytes]) -> Iterator[bytes]:
+    z = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 → gzip-обгортка
+    for p in parts:
+        out = z.compress(p)
+        if out:
+            yield out
+    yield z.flush()
+
+def render_grid(fmt: str, lengths: Sequence[int], widths: Sequence[int],
+                heights: Sequence[int], positions: Sequence[str] | None = None,
+                gzip: bool = False, model: PricingModel | None = None) -> Iterator[bytes]:
+    """
+    Потік байтів прайс-листа у форматі "ndjson" або "csv".
+    positions=None — усі опції групи кольорів.
+    """
+    m = model or get_model()
+    if positions is None:
+        positions = list(m.positions)
+    chunks = iter_grid_chunks(m, lengths, widths, heights, positions)
+    if fmt == "ndjson":
+        out = _ndjson(chunks)
+    elif fmt == "csv":
+        out = _csv(chunks)
+    else:
+        raise ValueError("format must be ndjson|csv")
+    return _gzip(out) if gzip else out
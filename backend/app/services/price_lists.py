@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""
+Версії прайсу з датою набуття чинності (PRICE_LISTS_ENABLED=1).
+
+Кожна версія — незмінний рядок price_list_version (ціна за метр high/low +
+effective_at). Діє версія з найпізнішим effective_at ≤ моменту розрахунку;
+до першої версії — ставки з [base] конфігу. Так можна і порахувати «як на
+дату» (as_of), і заздалегідь запланувати завтрашнє подорожчання.
+
+Рядки читаються разом зі снапшотом конфігу (config_loader._rebuild_snapshot)
+у PriceIndex — відсортовані моменти початку + версії, пошук bisect'ом,
+O(log n) і без БД на розрахунок. Запис (create/delete) скидає снапшот і
+піднімає спільне покоління — інші воркери перечитають індекс; у режимі
+CONFIG_SOURCE=db ще й інкрементуємо config_state.version в тій самій
+транзакції, щоб побачили й інші хости.
+
+Минуле не переписуємо: нову версію можна додати лише з effective_at не
+раніше «зараз», видалити — лише ту, що ще не набула чинності.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import time
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+log = logging.getLogger(__name__)
+
+PRICE_LISTS_ENABLED = os.getenv("PRICE_LISTS_ENABLED", "").strip().lower() in {"1", "true", "yes", "on"}
+
+@dataclass(frozen=True, slots=True)
+class PriceList:
+    id: int
+    effective_at: float     # unix-час, с
+    price_high: int
+    price_low: int
+    note: str = ""
+
+    def as_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "effective_at": datetime.fromtimestamp(self.effective_at, timezone.utc).isoformat(),
+            "price_high": self.price_high,
+            "price_low": self.price_low,
+            "note": self.note,
+        }
+
+@dataclass(frozen=True, slots=True)
+class PriceIndex:
+    starts: tuple[float, ...] = ()        # effective_at за зростанням
+    lists: tuple[PriceList, ...] = ()     # у тому ж порядку
+
+    def __bool__(self) -> bool:
+        return bool(self.starts)
+
+    def at(self, ts: float | None = None) -> PriceList | None:
+        """Чинна на момент ts (None — зараз) версія або None, якщо діє [base]."""
+        i = bisect_right(self.starts, time.time() if ts is None else ts)
+        return self.lists[i - 1] if i else None
+
+EMPTY_PRICES = PriceIndex()
+
+def as_timestamp(value) -> float | None:
+    """as_of з запиту (datetime, ISO-рядок або unix-час) → unix-час; без зони — UTC."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.timestamp()
+    raise ValueError(f"invalid as_of: {value!r}")
+
+def _row(r) -> PriceList:
+    return PriceList(
+        id=r.id,
+        effective_at=as_timestamp(r.effective_at),
+        price_high=int(r.price_high),
+        price_low=int(r.price_low),
+        note=r.note or "",
+    )
+
+# ------------------------------ Читання ------------------------------ #
+
+def load_index() -> PriceIndex:
+    """Усі версії з БД → PriceIndex (один SELECT; викликається при перечитуванні снапшота)."""
+    from sqlalchemy import select
+    from ..core.db import SessionLocal
+    from ..models.price_list import PriceListVersion
+
+    with SessionLocal() as s:
+        rows = s.execute(select(PriceListVersion).order_by(PriceListVersion.effective_at)).scalars().all()
+    lists = tuple(sorted((_row(r) for r in rows), key=lambda p: p.effective_at))
+    return PriceIndex(starts=tuple(p.effective_at for p in lists), lists=lists)
+
+# ------------------------------- Запис ------------------------------- #
+
+def _changed(session) -> None:
+    from .config_store import CONFIG_SOURCE
+    if CONFIG_SOURCE == "db":
+        from sqlalchemy import update
+        from ..models.config_store import ConfigState
+        session.execute(update(ConfigState).where(ConfigState.id == 1).values(version=ConfigState.version + 1))
+
+def create_price_list(price_high: int, price_low: int, effective_at=None, note: str = "") -> PriceList:
+    """Нова версія; effective_at=None — діє відразу. ValueError — якщо в минулому чи зайнято."""
+    from sqlalchemy import insert, select
+    from ..core.db import SessionLocal
+    from ..models.price_list import PriceListVersion
+    from .config_loader import invalidate_settings
+
+    now = time.time()
+    ts = as_timestamp(effective_at) if effective_at is not None else now
+    if ts < now - 1.0:  # секунда на дорогу запиту
+        raise ValueError("effective_at must not be in the past")
+    if int(price_high) <= 0 or int(price_low) <= 0:
+        raise ValueError("prices must be positive")
+    when = datetime.fromtimestamp(ts, timezone.utc)
+    with SessionLocal() as s, s.begin():
+        if s.execute(select(PriceListVersion.id).where(PriceListVersion.effective_at == when)).first():
+            raise ValueError(f"a price list already takes effect at {when.isoformat()}")
+        new_id = s.execute(
+            insert(PriceListVersion).values(
+                effective_at=when, price_high=int(price_high), price_low=int(price_low), note=note or "",
+            ).returning(PriceListVersion.id)
+        ).scalar_one()
+        _changed(s)
+    invalidate_settings()
+    return PriceList(id=new_id, effective_at=ts, price_high=int(price_high), price_low=int(price_low),
+                     note=note or "")
+
+def delete_price_list(list_id: int) -> bool:
+    """Скасувати заплановану версію. False — немає такої; ValueError — вже набула чинності."""
+    from sqlalchemy import delete, select
+    from ..core.db import SessionLocal
+    from ..models.price_list import PriceListVersion
+    from .config_loader import invalidate_settings
+
+    with SessionLocal() as s, s.begin():
+        r = s.execute(select(PriceListVersion).where(PriceListVersion.id == list_id)).scalar_one_or_none()
+        if r is None:
+            return False
+        if as_timestamp(r.effective_at) <= time.time():
+            raise ValueError("price list is already in effect and cannot be deleted")
+        s.execute(delete(PriceListVersion).where(PriceListVersion.id == list_id))
+        _changed(s)
+    invalidate_settings()
+    return True
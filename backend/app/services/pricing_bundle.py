@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+Опис моделі ціноутворення для розрахунку на клієнті + еталонні вектори.
+
+Bundle — усе, що потрібно quote(), у детермінованому JSON (ключі відсортовані,
+без версії снапшота і часу завантаження): межі інтерполяції, ціни за метр,
+доплата за мм у копійках, bp опцій кольору, скомпільовані групи опцій
+(bp, копійки, dbp), режим округлення. Лише цілі числа — клієнт рахує так само
+цілочисельно, як calc_engine.
+version — sha256 цього JSON (перші 16 hex), однаковий у всіх воркерах і
+після рестарту, поки не змінився зміст. engine — ревізія математики
+(calc_engine.ENGINE_REVISION): клієнт, який її не знає, рахує на сервері.
+
+Вектори — детермінований набір входів (межі діапазонів, кожна опція кольору,
+кожен пункт кожної групи, плюс псевдовипадкові з фіксованим seed) і
+результати саме calc_engine.compute(). Клієнт проганяє їх перед тим, як
+рахувати локально; вони ж — регресійний оракул для змін рушія
+(`python -m backend.app.cli golden-vectors --check файл`).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import random
+import threading
+from collections import OrderedDict
+from typing import Iterator
+
+from .calc_engine import ENGINE_REVISION, PricingModel, compute
+
+BUNDLE_FORMAT = 3
+VECTORS_SEED = 20240901
+VECTORS_RANDOM = 200
+
+def _dumps(obj) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+def bundle_dict(m: PricingModel) -> dict:
+    body = {
+        "format": BUNDLE_FORMAT,
+        "engine": ENGINE_REVISION,
+        "length": {"min": m.min_length, "max": m.max_length},
+        "price_per_meter": {"high": m.price_high, "low": m.price_low},
+        "min_width": m.min_width,
+        "min_height": m.min_height,
+        "extra_kop": m.extra_kop,
+        "rounding": m.rounding_mode,
+        "position_bp": dict(m.position_bp),
+        # у порядку застосування; пункт — [назва, bp, коп., dbp] уже зі знаком оператора
+        "groups": [
+            {"id": g.id, "multi": g.multi,
+             "items": [[name, *g.factors[i]] for name, i in g.index.items()]}
+            for g in sorted(m.groups.values(), key=lambda g: g.order)
+        ],
+    }
+    body["version"] = hashlib.sha256(_dumps(body)).hexdigest()[:16]
+    return body
+
+# Відрендерене — на пару (версія моделі, версія прайсу): запит з as_of, флешер
+# історії (history_store) і звичайні запити можуть рендерити різні моделі
+# одночасно, з різних потоків; вектори лежать у тому ж записі, що й bundle.
+RENDERED_MAX = 8
+
+class _Rendered:
+    __slots__ = ("version", "bundle", "vectors")
+
+    def __init__(self, version: str, bundle: bytes) -> None:
+        self.version = version
+        self.bundle = bundle
+        self.vectors: bytes | None = None
+
+_RENDERED: OrderedDict[tuple[int, int], _Rendered] = OrderedDict()
+_RENDERED_LOCK = threading.Lock()
+
+def _entry(m: PricingModel) -> _Rendered:
+    key = (m.version, m.price_list)
+    with _RENDERED_LOCK:
+        r = _RENDERED.get(key)
+        if r is not None:
+            _RENDERED.move_to_end(key)
+            return r
+    b = bundle_dict(m)  # поза lock-ом: паралельний рендер тієї ж моделі дасть ті самі байти
+    with _RENDERED_LOCK:
+        r = _RENDERED.setdefault(key, _Rendered(b["version"], _dumps(b)))
+        while len(_RENDERED) > RENDERED_MAX:
+            _RENDERED.popitem(last=False)
+    return r
+
+def render_bundle(m: PricingModel) -> tuple[str, bytes]:
+    """(version, JSON-байти) — рендеримо раз на версію моделі."""
+    r = _entry(m)
+    return r.version, r.bundle
+
+def render_vectors(m: PricingModel) -> tuple[str, bytes]:
+    """(version bundle, JSON-байти векторів) тієї самої моделі — теж раз на версію."""
+    r = _entry(m)
+    if r.vectors is None:
+        r.vectors = _dumps(golden_vectors(m, r.version))
+    return r.version, r.vectors
+
+# ------------------------------ Вектори ------------------------------ #
+
+def _lengths(m: PricingModel) -> list[int]:
+    lo, hi = m.min_length, m.max_length
+    edges = {0, 1, lo - 1, lo, lo + 1, (lo + hi) // 2, hi - 1, hi, hi + 1, hi + 333, 2 * hi}
+    return sorted(x for x in edges if x >= 0)
+
+def _inputs(m: PricingModel) -> Iterator[dict]:
+    positions = ["", *m.positions]
+    groups = sorted(m.groups.values(), key=lambda g: g.order)
+    mid = (m.min_length + m.max_length) // 2
+
+    # 1) межі: L × W × H × колір
+    for pos in positions:
+        for L in _lengths(m):
+            for W in (m.min_width, m.min_width + 1, m.min_width + 137):
+                for H in (m.min_height, m.min_height + 1, m.min_height + 55):
+                    yield {"L": L, "W": W, "H": H, "position": pos}
+
+    # 2) кожен пункт кожної групи окремо; для multi — ще всі пункти разом
+    base = {"L": mid, "W": m.min_width + 40, "H": m.min_height + 20, "position": positions[-1]}
+    for g in groups:
+        names = list(g.index)
+        for name in names:
+            yield {**base, "options": {g.id: name if not g.multi else [name]}}
+        if g.multi and len(names) > 1:
+            yield {**base, "options": {g.id: names}}
+    if groups:
+        yield {**base, "options": {g.id: next(iter(g.index), "") for g in groups}}
+
+    # 3) псевдовипадкові комбінації (фіксований seed — той самий набір щоразу)
+    rnd = random.Random(VECTORS_SEED)
+    for _ in range(VECTORS_RANDOM):
+        item = {
+            "L": rnd.randrange(0, 2 * m.max_length + 1),
+            "W": m.min_width + rnd.randrange(-20, 400),
+            "H": m.min_height + rnd.randrange(-20, 300),
+            "position": rnd.choice(positions),
+        }
+        opts = {}
+        for g in groups:
+            names = list(g.index)
+            if not names or rnd.random() < 0.4:
+                continue
+            if g.multi:
+                opts[g.id] = sorted(rnd.sample(names, rnd.randrange(1, len(names) + 1)))
+            else:
+                opts[g.id] = rnd.choice(names)
+        if opts:
+            item["options"] = opts
+        yield item
+
+def golden_vectors(m: PricingModel, version: str | None = None) -> dict:
+    vectors = [{"in": inp, "out": compute(inp, m).model_dump()} for inp in _inputs(m)]
+    return {
+        "bundle": version or bundle_dict(m)["version"],
+        "engine": ENGINE_REVISION,
+        "count": len(vectors),
+        "vectors": vectors,
+    }
+
+def check_vectors(doc: dict, m: PricingModel) -> list[tuple[int, dict, dict]]:
+    """Розбіжності (номер, очікувалось, отримано) між файлом векторів і compute()."""
+    bad = []
+    for i, v in enumerate(doc.get("vectors", [])):
+        got = compute(v["in"], m).model_dump()
+        if got != v["out"]:
+            bad.append((i, v["out"], got))
+    return bad
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""
+LRU/TTL-кеш готових розрахунків перед compute().
+
+Ключ — (версія конфігу, L, W, H, опція) після нормалізації входу, тож
+будь-яке збереження в адмінці автоматично «інвалідує» кеш: нова версія —
+нові ключі, старі просто витісняються.
+
+Налаштування через ENV:
+    QUOTE_CACHE_SIZE — максимум записів (0 — кеш вимкнено), за замовчуванням 4096
+    QUOTE_CACHE_TTL  — час життя запису в секундах (0 — без TTL), за замовчуванням 300
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+from ..schemas.calc_io import CalcOutput
+from .calc_engine import Options, PricingModel, get_model, normalize_input, normalize_options, payload_as_of, quote
+
+class QuoteCache:
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable) -> Any | None:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            expires, value = item
+            if expires and expires < time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        if self.maxsize <= 0:
+            return
+        expires = time.monotonic() + self.ttl if self.ttl > 0 else 0.0
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_ratio": round(self.hits / total, 4) if total else None,
+            }
+
+QUOTE_CACHE = QuoteCache(
+    maxsize=int(os.getenv("QUOTE_CACHE_SIZE", "4096")),
+    ttl=float(os.getenv("QUOTE_CACHE_TTL", "300")),
+)
+
+def cached_compute(payload, model: PricingModel | None = None) -> CalcOutput:
+    """compute() з кешем: однакові (L, W, H, опції) в межах версії конфігу рахуємо один раз."""
+    L, W, H, pos_name = normalize_input(payload)
+    m = model or get_model(payload_as_of(payload))
+    return cached_quote(L, W, H, pos_name, normalize_options(payload), m)
+
+def cached_quote(L: int, W: int, H: int, pos_name: str, options: Options, m: PricingModel) -> CalcOutput:
+    """quote() з кешем — для вже нормалізованого входу (v2 API, WebSocket)."""
+    if QUOTE_CACHE.maxsize <= 0:
+        return quote(L, W, H, pos_name, m, options)
+    # невідомі опції рахуються як 0% — зводимо їх до одного ключа
+    key = (m.version, m.price_list, L, W, H, pos_name if pos_name in m.positions else "", options)
+    out = QUOTE_CACHE.get(key)
+    if out is None:
+        out = quote(L, W, H, pos_name, m, options)
+        QUOTE_CACHE.put(key, out)
+    return out
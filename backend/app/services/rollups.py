@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""
+Інкрементальні агрегати по журналу розрахунків (quote_history + ще не
+перенесені рядки старої calc_history).
+
+apply_delta() викликається флешером історії в тій самій транзакції, що й
+вставка пачки: агрегуємо пачку в пам'яті і робимо по одному upsert на
+кожен ключ (день / опція / кошик довжини). Дашборди читають лише ці
+маленькі таблиці, а не саму історію.
+
+rebuild() — повний перерахунок з обох таблиць журналу (бекфіл, виправлення).
+ENV ROLLUP_LENGTH_BUCKET_MM — ширина кошика довжини, 100 мм.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from typing import Iterable
+
+from sqlalchemy import delete, select, update, insert
+from sqlalchemy.orm import Session
+
+from ..models.history import CalcHistory, QuoteRecord, StoredConfig
+from ..models.rollup import QuoteDaily, QuoteOption, QuoteLengthBucket
+from .calc_engine import normalize_input
+
+LENGTH_BUCKET_MM = int(os.getenv("ROLLUP_LENGTH_BUCKET_MM", "100"))
+
+class RollupDelta:
+    """Приріст агрегатів для набору записів історії."""
+
+    def __init__(self) -> None:
+        self.daily: dict[date, list[int]] = defaultdict(lambda: [0, 0])
+        self.options: dict[str, list[int]] = defaultdict(lambda: [0, 0])
+        self.lengths: dict[int, int] = defaultdict(int)
+
+    def add(self, created_at: datetime | None, L: int, pos: str, total: int) -> None:
+        day = (created_at or datetime.now(timezone.utc)).date()
+
+        d = self.daily[day]
+        d[0] += 1
+        d[1] += total
+        o = self.options[pos[:255]]
+        o[0] += 1
+        o[1] += total
+        self.lengths[L // LENGTH_BUCKET_MM * LENGTH_BUCKET_MM] += 1
+
+    def add_legacy(self, created_at: datetime | None, input_json: dict | None, output_json: dict | None) -> None:
+        """Рядок старої calc_history (JSON входу/виходу)."""
+        try:
+            L, _, _, pos = normalize_input(input_json or {})
+        except Exception:
+            L, pos = 0, ""
+        self.add(created_at, L, pos, int((output_json or {}).get("price_total") or 0))
+
+    def __bool__(self) -> bool:
+        return bool(self.daily)
+
+# ------------------------------ Запис ------------------------------ #
+
+def _upsert(session: Session, model, key: str, rows: list[dict], add_cols: Iterable[str]) -> None:
+    """INSERT ... ON CONFLICT DO UPDATE SET col = col + excluded.col (SQLite/Postgres)."""
+    if not rows:
+        return
+    table = model.__table__
+    dialect = session.get_bind().dialect.name
+    if dialect in {"sqlite", "postgresql"}:
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        stmt = dialect_insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c[key]],
+            set_={c: table.c[c] + stmt.excluded[c] for c in add_cols},
+        )
+        session.execute(stmt, rows)
+        return
+    # інші БД: update, а якщо рядка ще немає — insert
+    for r in rows:
+        res = session.execute(
+            update(table).where(table.c[key] == r[key]).values({c: table.c[c] + r[c] for c in add_cols})
+        )
+        if not res.rowcount:
+            session.execute(insert(table).values(**r))
+
+def apply_delta(session: Session, delta: RollupDelta) -> None:
+    _upsert(session, QuoteDaily, "day",
+            [{"day": k, "quotes": q, "total_sum": s} for k, (q, s) in delta.daily.items()],
+            ("quotes", "total_sum"))
+    _upsert(session, QuoteOption, "position",
+            [{"position": k, "quotes": q, "total_sum": s} for k, (q, s) in delta.options.items()],
+            ("quotes", "total_sum"))
+    _upsert(session, QuoteLengthBucket, "bucket",
+            [{"bucket": k, "quotes": q} for k, q in delta.lengths.items()],
+            ("quotes",))
+
+def _position_names(session: Session) -> dict[int, list[str]]:
+    """config_id → назви опцій кольору в порядку position_idx (sorted, як у history_store)."""
+    out = {}
+    for cid, body in session.execute(select(StoredConfig.id, StoredConfig.body)):
+        out[cid] = sorted(json.loads(body).get("position_bp", {}))
+    return out
+
+def rebuild(session: Session, chunk: int = 5000) -> int:
+    """Перерахувати агрегати з нуля по всьому журналу. Повертає кількість рядків."""
+    session.execute(delete(QuoteDaily))
+    session.execute(delete(QuoteOption))
+    session.execute(delete(QuoteLengthBucket))
+    delta = RollupDelta()
+    n = 0
+    names = _position_names(session)
+    rows = session.execute(
+        select(QuoteRecord.created_at, QuoteRecord.config_id, QuoteRecord.L,
+               QuoteRecord.position_idx, QuoteRecord.total)
+        .execution_options(yield_per=chunk)
+    )
+    for created_at, cid, L, idx, total in rows:
+        delta.add(created_at, L, names[cid][idx] if idx >= 0 else "", total)
+        n += 1
+    rows = session.execute(
+        select(CalcHistory.created_at, CalcHistory.input_json, CalcHistory.output_json)
+        .execution_options(yield_per=chunk)
+    )
+    for created_at, inp, out in rows:
+        delta.add_legacy(created_at, inp, out)
+        n += 1
+    apply_delta(session, delta)
+    return n
+
+# ------------------------------ Читання ------------------------------ #
+
+def _avg(total: int, quotes: int) -> float | None:
+    return round(total / quotes, 2) if quotes else None
+
+def read_daily(session: Session, days: int = 30) -> list[dict]:
+    since = datetime.now(timezone.utc).date() - timedelta(days=days - 1)
+    rows = session.execute(
+        select(QuoteDaily).where(QuoteDaily.day >= since).order_by(QuoteDaily.day)
+    ).scalars()
+    return [{"day": r.day.isoformat(), "quotes": r.quotes, "avg_total": _avg(r.total_sum, r.quotes)} for r in rows]
+
+def read_options(session: Session) -> list[dict]:
+    rows = session.execute(select(QuoteOption).order_by(QuoteOption.quotes.desc())).scalars()
+    return [{"position": r.position, "quotes": r.quotes, "avg_total": _avg(r.total_sum, r.quotes)} for r in rows]
+
+def read_lengths(session: Session) -> list[dict]:
+    rows = session.execute(select(QuoteLengthBucket).order_by(QuoteLengthBucket.bucket)).scalars()
+    return [{"from": r.bucket, "to": r.bucket + LENGTH_BUCKET_MM, "quotes": r.quotes} for r in rows]
@@ -1,30 +1,26 @@
 # backend/app/utils.py
 from __future__ import annotations
-from pathlib import Path
 import configparser
 from configparser import RawConfigParser
 from typing import Dict, Any, List
-from pathlib import Path
 
-# Шлях до конфігу (backend/config.ini)
-CONFIG_PATH = Path(__file__).resolve().parents[2] / "config.ini"
+# Той самий конфіг і те саме сховище, що й у калькулятора (backend/config.ini або БД)
+from .services.config_loader import CONFIG_PATH, STORE
+from .services.money import check_rounding
 
 
 # ---------- Базові утиліти для INI ----------
 
-def read_ini() -> configparser.ConfigParser:
+def read_ini() -> RawConfigParser:
     """
     Читаємо INI без інтерполяції (інакше відсотки в рядках ламатимуться).
     """
-    cfg = configparser.ConfigParser(interpolation=None)
-    cfg.read(CONFIG_PATH, encoding="utf-8")
-    return cfg
+    return STORE.read()
 
 
-def write_ini(cfg: configparser.ConfigParser) -> None:
-    CONFIG_PATH.parent.mkdir(parents=True, exist_ok=True)
-    with CONFIG_PATH.open("w", encoding="utf-8") as f:
-        cfg.write(f)
+def write_ini(cfg: configparser.RawConfigParser) -> None:
+    """Повна заміна вмісту. Для точкових змін краще STORE.update(...)."""
+    STORE.replace(cfg)
 
 
 # ---------- Допоміжні: гарантуємо наявність секцій ----------
@@ -64,17 +60,6 @@ def get_base() -> Dict[str, Any]:
     }
 
 
-def _read_cfg() -> RawConfigParser:
-    cfg = RawConfigParser(interpolation=None)
-    if CONFIG_PATH.exists():
-        cfg.read(CONFIG_PATH, encoding="utf-8")
-    return cfg
-
-def _write_cfg(cfg: RawConfigParser) -> None:
-    CONFIG_PATH.parent.mkdir(parents=True, exist_ok=True)
-    with CONFIG_PATH.open("w", encoding="utf-8") as f:
-        cfg.write(f)
-
 def set_base(payload: dict) -> dict:
     """
     Очікуємо payload на кшталт:
@@ -82,12 +67,9 @@ def set_base(payload: dict) -> dict:
     або:
       { "rounding": "ceil10", "price_high": 21101, "price_low": 18257 }
     Пишемо все у [base] ТІЛЬКИ як рядки.
+    Невідомий режим округлення — ValueError (нічого не пишемо).
     """
-    cfg = _read_cfg()
-    if not cfg.has_section("base"):
-        cfg.add_section("base")
-
-    rounding = str(payload.get("rounding") or payload.get("rounding_mode") or "ceil10")
+    rounding = check_rounding(payload.get("rounding") or payload.get("rounding_mode") or "ceil10")
 
     # приймаємо обидва варіанти ключів
     ppm = payload.get("price_per_meter") or {}
@@ -104,11 +86,14 @@ def set_base(payload: dict) -> dict:
     except Exception:
         low = "18257"
 
-    cfg.set("base", "rounding", rounding)
-    cfg.set("base", "price_high", high)
-    cfg.set("base", "price_low", low)
+    def _apply(cfg: RawConfigParser) -> None:
+        if not cfg.has_section("base"):
+            cfg.add_section("base")
+        cfg.set("base", "rounding", rounding)
+        cfg.set("base", "price_high", high)
+        cfg.set("base", "price_low", low)
 
-    _write_cfg(cfg)
+    STORE.update(_apply)
 
     # вертаємо те, що очікує фронт
     return {
@@ -186,29 +171,29 @@ def save_group(name: str, data: Dict[str, Any]) -> Dict[str, Any]:
     Створює/оновлює групу (ім’я секції == group:{name}).
     data очікується у форматі: { name, mode, items:[{name, op, value}, ...] }
     """
-    cfg = read_ini()
     sec = _group_section(name)
-    ensure_group(cfg, name)
-
     mode = (data.get("mode") or "single").strip()
-    cfg[sec]["mode"] = mode
 
-    # Готуємо чисті item.* — спершу видалимо старі
-    for k in list(cfg[sec].keys()):
-        if k.startswith("item."):
-            del cfg[sec][k]
+    def _apply(cfg: RawConfigParser) -> None:
+        ensure_group(cfg, name)
+        cfg[sec]["mode"] = mode
 
-    items = data.get("items") or []
-    for i, it in enumerate(items, start=1):
-        label = str(it.get("name", "")).strip()
-        op = str(it.get("op", "mul")).strip()
-        try:
-            value = float(it.get("value", 0))
-        except (TypeError, ValueError):
-            value = 0.0
-        cfg[sec][f"item.{i}"] = f"{label}|{op}|{value}"
+        # Готуємо чисті item.* — спершу видалимо старі
+        for k in list(cfg[sec].keys()):
+            if k.startswith("item."):
+                del cfg[sec][k]
 
-    write_ini(cfg)
+        items = data.get("items") or []
+        for i, it in enumerate(items, start=1):
+            label = str(it.get("name", "")).strip()
+            op = str(it.get("op", "mul")).strip()
+            try:
+                value = float(it.get("value", 0))
+            except (TypeError, ValueError):
+                value = 0.0
+            cfg[sec][f"item.{i}"] = f"{label}|{op}|{value}"
+
+    STORE.update(_apply)
     # віддаємо вже уніфікований вигляд
     return get_group(name)
 
@@ -217,11 +202,9 @@ def delete_group(name: str) -> None:
     """
     Видаляє секцію групи.
     """
-    cfg = read_ini()
     sec = _group_section(name)
-    if sec in cfg:
-        cfg.remove_section(sec)
-        write_ini(cfg)
+    if sec in read_ini():
+        STORE.update(lambda cfg: cfg.remove_section(sec))
 
 
 # ---------- Сумісність для калькулятора (/api/calc/config) ----------
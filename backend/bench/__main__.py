@@ -0,0 +1,311 @@
+# -*- coding: utf-8 -*-
+"""
+Мікробенчмарки гарячого шляху калькулятора.
+
+    python -m backend.bench                      # усі кейси, JSON у stdout
+    python -m backend.bench -k route --quick     # фільтр за назвою, менше ітерацій
+    python -m backend.bench --save               # зберегти як baseline
+    python -m backend.bench --compare            # порівняти з baseline (код 1 при регресії)
+
+Працює офлайн: конфіг — тимчасова копія backend/config.ini (справжній файл
+не читається після старту і не пишеться), історія вимкнена, маршрути —
+через httpx.ASGITransport без мережі.
+
+Для кожного кейсу:
+    ops_per_s      — викликів за секунду (увесь прогін)
+    p50_us/p99_us  — час одного виклику; вибірка = середнє по пачці з `inner` викликів
+    cpu_us         — процесорний час (process_time) на виклик за весь прогін
+    alloc_bytes    — медіана пікового приросту пам'яті (tracemalloc) за один виклик
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+BASELINE = Path(__file__).with_name("baseline.json")
+SOURCE_CONFIG = Path(__file__).resolve().parents[1] / "config.ini"
+GROUP_COUNTS = (10, 100, 1000)
+
+@dataclass
+class Case:
+    name: str
+    fn: Callable[[], object] | None = None        # синхронний виклик
+    afn: Callable[[], object] | None = None       # async-виклик (маршрути)
+    inner: int = 100                               # викликів в одній вибірці
+    samples: int = 200
+    setup: Callable[[], None] | None = None
+
+# ------------------------------ Вимір ------------------------------ #
+
+def _alloc_bytes(call: Callable[[], object], n: int = 25) -> int:
+    peaks = []
+    tracemalloc.start()
+    try:
+        call()  # ліниві кеші — поза виміром
+        for _ in range(n):
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            call()
+            peaks.append(tracemalloc.get_traced_memory()[1] - base)
+    finally:
+        tracemalloc.stop()
+    return int(statistics.median(peaks))
+
+def _summary(per_call_ns: list[float], calls: int, total_ns: int, cpu_ns: int, alloc: int) -> dict:
+    per_call_ns.sort()
+    p99 = per_call_ns[min(len(per_call_ns) - 1, int(len(per_call_ns) * 0.99))]
+    return {
+        "calls": calls,
+        "ops_per_s": round(calls / (total_ns / 1e9), 1),
+        "p50_us": round(statistics.median(per_call_ns) / 1000, 3),
+        "p99_us": round(p99 / 1000, 3),
+        "cpu_us": round(cpu_ns / calls / 1000, 3),
+        "alloc_bytes": alloc,
+    }
+
+def run_sync(case: Case, scale: float) -> dict:
+    fn, inner = case.fn, case.inner
+    samples = max(5, int(case.samples * scale))
+    for _ in range(inner):  # прогрів
+        fn()
+    per_call: list[float] = []
+    total = 0
+    clock = time.perf_counter_ns
+    cpu0 = time.process_time_ns()
+    for _ in range(samples):
+        t = clock()
+        for _ in range(inner):
+            fn()
+        dt = clock() - t
+        total += dt
+        per_call.append(dt / inner)
+    cpu = time.process_time_ns() - cpu0
+    return _summary(per_call, samples * inner, total, cpu, _alloc_bytes(fn))
+
+def run_async(case: Case, scale: float) -> dict:
+    afn, inner = case.afn, case.inner
+    samples = max(5, int(case.samples * scale))
+
+    async def go() -> tuple[list[float], int, int]:
+        for _ in range(inner):
+            await afn()
+        per_call: list[float] = []
+        total = 0
+        clock = time.perf_counter_ns
+        cpu0 = time.process_time_ns()
+        for _ in range(samples):
+            t = clock()
+            for _ in range(inner):
+                await afn()
+            dt = clock() - t
+            total += dt
+            per_call.append(dt / inner)
+        return per_call, total, time.process_time_ns() - cpu0
+
+    loop = asyncio.new_event_loop()
+    try:
+        per_call, total, cpu = loop.run_until_complete(go())
+        alloc = _alloc_bytes(lambda: loop.run_until_complete(afn()), n=10)
+    finally:
+        loop.close()
+    return _summary(per_call, samples * inner, total, cpu, alloc)
+
+# ------------------------------ Кейси ------------------------------ #
+
+def _groups_ini(n: int) -> str:
+    lines = []
+    for g in range(n):
+        lines += [f"[group:bench{g}]", f"title = Група {g}", "mode = " + ("multi" if g % 2 else "single")]
+        lines += [f"item.{i} = пункт {i}|{('mul', 'add', 'sub', 'div')[i % 4]}|{i + 1}" for i in range(1, 9)]
+        lines.append("")
+    return "\n".join(lines)
+
+def _asgi_call(app, path: str, payload: dict) -> Callable[[], object]:
+    """POST прямо в ASGI app (без клієнта і транспорту): міряємо лише сервер."""
+    body = json.dumps(payload).encode()
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"", "root_path": "",
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        "client": ("127.0.0.1", 1), "server": ("bench", 80),
+    }
+
+    async def call():
+        status = 0
+        sent = False
+
+        async def receive():
+            nonlocal sent
+            if sent:
+                return {"type": "http.disconnect"}
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        async def send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+
+        await app(dict(scope), receive, send)
+        assert status == 200, status
+
+    return call
+
+def build_cases(cfg_path: Path) -> list[Case]:
+    import httpx
+
+    from backend.app import utils
+    from backend.app.main import app
+    from backend.app.services import config_loader
+    from backend.app.services.calc_engine import (
+        _interpolate_price_per_meter, compute, get_model,
+    )
+    from backend.app.services.money import ROUNDING
+
+    m = get_model()
+    pos = next(iter(m.positions), "")
+    payload = {"L": 1234, "W": 640, "H": 210, "position": pos}
+    next_len = itertools.cycle(range(300, 1300, 7)).__next__  # і менше, і більше за діапазон
+
+    def cold_settings():
+        # лише локальний снапшот: без bump спільного покоління і без запису
+        config_loader._SNAPSHOT = None
+        return config_loader.load_settings()
+
+    base_text = SOURCE_CONFIG.read_text(encoding="utf-8")
+
+    def with_groups(n: int) -> Callable[[], None]:
+        return lambda: cfg_path.write_text(base_text + "\n" + _groups_ini(n), encoding="utf-8")
+
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench")
+
+    async def route_compute():
+        r = await client.post("/api/calc/compute", json=payload)
+        assert r.status_code == 200, r.text
+
+    async def route_compute_v2():
+        r = await client.post("/api/v2/calc/compute", json=payload)
+        assert r.status_code == 200, r.text
+
+    # без httpx: той самий запит прямо в ASGI-застосунок — лише серверна частина
+    asgi_v1 = _asgi_call(app, "/api/calc/compute", payload)
+    asgi_v2 = _asgi_call(app, "/api/v2/calc/compute", payload)
+
+    async def route_config():
+        r = await client.get("/api/calc/config")
+        assert r.status_code == 200, r.text
+
+    cases = [
+        Case("engine.compute", fn=lambda: compute(payload, m)),
+        Case("engine.compute.model_lookup", fn=lambda: compute(payload)),
+        Case("engine.interpolate", fn=lambda: _interpolate_price_per_meter(next_len(), m), inner=1000),
+        Case("round.nearest10", fn=lambda: ROUNDING["nearest10"](1234568), inner=1000),
+        Case("round.ceil10", fn=lambda: ROUNDING["ceil10"](1234568), inner=1000),
+        Case("config.load_settings.warm", fn=config_loader.load_settings, inner=1000),
+        Case("config.load_settings.cold", fn=cold_settings, inner=10, samples=100),
+        Case("route.compute", afn=route_compute, inner=10, samples=100),
+        Case("route.compute.v2", afn=route_compute_v2, inner=10, samples=100),
+        Case("asgi.compute", afn=asgi_v1, inner=20, samples=100),
+        Case("asgi.compute.v2", afn=asgi_v2, inner=20, samples=100),
+        Case("route.config", afn=route_config, inner=10, samples=100),
+    ]
+    # list_groups читає файл щоразу — останніми, бо міняють тимчасовий конфіг
+    for n in GROUP_COUNTS:
+        cases.append(Case(
+            f"utils.list_groups.{n}", fn=utils.list_groups, setup=with_groups(n),
+            inner=max(1, 100 // n), samples=max(10, 2000 // n),
+        ))
+    return cases
+
+# ------------------------------ Baseline ------------------------------ #
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    """Регресії: ops/s впав або p99 виріс більше ніж на threshold."""
+    out = []
+    for name, cur in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if not base:
+            continue
+        ops = cur["ops_per_s"] / base["ops_per_s"] - 1 if base["ops_per_s"] else 0.0
+        p99 = cur["p99_us"] / base["p99_us"] - 1 if base["p99_us"] else 0.0
+        flag = ops < -threshold or p99 > threshold
+        line = f"{'REGRESSION' if flag else 'ok':<10} {name:<32} ops/s {ops:+7.1%}  p99 {p99:+7.1%}"
+        print(line, file=sys.stderr)
+        if flag:
+            out.append(name)
+    return out
+
+def main(argv: list[str] | None = None) -> int:
+    p = argparse.ArgumentParser(prog="python -m backend.bench")
+    p.add_argument("-k", dest="filter", default="", help="лише кейси, що містять підрядок")
+    p.add_argument("--quick", action="store_true", help="у 5 разів менше вибірок")
+    p.add_argument("--baseline", type=Path, default=BASELINE)
+    p.add_argument("--save", action="store_true", help="записати результат як baseline")
+    p.add_argument("--compare", action="store_true", help="порівняти з baseline")
+    p.add_argument("--threshold", type=float, default=0.15, help="допустиме погіршення, частка")
+    p.add_argument("-o", "--output", default="-", help="файл для JSON або '-'")
+    args = p.parse_args(argv)
+
+    tmp = Path(tempfile.mkdtemp(prefix="betoomore-bench-"))
+    cfg_path = tmp / "config.ini"
+    shutil.copyfile(SOURCE_CONFIG, cfg_path)
+    os.environ["CONFIG_PATH"] = str(cfg_path)
+    os.environ["CONFIG_GEN_PATH"] = str(tmp / "config.gen")
+    os.environ["CONFIG_SOURCE"] = "ini"
+    os.environ["HISTORY_ENABLED"] = "0"
+    os.environ["READONLY_GUARD"] = "off"
+
+    results: dict[str, dict] = {}
+    try:
+        for case in build_cases(cfg_path):
+            if args.filter and args.filter not in case.name:
+                continue
+            if case.setup:
+                case.setup()
+            run = run_async if case.afn else run_sync
+            results[case.name] = run(case, 0.2 if args.quick else 1.0)
+            print(f"{case.name:<32} {results[case.name]['ops_per_s']:>12.1f} ops/s", file=sys.stderr)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "quick": args.quick,
+        },
+        "results": results,
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2, sort_keys=True) + "\n"
+    if args.output == "-":
+        sys.stdout.write(text)
+    else:
+        Path(args.output).write_text(text, encoding="utf-8")
+
+    rc = 0
+    if args.compare:
+        if not args.baseline.exists():
+            print(f"no baseline at {args.baseline} (run with --save first)", file=sys.stderr)
+        elif compare(report, json.loads(args.baseline.read_text(encoding="utf-8")), args.threshold):
+            rc = 1
+    if args.save:
+        args.baseline.write_text(text, encoding="utf-8")
+        print(f"baseline saved → {args.baseline}", file=sys.stderr)
+    return rc
+
+if __name__ == "__main__":
+    sys.exit(main())
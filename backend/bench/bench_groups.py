@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+Скільки коштує один розрахунок зі зростанням кількості груп опцій.
+
+    python -m backend.bench.bench_groups [--quotes 20000] [--items 8]
+
+Моделі синтетичні (конфіг не читається і не пишеться). Для кожної
+кількості груп міряємо quote() без опцій, з вибором у кожній single-групі,
+і з multi-групами, де вибрано половину пунктів — як з таблицею підмножин
+(пунктів ≤ MULTI_TABLE_MAX), так і без неї.
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from types import MappingProxyType
+
+from backend.app.services.calc_engine import MULTI_TABLE_MAX, compile_model, quote
+from backend.app.services.config_loader import ConfigSnapshot, Group, GroupItem, SettingsDTO
+
+_OPS = ("mul", "add", "div", "sub")
+
+def _groups(n_groups: int, n_items: int, mode: str) -> tuple[Group, ...]:
+    return tuple(
+        Group(
+            id=f"g{g}", name=f"Група {g}", mode=mode,
+            items=[GroupItem(name=f"п{i}", op=_OPS[i % 4], value=float(i + 1)) for i in range(n_items)],
+        )
+        for g in range(n_groups)
+    )
+
+def _model(groups: tuple[Group, ...]):
+    s = SettingsDTO(
+        min_length=500, max_length=1000, min_width=500, min_height=150, extra_price=22.0,
+        rounding_mode="ceil10", price_per_meter_high=21101, price_per_meter_low=18257,
+        positions=MappingProxyType({"сірий": 0.0, "чорний": 20.0}), groups=groups,
+    )
+    return compile_model(ConfigSnapshot(version=1, generation=0, stamp=None, settings=s, loaded_at=0.0))
+
+def _options(groups: tuple[Group, ...], picked: int):
+    return tuple(sorted((g.id, tuple(sorted(it.name for it in g.items[:picked]))) for g in groups))
+
+def _ns_per_quote(m, options, n: int) -> float:
+    best = float("inf")
+    for _ in range(3):
+        t = time.perf_counter_ns()
+        for i in range(n):
+            quote(500 + i % 4000, 600, 200, "чорний", m, options)
+        best = min(best, (time.perf_counter_ns() - t) / n)
+    return best
+
+def main(argv: list[str] | None = None) -> int:
+    p = argparse.ArgumentParser(prog="python -m backend.bench.bench_groups")
+    p.add_argument("--quotes", type=int, default=20000)
+    p.add_argument("--items", type=int, default=8, help="пунктів у кожній групі")
+    args = p.parse_args(argv)
+
+    big = MULTI_TABLE_MAX + 6
+    print(f"{'groups':>6} {'none':>9} {'single':>9} {'multi':>9} {f'multi{big}':>9}   ns/quote")
+    for n_groups in (0, 1, 2, 4, 8, 16, 32):
+        single = _groups(n_groups, args.items, "single")
+        multi = _groups(n_groups, args.items, "multi")
+        multi_big = _groups(n_groups, big, "multi")
+        row = [
+            _ns_per_quote(_model(single), (), args.quotes),
+            _ns_per_quote(_model(single), _options(single, 1), args.quotes),
+            _ns_per_quote(_model(multi), _options(multi, args.items // 2), args.quotes),
+            _ns_per_quote(_model(multi_big), _options(multi_big, big // 2), args.quotes),
+        ]
+        print(f"{n_groups:>6} " + " ".join(f"{v:>9.0f}" for v in row))
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+Звіт про холодний старт: кожен прогін — свіжий процес python.
+
+    python -m backend.bench.cold_start [--runs 5]
+
+Сценарії (медіана по прогонах, мс):
+    no_warmup     — без lifespan: перший запит сам парсить конфіг, компілює модель, будує OpenAPI
+    warmup        — lifespan з прогрівом, кешу config.ini.cache ще немає (пише його)
+    warmup_cache  — lifespan з прогрівом, кеш актуальний (конфіг не парситься)
+Колонки: process — від запуску інтерпретатора до відповіді на перший /compute;
+import, lifespan, first_compute, first_openapi — окремі кроки всередині процесу.
+Конфіг — тимчасова копія backend/config.ini.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+SOURCE_CONFIG = ROOT / "backend" / "config.ini"
+
+_CHILD = r"""
+import asyncio, json, sys, time
+t0 = time.perf_counter()
+from backend.app.main import app
+t1 = time.perf_counter()
+import httpx
+
+async def main(warmup):
+    out = {"import": t1 - t0}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://cold") as c:
+        async def go():
+            t = time.perf_counter()
+            r = await c.post("/api/calc/compute", json={"L": 1200, "W": 600, "H": 200})
+            assert r.status_code == 200, r.text
+            out["first_compute"] = time.perf_counter() - t
+            t = time.perf_counter()
+            r = await c.get("/openapi.json")
+            assert r.status_code == 200
+            out["first_openapi"] = time.perf_counter() - t
+        if warmup:
+            t = time.perf_counter()
+            async with app.router.lifespan_context(app):
+                out["lifespan"] = time.perf_counter() - t
+                await go()
+        else:
+            out["lifespan"] = 0.0
+            await go()
+    return out
+
+res = asyncio.run(main(sys.argv[1] == "1"))
+print(json.dumps({k: round(v * 1000, 2) for k, v in res.items()}))
+"""
+
+def _run(env: dict, warmup: bool) -> dict:
+    t = time.perf_counter()
+    p = subprocess.run([sys.executable, "-c", _CHILD, "1" if warmup else "0"],
+                       cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    wall = (time.perf_counter() - t) * 1000
+    res = json.loads(p.stdout.strip().splitlines()[-1])
+    # process ≈ до першої відповіді: без часу на /openapi.json і вихід процесу
+    res["process"] = round(wall - res["first_openapi"], 2)
+    return res
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m backend.bench.cold_start")
+    ap.add_argument("--runs", type=int, default=5)
+    args = ap.parse_args(argv)
+
+    tmp = Path(tempfile.mkdtemp(prefix="betoomore-cold-"))
+    cfg = tmp / "config.ini"
+    shutil.copyfile(SOURCE_CONFIG, cfg)
+    env = dict(os.environ, PYTHONPATH=str(ROOT), CONFIG_PATH=str(cfg), CONFIG_GEN_PATH=str(tmp / "config.gen"),
+               CONFIG_SOURCE="ini", HISTORY_ENABLED="0", METRICS_ENABLED="1", PYTHONWARNINGS="ignore")
+    cache = cfg.with_name(cfg.name + ".cache")
+    report: dict[str, dict] = {}
+    try:
+        _run(env, True)  # прогріваємо .pyc, щоб усі сценарії були в рівних умовах
+        for name, warmup, keep_cache in (("no_warmup", False, False), ("warmup", True, False),
+                                         ("warmup_cache", True, True)):
+            runs = []
+            for _ in range(args.runs):
+                if not keep_cache:
+                    cache.unlink(missing_ok=True)
+                runs.append(_run(env, warmup))
+            report[name] = {k: round(statistics.median(r[k] for r in runs), 2) for k in runs[0]}
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    cols = ("process", "import", "lifespan", "first_compute", "first_openapi")
+    print(f"{'scenario':<14}" + "".join(f"{c:>15}" for c in cols) + "   ms, median", file=sys.stderr)
+    for name, r in report.items():
+        print(f"{name:<14}" + "".join(f"{r[c]:>15.2f}" for c in cols), file=sys.stderr)
+    print(json.dumps(report, indent=2, sort_keys=True))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+Навантажувальне порівняння /api/calc/compute: async-хендлери vs threadpool.
+
+    python -m backend.bench.load_test [--seconds 10] [--concurrency 64] [--path /api/calc/compute]
+
+Для кожного режиму CALC_ROUTES (async, thread) піднімає окремий
+`uvicorn --loop uvloop --http httptools` (1 воркер) на вільному порту,
+чекає /readyz і ганяє keep-alive з'єднання мінімальним клієнтом на
+asyncio (без httpx — щоб вузьким місцем був сервер, а не клієнт).
+Звіт: requests/s, p50/p90/p99/p99.9 латентності (мс), помилки.
+
+Конфіг — тимчасова копія backend/config.ini, історія вимкнена.
+Сервер і клієнт ділять ту саму машину — порівнюйте режими між собою,
+а не абсолютні числа.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+SOURCE_CONFIG = ROOT / "backend" / "config.ini"
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def _wait_ready(port: int, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/readyz", timeout=1) as r:
+                if r.status == 200:
+                    return
+        except OSError:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError("server did not become ready")
+
+def _request_bytes(path: str, body: bytes) -> bytes:
+    return (
+        f"POST {path} HTTP/1.1\r\nHost: bench\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n"
+    ).encode() + body
+
+async def _worker(port: int, payloads: list[bytes], stop_at: float, lat: list[float], errors: list[int]) -> None:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    i = 0
+    clock = time.perf_counter
+    try:
+        while clock() < stop_at:
+            req = payloads[i % len(payloads)]
+            i += 1
+            t = clock()
+            writer.write(req)
+            head = await reader.readuntil(b"\r\n\r\n")
+            status = int(head[9:12])
+            length = 0
+            for line in head.split(b"\r\n"):
+                if line[:15].lower() == b"content-length:":
+                    length = int(line[15:])
+                    break
+            if length:
+                await reader.readexactly(length)
+            lat.append(clock() - t)
+            if status != 200:
+                errors[0] += 1
+    finally:
+        writer.close()
+
+async def _drive(port: int, path: str, seconds: float, concurrency: int) -> dict:
+    payloads = [
+        _request_bytes(path, json.dumps({"L": 400 + (k * 37) % 3000, "W": 500 + k % 300, "H": 150 + k % 120}).encode())
+        for k in range(512)
+    ]
+    lat: list[float] = []
+    errors = [0]
+    await _worker(port, payloads, time.perf_counter() + 1.0, [], [0])  # прогрів
+    t0 = time.perf_counter()
+    stop_at = t0 + seconds
+    await asyncio.gather(*(_worker(port, payloads, stop_at, lat, errors) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - t0
+    lat.sort()
+
+    def pct(q: float) -> float:
+        return round(lat[min(len(lat) - 1, int(len(lat) * q))] * 1000, 3) if lat else 0.0
+
+    return {
+        "requests": len(lat),
+        "rps": round(len(lat) / elapsed, 1),
+        "p50_ms": pct(0.50),
+        "p90_ms": pct(0.90),
+        "p99_ms": pct(0.99),
+        "p999_ms": pct(0.999),
+        "errors": errors[0],
+    }
+
+def run_mode(mode: str, args: argparse.Namespace, env: dict) -> dict:
+    port = _free_port()
+    cmd = [sys.executable, "-m", "uvicorn", "backend.app.main:app", "--host", "127.0.0.1", "--port", str(port),
+           "--loop", "uvloop", "--http", "httptools", "--no-access-log", "--log-level", "warning"]
+    proc = subprocess.Popen(cmd, cwd=ROOT, env=dict(env, CALC_ROUTES=mode))
+    try:
+        _wait_ready(port)
+        try:
+            import uvloop
+            runner = uvloop.run
+        except ImportError:  # pragma: no cover
+            runner = asyncio.run
+        return runner(_drive(port, args.path, args.seconds, args.concurrency))
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m backend.bench.load_test")
+    ap.add_argument("--seconds", type=float, default=10.0)
+    ap.add_argument("--concurrency", type=int, default=64)
+    ap.add_argument("--path", default="/api/calc/compute")
+    ap.add_argument("--modes", default="async,thread")
+    args = ap.parse_args(argv)
+
+    tmp = Path(tempfile.mkdtemp(prefix="betoomore-load-"))
+    cfg = tmp / "config.ini"
+    shutil.copyfile(SOURCE_CONFIG, cfg)
+    env = dict(os.environ, PYTHONPATH=str(ROOT), CONFIG_PATH=str(cfg), CONFIG_GEN_PATH=str(tmp / "config.gen"),
+               CONFIG_SOURCE="ini", HISTORY_ENABLED="0", PYTHONWARNINGS="ignore",
+               QUOTE_CACHE_SIZE=os.getenv("QUOTE_CACHE_SIZE", "4096"))
+    report = {}
+    try:
+        for mode in args.modes.split(","):
+            report[mode] = run_mode(mode, args, env)
+            r = report[mode]
+            print(f"{mode:<7} {r['rps']:>9.1f} req/s  p50 {r['p50_ms']:.2f}  p99 {r['p99_ms']:.2f}  "
+                  f"p99.9 {r['p999_ms']:.2f} ms  errors {r['errors']}", file=sys.stderr)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    print(json.dumps({"seconds": args.seconds, "concurrency": args.concurrency, "path": args.path,
+                      "results": report}, indent=2, sort_keys=True))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
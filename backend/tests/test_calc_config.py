@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""GET /api/calc/config: сильний ETag від вмісту, If-None-Match → 304, нова версія → новий ETag."""
+
+from __future__ import annotations
+
+import dataclasses
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.app.api import calc
+from backend.app.services.config_loader import ConfigSnapshot, SettingsDTO
+from backend.app.services.price_lists import PriceIndex, PriceList
+
+SETTINGS = SettingsDTO(min_length=500, max_length=1000, min_width=500, min_height=150, extra_price=22.0,
+                       rounding_mode="ceil10", price_per_meter_high=21101, price_per_meter_low=18257,
+                       positions={"сірий": 0.0, "чорний +20%": 20.0})
+
+def _snap(version: int, settings: SettingsDTO = SETTINGS, prices: PriceIndex | None = None) -> ConfigSnapshot:
+    snap = ConfigSnapshot(version=version, generation=0, stamp=None, settings=settings, loaded_at=0.0)
+    return dataclasses.replace(snap, prices=prices) if prices is not None else snap
+
+def _prices(*lists: tuple[int, float, int]) -> PriceIndex:
+    pls = tuple(PriceList(id=i, effective_at=t, price_high=high, price_low=18000) for i, t, high in lists)
+    return PriceIndex(starts=tuple(p.effective_at for p in pls), lists=pls)
+
+@pytest.fixture
+def client(monkeypatch):
+    """Лише роутер калькулятора; снапшот підміняємо — справжній конфіг не чіпаємо."""
+    current = {"snap": _snap(1)}
+
+    async def current_snapshot():
+        return current["snap"]
+
+    monkeypatch.setattr(calc, "current_snapshot", current_snapshot)
+    monkeypatch.setattr(calc, "get_snapshot", lambda: current["snap"])  # CALC_ROUTES=thread
+    monkeypatch.setattr(calc, "_CONFIG_RENDERED", None)
+    app = FastAPI()
+    app.include_router(calc.router)
+    with TestClient(app) as c:
+        c.current = current
+        yield c
+
+def test_etag_304_and_change(client):
+    r = client.get("/api/calc/config")
+    assert r.status_code == 200
+    etag = r.headers["etag"]
+    assert etag.startswith('"') and not etag.startswith("W/")
+    assert r.headers["cache-control"] == calc.CONFIG_CACHE_CONTROL
+    assert r.json()["positions"] == {"сірий": 0.0, "чорний +20%": 20.0}
+
+    r = client.get("/api/calc/config", headers={"If-None-Match": etag})
+    assert r.status_code == 304
+    assert r.content == b""
+    assert r.headers["etag"] == etag
+
+    client.current["snap"] = _snap(2, dataclasses.replace(SETTINGS, price_per_meter_high=22000))
+    r = client.get("/api/calc/config", headers={"If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.headers["etag"] != etag
+    assert r.json()["price_per_meter"]["high"] == 22000
+
+@pytest.mark.parametrize("header, status", [
+    (None, 200),
+    ("{etag}", 304),
+    ("W/{etag}", 304),                   # слабке порівняння
+    ('"other", {etag}', 304),            # список
+    ('"other"', 200),
+    ("*", 304),
+    ("", 200),
+])
+def test_if_none_match(client, header, status):
+    etag = client.get("/api/calc/config").headers["etag"]
+    headers = {} if header is None else {"If-None-Match": header.format(etag=etag)}
+    assert client.get("/api/calc/config", headers=headers).status_code == status
+
+def test_etag_depends_on_content_not_snapshot_version(client):
+    etag = client.get("/api/calc/config").headers["etag"]
+    client.current["snap"] = _snap(5)  # інший воркер/перечитування — той самий вміст
+    r = client.get("/api/calc/config", headers={"If-None-Match": etag})
+    assert r.status_code == 304
+
+def test_price_list_switch_at_same_version_renders_again(client):
+    now = time.time()
+    client.current["snap"] = _snap(3, prices=_prices((1, now - 60, 30000)))
+    first = client.get("/api/calc/config")
+    assert first.json()["price_per_meter"]["high"] == 30000
+
+    # та сама версія снапшота, але набула чинності наступна версія прайсу
+    client.current["snap"] = _snap(3, prices=_prices((1, now - 60, 30000), (2, now - 1, 31000)))
+    r = client.get("/api/calc/config", headers={"If-None-Match": first.headers["etag"]})
+    assert r.status_code == 200
+    assert r.json()["price_per_meter"]["high"] == 31000
+    assert r.headers["etag"] != first.headers["etag"]
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""calc_engine: ціна за метр і скомпільована модель на крайніх конфігах."""
+
+from __future__ import annotations
+
+import json
+import random
+
+import pytest
+from fastapi import HTTPException
+
+from backend.app.api import admin, calc
+from backend.app.schemas.calc_io import CalcBatchInput
+from backend.app.services.calc_engine import (
+    _interpolate_price_per_meter,
+    batch_rows,
+    canonical_options,
+    compile_model,
+    compute_batch,
+    quote,
+)
+from backend.app.services.config_loader import ConfigSnapshot, Group, GroupItem, SettingsDTO
+from backend.app.services.config_store import ConfigStore
+
+HIGH, LOW = 21101, 18257
+
+def _model(min_length: int = 500, max_length: int = 1000, **kw):
+    s = SettingsDTO(min_length=min_length, max_length=max_length, min_width=500, min_height=150,
+                    extra_price=22.0, rounding_mode=kw.pop("rounding", "ceil10"),
+                    price_per_meter_high=HIGH, price_per_meter_low=LOW, positions=kw.pop("positions", {}),
+                    groups=kw.pop("groups", ()))
+    return compile_model(ConfigSnapshot(version=1, generation=0, stamp=None, settings=s, loaded_at=0.0))
+
+# ----------------------- Діапазон довжин min..max ----------------------- #
+
+@pytest.mark.parametrize("min_length, max_length, L, ppm", [
+    (500, 1000, 0, HIGH),
+    (500, 1000, 500, HIGH),
+    (500, 1000, 750, 19679.0),      # посередині — середнє
+    (500, 1000, 1000, LOW),
+    (500, 1000, 5000, LOW),
+    (1000, 1000, 999, HIGH),        # вироджений діапазон: span_den = 1
+    (1000, 1000, 1000, HIGH),
+    (1000, 1000, 1001, LOW),
+    # перевернутий (min > max): без інтерполяції і без зсуву округлення
+    (3000, 1000, 500, HIGH),
+    (3000, 1000, 2000, HIGH),
+    (3000, 1000, 2999, HIGH),
+    (3000, 1000, 3000, LOW),
+    (3000, 1000, 9000, LOW),
+])
+def test_price_per_meter(min_length, max_length, L, ppm):
+    m = _model(min_length, max_length)
+    assert m.span_den > 0
+    assert _interpolate_price_per_meter(L, m) == ppm
+    assert quote(L, 0, 0, "", m).price_per_meter == ppm
+
+def test_inverted_range_prices_whole_meters():
+    m = _model(3000, 1000, rounding="round")
+    out = quote(2000, 0, 0, "", m)
+    assert out.price_base == HIGH * 2
+    assert out.price_total == HIGH * 2
+
+def test_admin_rejects_min_length_above_max_length(tmp_path, monkeypatch):
+    path = tmp_path / "config.ini"
+    path.write_text("[variables]\nmin_length = 500\nmax_length = 1000\n", encoding="utf-8")
+    monkeypatch.setattr(admin, "STORE", ConfigStore(path))
+    monkeypatch.setattr(admin, "ADMIN_TOKEN", "")
+
+    for body in ({"min_length": 3000}, {"max_length": 400}, {"min_length": 2000, "max_length": 1500}):
+        with pytest.raises(HTTPException) as e:
+            admin.update_variables(body, None)
+        assert e.value.status_code == 400
+        assert "must not exceed max_length" in e.value.detail
+    assert path.read_text(encoding="utf-8") == "[variables]\nmin_length = 500\nmax_length = 1000\n"
+
+# ------------------------- Пакетний розрахунок ------------------------- #
+
+POSITIONS = {"сірий": 0, "в масі +5%": 5, "чорний +20%": 20, "індивідуальний +12.5%": 12.5}
+GROUPS = (
+    Group("edge", "edge", "single", [GroupItem("фаска", "add", 150), GroupItem("полірування", "mul", 7.5)]),
+    Group("mount", "mount", "multi", [GroupItem("кронштейн", "add", 85), GroupItem("анкер", "mul", 3),
+                                      GroupItem("знижка", "div", 10)]),
+)
+
+def _random_options(rnd: random.Random):
+    pick = {}
+    if rnd.random() < 0.5:
+        pick["edge"] = rnd.choice(["фаска", "полірування", "невідома"])
+    if rnd.random() < 0.5:
+        pick["mount"] = rnd.sample(["кронштейн", "анкер", "знижка"], rnd.randint(1, 3))
+    return pick or None
+
+@pytest.mark.parametrize("rounding", ["ceil10", "round", "floor"])
+def test_batch_matches_scalar_quote(rounding):
+    m = _model(500, 3000, rounding=rounding, positions=POSITIONS, groups=GROUPS)
+    rnd = random.Random(rounding)
+    n = 2000
+    L = [rnd.randint(0, 4000) for _ in range(n)]
+    W = [rnd.randint(0, 1200) for _ in range(n)]
+    H = [rnd.randint(0, 400) for _ in range(n)]
+    P = [rnd.choice([*POSITIONS, "", "невідома"]) for _ in range(n)]
+    O = [_random_options(rnd) for _ in range(n)]
+    opts = [canonical_options(o) if o else () for o in O]
+
+    rows = batch_rows(compute_batch(L, W, H, P, m, options=opts))
+
+    assert len(rows) == n
+    for i in range(n):
+        assert rows[i] == quote(L[i], W[i], H[i], P[i], m, opts[i]).model_dump(), i
+
+def _post_batch(monkeypatch, body: dict, fmt: str = "columns"):
+    monkeypatch.setattr(calc, "get_model", lambda as_of=None: _model(positions=POSITIONS, groups=GROUPS))
+    return calc.post_compute_batch(CalcBatchInput.model_validate(body), fmt)
+
+def test_batch_broadcasts_single_values(monkeypatch):
+    m = _model(positions=POSITIONS, groups=GROUPS)
+    L = [600, 800, 1200]
+    r = _post_batch(monkeypatch, {"L": L, "W": 700, "H": 200, "position": "чорний +20%",
+                                  "options": {"edge": "фаска"}}, "rows")
+    items = json.loads(r.body)["items"]
+    opts = canonical_options({"edge": "фаска"})
+    assert items == [quote(l, 700, 200, "чорний +20%", m, opts).model_dump() for l in L]
+
+def test_batch_columns_and_missing_values(monkeypatch):
+    m = _model(positions=POSITIONS, groups=GROUPS)
+    r = _post_batch(monkeypatch, {"L": [600, 800], "W": [700, 500], "position": ["сірий", ""],
+                                  "options": [None, {"mount": ["анкер"]}]})
+    cols = json.loads(r.body)
+    assert cols["count"] == 2
+    assert cols["price_total"] == [quote(600, 700, 0, "сірий", m).price_total,
+                                   quote(800, 500, 0, "", m, (("mount", ("анкер",)),)).price_total]
+    assert cols["surcharge_options"][0] == {}
+
+@pytest.mark.parametrize("body", [
+    {"L": [600, 800], "W": [700]},
+    {"L": [600, 800], "H": [1, 2, 3]},
+    {"L": [600], "position": ["сірий", "сірий"]},
+    {"L": [600, 800], "options": [None]},
+])
+def test_batch_unequal_columns_is_400(monkeypatch, body):
+    with pytest.raises(HTTPException) as e:
+        _post_batch(monkeypatch, body)
+    assert e.value.status_code == 400
+    assert "same length" in e.value.detail
+
+def test_batch_above_limit_is_413(monkeypatch):
+    monkeypatch.setattr(calc, "BATCH_MAX", 3)
+    assert json.loads(_post_batch(monkeypatch, {"L": [600] * 3}).body)["count"] == 3
+    with pytest.raises(HTTPException) as e:
+        _post_batch(monkeypatch, {"L": [600] * 4})
+    assert e.value.status_code == 413
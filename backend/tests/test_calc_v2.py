@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""/api/v2/calc/compute: строгий вхід (422) і відповідь байт-у-байт як у v1 /compute."""
+
+from __future__ import annotations
+
+import json
+import random
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.app.api import calc, calc_v2
+from backend.app.services.calc_engine import compile_model
+from backend.app.services.config_loader import ConfigSnapshot, Group, GroupItem, SettingsDTO
+
+POSITIONS = {"сірий": 0.0, "в масі +5%": 5.0, "чорний +20%": 20.0}
+GROUPS = (
+    Group("edge", "Кромка", "single", [GroupItem("фаска", "add", 150), GroupItem("полірування", "mul", 7.5)]),
+    Group("mount", "Кріплення", "multi", [GroupItem("кронштейн", "add", 85), GroupItem("знижка", "div", 10)]),
+)
+
+# версія, якої немає в живому конфігу процесу: кеш розрахунків ключується нею
+MODEL = compile_model(ConfigSnapshot(
+    version=900_001, generation=0, stamp=None, loaded_at=0.0,
+    settings=SettingsDTO(min_length=500, max_length=3000, min_width=500, min_height=150, extra_price=22.0,
+                         rounding_mode="ceil10", price_per_meter_high=21101, price_per_meter_low=18257,
+                         positions=POSITIONS, groups=GROUPS),
+))
+
+@pytest.fixture(scope="module")
+def client():
+    async def current_model(as_of=None):
+        return MODEL
+
+    mp = pytest.MonkeyPatch()
+    mp.setattr(calc, "current_model", current_model)
+    mp.setattr(calc, "get_model", lambda as_of=None: MODEL)
+    mp.setattr(calc_v2, "current_model", current_model)
+    app = FastAPI()
+    app.include_router(calc.router)
+    app.router.routes.insert(0, calc_v2.FAST_ROUTE)  # як main.py: швидкий маршрут першим
+    with TestClient(app) as c:
+        yield c
+    mp.undo()
+
+# --------------------------- Строгий вхід --------------------------- #
+
+@pytest.mark.parametrize("body", [
+    {"L": 1000.0},                               # float, навіть цілий
+    {"L": 1000, "W": 600.5},
+    {"L": "1000"},                               # рядок замість числа
+    {"L": True},
+    {"L": -1},
+    {},                                          # L обов'язкова
+    {"length": 1000},                            # аліаси v1 — ні
+    {"L": 1000, "width": 600},
+    {"L": 1000, "color": "сірий"},
+    {"dimensions": {"L": 1000}},
+    {"L": 1000, "extra": 1},                     # зайві ключі — ні
+    {"L": 1000, "position": 5},
+    {"L": 1000, "options": {"edge": 1}},
+    [{"L": 1000}],
+])
+def test_v2_rejects_loose_input(client, body):
+    r = client.post("/api/v2/calc/compute", json=body)
+    assert r.status_code == 422
+    assert isinstance(r.json()["detail"], list)
+
+@pytest.mark.parametrize("raw", [b"", b"{", b"L=1000", b"null"])
+def test_v2_rejects_non_object_body(client, raw):
+    r = client.post("/api/v2/calc/compute", content=raw, headers={"Content-Type": "application/json"})
+    assert r.status_code == 422
+
+def test_v1_still_accepts_aliases_that_v2_rejects(client):
+    r = client.post("/api/calc/compute", json={"length": 1000, "width": 600})
+    assert r.status_code == 200
+
+# ---------------------- Однакова відповідь з v1 ---------------------- #
+
+def _bodies():
+    rnd = random.Random(22)
+    yield {"L": 1000}
+    yield {"L": 0, "W": 0, "H": 0, "position": ""}
+    yield {"L": 1234, "W": 600, "H": 200, "position": "чорний +20%", "options": {"edge": "фаска"}}
+    yield {"L": 2500, "position": "невідома", "options": {"mount": ["кронштейн", "знижка"], "nope": "x"}}
+    for _ in range(60):
+        body = {"L": rnd.randint(0, 4000), "W": rnd.randint(0, 1200), "H": rnd.randint(0, 400),
+                "position": rnd.choice([*POSITIONS, ""])}
+        if rnd.random() < 0.5:
+            body["options"] = {"edge": rnd.choice(["фаска", "полірування"]),
+                               "mount": rnd.sample(["кронштейн", "знижка"], rnd.randint(1, 2))}
+        yield body
+
+@pytest.mark.parametrize("body", list(_bodies()), ids=lambda b: json.dumps(b, ensure_ascii=False))
+def test_v2_bytes_equal_v1(client, body):
+    v1 = client.post("/api/calc/compute", json=body)
+    v2 = client.post("/api/v2/calc/compute", json=body)
+    assert v1.status_code == v2.status_code == 200
+    assert v2.headers["content-type"] == v1.headers["content-type"] == "application/json"
+    assert v2.content == v1.content
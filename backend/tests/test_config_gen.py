@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""SharedGeneration: спільний між процесами лічильник поколінь конфігу."""
+
+from __future__ import annotations
+
+import multiprocessing
+from pathlib import Path
+
+from backend.app.services.config_gen import SharedGeneration, default_gen_path
+
+def _bump_many(path: str, n: int) -> int:
+    gen = SharedGeneration(Path(path))
+    for _ in range(n):
+        gen.bump()
+    return gen.read()
+
+def test_bump_is_visible_through_another_mapping(tmp_path):
+    path = tmp_path / "config.gen"
+    a, b = SharedGeneration(path), SharedGeneration(path)  # як два воркери
+
+    assert a.read() == 0
+    assert a.bump() == 1
+    assert b.read() == 1
+    assert b.bump() == 2
+    assert a.read() == 2
+    assert path.stat().st_size == 8
+
+def test_concurrent_bumps_from_processes_are_not_lost(tmp_path):
+    path = tmp_path / "config.gen"
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Pool(4) as pool:
+        pool.starmap(_bump_many, [(str(path), 200)] * 4)
+    assert SharedGeneration(path).read() == 800
+
+def test_unusable_path_disables_counter(tmp_path):
+    gen = SharedGeneration(tmp_path / "missing" / "config.gen")
+    assert gen.read() == 0
+    assert gen.bump() == 0
+
+def test_default_gen_path(tmp_path, monkeypatch):
+    monkeypatch.delenv("CONFIG_GEN_PATH", raising=False)
+    a = tmp_path / "a" / "config.ini"
+    assert default_gen_path(a) == default_gen_path(a)
+    assert default_gen_path(a) != default_gen_path(tmp_path / "b" / "config.ini")
+
+    monkeypatch.setenv("CONFIG_GEN_PATH", str(tmp_path / "x.gen"))
+    assert default_gen_path(a) == tmp_path / "x.gen"
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""ConfigStore: паралельні записи злипаються в один запис і не губляться."""
+
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+from backend.app.services.config_store import ConfigStore
+
+def _behind_leader(store: ConfigStore, mutators: list) -> list:
+    """
+    Перший запис тримає прохід відкритим, поки решта mutators стане в чергу,
+    потім усіх відпускаємо. → результат або виняток кожного з mutators.
+    """
+    gate, entered = threading.Event(), threading.Event()
+
+    def first(cfg):
+        entered.set()
+        assert gate.wait(5)
+        cfg.add_section("s")
+        cfg.set("s", "first", "1")
+
+    leader = threading.Thread(target=store.update, args=(first,))
+    leader.start()
+    assert entered.wait(5)
+
+    out: list = [None] * len(mutators)
+
+    def run(i):
+        try:
+            out[i] = store.update(mutators[i])
+        except Exception as e:
+            out[i] = e
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(len(mutators))]
+    for t in threads:
+        t.start()
+    deadline = time.monotonic() + 5
+    while len(store._pending) < len(mutators):  # усі в черзі за лідером
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+    gate.set()
+    for t in [leader, *threads]:
+        t.join(5)
+    return out
+
+def _setter(i: int):
+    def mutate(cfg):
+        cfg.set("s", f"k{i}", str(i))
+        return i
+    return mutate
+
+def test_queued_updates_coalesce_into_one_write(tmp_path):
+    saved = []
+    store = ConfigStore(tmp_path / "config.ini", on_saved=lambda: saved.append(1))
+
+    out = _behind_leader(store, [_setter(i) for i in range(10)])
+
+    assert out == list(range(10))
+    cfg = ConfigStore(tmp_path / "config.ini").read()  # з файлу, не з пам'яті
+    assert dict(cfg.items("s")) == {"first": "1", **{f"k{i}": str(i) for i in range(10)}}
+    assert store.writes == 2        # лідер + одна злита пачка
+    assert store.coalesced == 9
+    assert len(saved) == 2
+    assert not list(tmp_path.glob("*.tmp"))
+
+def test_failed_update_in_batch_rolls_back_only_itself(tmp_path):
+    store = ConfigStore(tmp_path / "config.ini")
+
+    def bad(cfg):
+        cfg.set("s", "half", "written")
+        raise ValueError("bad value")
+
+    out = _behind_leader(store, [_setter(0), bad, _setter(2)])
+
+    assert out[0] == 0 and out[2] == 2
+    assert isinstance(out[1], ValueError)
+    cfg = store.read()
+    assert dict(cfg.items("s")) == {"first": "1", "k0": "0", "k2": "2"}
+    assert store.writes == 2
+
+def test_update_error_leaves_file_untouched(tmp_path):
+    path = tmp_path / "config.ini"
+    path.write_text("[base]\nprice = 10\n", encoding="utf-8")
+    store = ConfigStore(path)
+
+    def boom(cfg):
+        cfg.set("base", "price", "0")
+        raise RuntimeError("no")
+
+    with pytest.raises(RuntimeError):
+        store.update(boom)
+    assert path.read_text(encoding="utf-8") == "[base]\nprice = 10\n"
+    assert store.writes == 0
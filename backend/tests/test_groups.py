@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""Скомпільовані групи опцій calc_engine: оператори, multi-суми, порядок застосування."""
+
+from __future__ import annotations
+
+import dataclasses
+import itertools
+import random
+
+import pytest
+from pydantic import ValidationError
+
+from backend.app.routers.admin_groups import GroupItem as GroupItemIn
+from backend.app.services.calc_engine import (
+    MULTI_TABLE_MAX,
+    _apply_groups,
+    canonical_options,
+    compile_group,
+    compile_model,
+    quote,
+)
+from backend.app.services.config_loader import ConfigSnapshot, Group, GroupItem, SettingsDTO
+
+def _group(gid: str, mode: str, *items: tuple[str, str, float]) -> Group:
+    return Group(id=gid, name=gid, mode=mode, items=[GroupItem(n, op, v) for n, op, v in items])
+
+def _model(*groups: Group):
+    s = SettingsDTO(min_length=500, max_length=1000, min_width=500, min_height=150, extra_price=22.0,
+                    rounding_mode="round", price_per_meter_high=21101, price_per_meter_low=18257,
+                    positions={}, groups=tuple(groups))
+    return compile_model(ConfigSnapshot(version=1, generation=0, stamp=None, settings=s, loaded_at=0.0))
+
+# ----------------------------- compile_group ----------------------------- #
+
+@pytest.mark.parametrize("op, value, factors", [
+    ("mul", 25, (2500, 0, 0)),
+    ("mul", -10, (-1000, 0, 0)),
+    ("div", 25, (0, 0, 2500)),
+    ("div", -50, (0, 0, -5000)),
+    ("div", -99.99, (0, 0, -9999)),
+    ("div", -100, (0, 0, 0)),       # дільник 0 — пункт ігнорується
+    ("div", -150, (0, 0, 0)),       # дільник < 0 — теж
+    ("add", 12.5, (0, 1250, 0)),
+    ("sub", 10, (0, -1000, 0)),
+    ("pow", 25, (2500, 0, 0)),      # невідомий op — як mul
+])
+def test_compile_item_factors(op, value, factors):
+    g = compile_group(_group("g", "single", ("x", op, value)), 0)
+    assert g.factors == (factors,)
+    assert g.select(("x",)) == factors
+
+def test_duplicate_item_name_keeps_first():
+    g = compile_group(_group("g", "single", ("x", "mul", 10), ("x", "add", 99)), 0)
+    assert g.factors == ((1000, 0, 0),)
+
+@pytest.mark.parametrize("items, dbp", [
+    ((("a", "div", -60), ("b", "div", -50)), (0, 0)),           # разом дільник ≤ 0 — обидва ігноруються
+    ((("a", "div", -60), ("b", "div", -40)), (0, 0)),           # рівно 0 — теж
+    ((("a", "div", -60), ("b", "div", -30)), (-6000, -3000)),
+    ((("a", "div", -60), ("b", "div", 80)), (-6000, 8000)),     # додатні div дільник лише збільшують
+])
+def test_multi_negative_divs_that_reach_zero_divisor_are_ignored(items, dbp):
+    g = compile_group(_group("g", "multi", *items), 0)
+    assert tuple(d for _, _, d in g.factors) == dbp
+
+def test_admin_rejects_divisor_not_positive():
+    assert GroupItemIn(name="x", op="div", value=-99).value == -99
+    assert GroupItemIn(name="x", op="sub", value=-200).value == -200
+    for value in (-100, -250):
+        with pytest.raises(ValidationError, match="greater than -100"):
+            GroupItemIn(name="x", op="div", value=value)
+
+# ------------------------- Вибір: single / multi ------------------------- #
+
+def test_single_takes_first_known_name():
+    g = compile_group(_group("g", "single", ("a", "mul", 10), ("b", "mul", 20)), 0)
+    assert g.select(("b", "a")) == (2000, 0, 0)
+    assert g.select(("zzz", "a")) == (1000, 0, 0)
+    assert g.select(("zzz",)) is None
+
+def test_multi_sums_selected_items():
+    g = compile_group(_group("g", "multi", ("a", "mul", 10), ("b", "mul", 5),
+                             ("c", "add", 100), ("d", "div", 25)), 0)
+    assert g.select(("a", "b")) == (1500, 0, 0)
+    assert g.select(("a", "c", "d")) == (1000, 10000, 2500)
+    assert g.select(("a", "a", "zzz")) == (1000, 0, 0)   # повтор і невідоме не рахуються
+    assert g.select(("zzz",)) is None
+
+@pytest.mark.parametrize("size", [1, 4, MULTI_TABLE_MAX])
+def test_subset_table_matches_summed_fallback(size):
+    rnd = random.Random(size)
+    ops = ["mul", "div", "add", "sub"]
+    items = [(f"i{k}", rnd.choice(ops), rnd.randint(-90, 90)) for k in range(size)]
+    g = compile_group(_group("g", "multi", *items), 0)
+    assert len(g.table) == 1 << size
+    summed = dataclasses.replace(g, table=())
+    names = [n for n, _, _ in items]
+    for r in range(1, size + 1):
+        for pick in itertools.combinations(names, r):
+            assert g.select(pick) == summed.select(pick), pick
+
+def test_large_multi_group_sums_without_table():
+    items = [(f"i{k}", "add", k + 1) for k in range(MULTI_TABLE_MAX + 2)]
+    g = compile_group(_group("g", "multi", *items), 0)
+    assert g.table == ()
+    assert g.select(tuple(n for n, _, _ in items)) == (0, sum(range(1, MULTI_TABLE_MAX + 3)) * 100, 0)
+
+# ---------------------------- _apply_groups ---------------------------- #
+
+@pytest.mark.parametrize("op, value, running, after", [
+    ("mul", 25, 100000, 125000),
+    ("mul", -10, 100000, 90000),
+    ("div", 25, 100000, 80000),     # 1000 / 1.25
+    ("div", -20, 100000, 125000),   # 1000 / 0.8
+    ("div", 0, 100000, 100000),
+    ("div", 300, 100001, 25000),    # 1000.01 / 4 = 250.0025 → до копійки
+    ("add", 12.5, 100000, 101250),
+    ("sub", 10, 100000, 99000),
+    ("mul", 50, 1, 1),              # 0.5 коп. → 0 (половина до парного)
+    ("mul", 50, 3, 5),              # 1.5 коп. → 2
+    ("mul", 10, -100000, -110000),
+])
+def test_apply_single_operator(op, value, running, after):
+    m = _model(_group("g", "single", ("x", op, value)))
+    out, amounts = _apply_groups(running, (("g", ("x",)),), m)
+    assert out == after
+    assert amounts == {"g": (after - running) / 100}
+
+def test_multi_mul_and_div_combine_in_one_step():
+    m = _model(_group("g", "multi", ("a", "mul", 10), ("d", "div", 25), ("e", "div", 15)))
+    # 1000 × 1.1 / 1.4 = 785.714… → 785.71
+    assert _apply_groups(100000, (("g", ("a", "d", "e")),), m) == (78571, {"g": -214.29})
+
+@pytest.mark.parametrize("config_order, total, amounts", [
+    (("z", "a"), 120000, {"z": 100.0, "a": 100.0}),   # спершу +10 %, потім +100 грн
+    (("a", "z"), 121000, {"a": 100.0, "z": 110.0}),   # спершу +100 грн, потім +10 %
+])
+def test_groups_apply_in_config_order(config_order, total, amounts):
+    groups = {"z": _group("z", "single", ("x", "mul", 10)), "a": _group("a", "single", ("x", "add", 100))}
+    m = _model(*(groups[g] for g in config_order))
+    options = canonical_options({"z": "x", "a": "x", "unknown": "x"})
+    assert _apply_groups(100000, options, m) == (total, amounts)
+
+def test_unmatched_selection_adds_no_surcharge():
+    m = _model(_group("g", "single", ("x", "mul", 10)))
+    assert _apply_groups(100000, (("g", ("y",)),), m) == (100000, {})
+
+def test_quote_applies_groups_after_colour():
+    m = _model(_group("edge", "single", ("фаска", "add", 150)),
+               _group("mount", "multi", ("кронштейн", "mul", 5), ("знижка", "div", 5)))
+    plain = quote(800, 500, 150, "", m)
+    out = quote(800, 500, 150, "", m, canonical_options({"edge": "фаска", "mount": ["кронштейн", "знижка"]}))
+    # ×1.05 / 1.05 — рівно нуль, а не −0.25 % як у «div = мінус відсоток»
+    assert out.surcharge_options == {"edge": 150.0, "mount": 0.0}
+    assert out.price_total == plain.price_total + 150
+    assert plain.surcharge_options == {}
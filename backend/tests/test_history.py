@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""Write-behind журнал: черга HistoryWriter, пачка в одній транзакції, config_snapshot один раз."""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from backend.app.core import db as core_db
+from backend.app.models.base import Base
+from backend.app.models.history import QuoteRecord, StoredConfig
+from backend.app.models import rollup as _rollup_tables  # noqa: F401 — таблиці агрегатів у metadata
+from backend.app.services import history_store, rollups
+from backend.app.services.calc_engine import compile_model, quote
+from backend.app.services.config_loader import ConfigSnapshot, SettingsDTO
+from backend.app.services.history_log import HistoryWriter
+from backend.app.services.history_store import ConfigIds, compact_batch
+
+POSITIONS = {"сірий": 0, "чорний +20%": 20}
+
+def _model(version: int, price_high: int = 21101):
+    s = SettingsDTO(min_length=500, max_length=1000, min_width=500, min_height=150, extra_price=22.0,
+                    rounding_mode="ceil10", price_per_meter_high=price_high, price_per_meter_low=18257,
+                    positions=POSITIONS)
+    return compile_model(ConfigSnapshot(version=version, generation=0, stamp=None, settings=s, loaded_at=0.0))
+
+def _writer(**kw) -> HistoryWriter:
+    args = dict(enabled=True, maxsize=100, batch_size=50, flush_seconds=0.01, retry_max_seconds=0.01)
+    args.update(kw)
+    return HistoryWriter(**args)
+
+def _entry(m, L: int, position: str = "") -> dict:
+    inp = {"L": L, "W": 600, "H": 200, "position": position}
+    return {"created_at": datetime.now(timezone.utc), "input_json": inp,
+            "price_total": quote(L, 600, 200, position, m).price_total, "model": m}
+
+@pytest.fixture
+def Session(monkeypatch):
+    """In-memory SQLite зі схемою моделей; флешер бере сесії саме з неї."""
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    monkeypatch.setattr(core_db, "SessionLocal", factory)
+    monkeypatch.setattr(history_store, "CONFIG_IDS", ConfigIds())  # кеш id — на БД, не на тест-процес
+    yield factory
+    engine.dispose()
+
+def _count(session, model) -> int:
+    return session.execute(select(func.count()).select_from(model)).scalar_one()
+
+def _rollups(session) -> tuple:
+    options = sorted(rollups.read_options(session), key=lambda r: r["position"])
+    return rollups.read_daily(session), options, rollups.read_lengths(session)
+
+# ------------------------------ Черга ------------------------------ #
+
+def test_full_queue_drops_instead_of_blocking():
+    w = _writer(maxsize=3)
+    m = _model(1)
+    assert [w.submit({"L": 600}, 100, m) for _ in range(5)] == [True, True, True, False, False]
+    st = w.stats()
+    assert (st["enqueued"], st["dropped"], st["queued"], st["running"]) == (3, 2, 3, False)
+
+def test_disabled_writer_ignores_submits():
+    w = _writer(enabled=False)
+    assert w.submit({"L": 600}, 100, _model(1)) is False
+    assert w.stats()["enqueued"] == w.stats()["dropped"] == 0
+
+# ------------------------------ Флешер ------------------------------ #
+
+def test_flush_stores_config_once_and_rollups_match_rebuild(Session):
+    w = _writer()
+    m1, m2 = _model(1), _model(2, price_high=25000)
+    batches = [
+        [_entry(m1, L, pos) for L, pos in ((600, "сірий"), (750, "чорний +20%"), (990, ""))],
+        [_entry(m1, 1200, "чорний +20%"), _entry(m2, 800, "сірий"), _entry(m2, 800, "невідома")],
+    ]
+    for b in batches:
+        assert w._flush(b)
+
+    st = w.stats()
+    assert (st["written"], st["batches"], st["failed_rows"]) == (6, 2, 0)
+    with Session() as s:
+        assert _count(s, QuoteRecord) == 6
+        assert _count(s, StoredConfig) == 2  # дві різні моделі — два рядки, хоч m1 у двох пачках
+        ids = s.execute(select(QuoteRecord.config_id).order_by(QuoteRecord.id)).scalars().all()
+        assert ids[:4] == [ids[0]] * 4 and ids[4] == ids[5] != ids[0]
+        idx = s.execute(select(QuoteRecord.position_idx).order_by(QuoteRecord.id)).scalars().all()
+        assert idx == [0, 1, -1, 1, 0, -1]  # номер у sorted(position_bp); невідома — -1
+
+        incremental = _rollups(s)
+        assert rollups.rebuild(s) == 6
+        s.commit()
+        assert _rollups(s) == incremental
+    options = {r["position"]: r["quotes"] for r in incremental[1]}
+    assert options == {"": 2, "сірий": 2, "чорний +20%": 2}
+
+def test_failed_flush_leaves_no_snapshot_and_retries_cleanly(Session, monkeypatch):
+    w = _writer()
+    m = _model(7)
+
+    def boom(session, delta):
+        raise RuntimeError("rollups down")
+
+    monkeypatch.setattr(rollups, "apply_delta", boom)
+    assert not w._flush([_entry(m, 600), _entry(m, 700)])
+    assert w.stats()["failed_rows"] == 2
+    assert "rollups down" in w.stats()["last_error"]
+    with Session() as s:
+        assert _count(s, QuoteRecord) == _count(s, StoredConfig) == 0  # вся пачка відкотилась
+    assert history_store.CONFIG_IDS._ids == {}  # id з відкоченої транзакції не закешовано
+
+    monkeypatch.undo()
+    monkeypatch.setattr(core_db, "SessionLocal", Session)
+    monkeypatch.setattr(history_store, "CONFIG_IDS", ConfigIds())
+    assert w._flush([_entry(m, 600)])
+    with Session() as s:
+        assert (_count(s, QuoteRecord), _count(s, StoredConfig)) == (1, 1)
+
+# ----------------------------- ConfigIds ----------------------------- #
+
+def test_config_ids_are_content_addressed_across_workers(Session):
+    a, b = ConfigIds(), ConfigIds()          # два воркери
+    m, same = _model(1), _model(99)          # інша версія снапшота, той самий зміст
+    other = _model(3, price_high=30000)
+    got = []
+    for ids, model in ((a, m), (b, m), (b, same), (a, other)):
+        with Session() as s:
+            got.append(ids.resolve(s, model)[0])
+            s.commit()
+            ids.committed(s)
+    assert got[0] == got[1] == got[2] != got[3]
+    with Session() as s:
+        assert _count(s, StoredConfig) == 2
+
+def test_config_id_is_cached_only_after_commit(Session):
+    ids = ConfigIds()
+    m = _model(5)
+    with Session() as s:
+        rows, delta = compact_batch(s, [_entry(m, 600), _entry(m, 800)], ids)
+        assert rows[0]["config_id"] == rows[1]["config_id"]
+        assert delta
+        s.rollback()
+        ids.discard(s)
+    assert ids._ids == {}
+    with Session() as s:
+        assert _count(s, StoredConfig) == 0
+        cid, index = ids.resolve(s, m)
+        s.commit()
+        ids.committed(s)
+    assert ids._ids == {(m.version, m.price_list): (cid, {"сірий": 0, "чорний +20%": 1})}
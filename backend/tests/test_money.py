@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""Цілочисельна арифметика money.py: копійки, bp, половини і режими округлення."""
+
+from __future__ import annotations
+
+from decimal import InvalidOperation
+from fractions import Fraction
+
+import pytest
+
+from backend.app.services.money import (
+    DEFAULT_ROUNDING,
+    ROUNDING,
+    ROUNDING_MODES,
+    check_rounding,
+    div_half_even,
+    to_bp,
+    to_kop,
+)
+
+# ---------------------------- div_half_even ---------------------------- #
+
+@pytest.mark.parametrize("n, d, expected", [
+    (0, 5, 0),
+    (1, 3, 0),
+    (2, 3, 1),
+    (-2, 3, -1),
+    (7, 2, 4),      # 3.5 → 4
+    (5, 2, 2),      # 2.5 → 2
+    (-5, 2, -2),    # -2.5 → -2
+    (-7, 2, -4),    # -3.5 → -4
+    (15, 10, 2),
+    (25, 10, 2),
+    (-15, 10, -2),
+    (-25, 10, -2),
+    (26, 10, 3),
+    (-26, 10, -3),
+    (123456789, 10000, 12346),
+])
+def test_div_half_even(n, d, expected):
+    assert div_half_even(n, d) == expected
+
+def test_div_half_even_matches_exact_rounding():
+    # round(Fraction) — точне ділення з половинами до парного
+    for d in range(1, 14):
+        for n in range(-300, 301):
+            assert div_half_even(n, d) == round(Fraction(n, d)), (n, d)
+
+# ---------------------------- to_kop / to_bp ---------------------------- #
+
+@pytest.mark.parametrize("uah, kop", [
+    (0, 0),
+    ("0", 0),
+    (100, 10000),
+    (22.1, 2210),       # не 2209: через десятковий запис
+    ("22.1", 2210),
+    (1.005, 101),       # половина — від нуля
+    (0.005, 1),
+    (-0.005, -1),
+    (-1.5, -150),
+    ("12.344", 1234),
+    ("12.345", 1235),
+    (" 7.5 ", 750),
+])
+def test_to_kop(uah, kop):
+    assert to_kop(uah) == kop
+
+@pytest.mark.parametrize("percent, bp", [
+    (0, 0),
+    (25, 2500),
+    ("5", 500),
+    (12.5, 1250),
+    ("-20", -2000),
+    (33.333, 3333),
+    (0.015, 2),
+    (-0.015, -2),
+    (0.014, 1),
+])
+def test_to_bp(percent, bp):
+    assert to_bp(percent) == bp
+
+def test_to_kop_rejects_garbage():
+    with pytest.raises(InvalidOperation):
+        to_kop("дванадцять")
+
+# ------------------------- Округлення підсумку ------------------------- #
+
+@pytest.mark.parametrize("mode, kop, uah", [
+    # ceil* — вгору до кроку; від'ємні — теж вгору (до нуля)
+    ("ceil10", 0, 0),
+    ("ceil10", 1, 10),
+    ("ceil10", 99999, 1000),
+    ("ceil10", 100000, 1000),
+    ("ceil10", 100001, 1010),
+    ("ceil10", -1, 0),
+    ("ceil10", -999, 0),
+    ("ceil10", -1000, -10),
+    ("ceil10", -1001, -10),
+    ("ceil100", 1, 100),
+    ("ceil100", 10000, 100),
+    ("ceil100", 10001, 200),
+    ("ceil100", -10001, -100),
+    # nearest* і round — до найближчого, половини від нуля
+    ("nearest10", 1499, 10),
+    ("nearest10", 1500, 20),
+    ("nearest10", 2499, 20),
+    ("nearest10", 2500, 30),
+    ("nearest10", -1499, -10),
+    ("nearest10", -1500, -20),
+    ("nearest100", 4999, 0),
+    ("nearest100", 5000, 100),
+    ("nearest100", 14999, 100),
+    ("nearest100", 15000, 200),
+    ("nearest100", -4999, 0),
+    ("nearest100", -5000, -100),
+    ("round", 0, 0),
+    ("round", 49, 0),
+    ("round", 99, 1),
+    ("round", 149, 1),
+    ("round", 150, 2),
+    ("round", 250, 3),      # не до парного
+    ("round", -149, -1),
+    ("round", -150, -2),
+    # floor — вниз; від'ємні — від нуля
+    ("floor", 99, 0),
+    ("floor", 100, 1),
+    ("floor", 199, 1),
+    ("floor", -1, -1),
+    ("floor", -100, -1),
+    ("floor", -101, -2),
+])
+def test_rounding_modes(mode, kop, uah):
+    assert ROUNDING[mode](kop) == uah
+
+def test_rounding_registry():
+    assert set(ROUNDING_MODES) == {"ceil10", "ceil100", "nearest10", "nearest100", "round", "floor"}
+    assert DEFAULT_ROUNDING in ROUNDING
+
+@pytest.mark.parametrize("mode, step", [("ceil10", 10), ("ceil100", 100), ("nearest10", 10),
+                                        ("nearest100", 100), ("round", 1), ("floor", 1)])
+def test_rounding_lands_on_step_and_whole_amounts_stay(mode, step):
+    for kop in range(-30000, 30001, 37):
+        assert ROUNDING[mode](kop) % step == 0, kop
+    for uah in range(-1000, 1001, step):
+        assert ROUNDING[mode](uah * 100) == uah
+
+@pytest.mark.parametrize("raw, mode", [("ceil10", "ceil10"), (" Round ", "round"), ("FLOOR", "floor")])
+def test_check_rounding_normalizes(raw, mode):
+    assert check_rounding(raw) == mode
+
+@pytest.mark.parametrize("raw", [None, "", "ceil", "ceil1000", "half_even"])
+def test_check_rounding_rejects_unknown(raw):
+    with pytest.raises(ValueError, match="expected one of"):
+        check_rounding(raw)
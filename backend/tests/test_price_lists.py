@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""PriceIndex.at: чинна версія прайсу на момент — пошук bisect'ом."""
+
+from __future__ import annotations
+
+import time
+
+import pytest
+
+from backend.app.services.price_lists import EMPTY_PRICES, PriceIndex, PriceList, as_timestamp
+
+def _index(*starts: float) -> PriceIndex:
+    lists = tuple(PriceList(id=i + 1, effective_at=t, price_high=1000 * (i + 1), price_low=500)
+                  for i, t in enumerate(starts))
+    return PriceIndex(starts=tuple(starts), lists=lists)
+
+@pytest.mark.parametrize("ts, expected_id", [
+    (0, None),          # до першої версії — діє [base]
+    (99.999, None),
+    (100, 1),           # effective_at включно
+    (150, 1),
+    (199.999, 1),
+    (200, 2),
+    (299, 2),
+    (300, 3),
+    (10 ** 10, 3),
+])
+def test_at_picks_latest_started_version(ts, expected_id):
+    pl = _index(100, 200, 300).at(ts)
+    assert (pl.id if pl else None) == expected_id
+
+def test_at_without_ts_uses_now():
+    now = time.time()
+    idx = _index(now - 3600, now + 3600)  # друга — заплановане подорожчання
+    assert idx.at().id == 1
+    assert idx.at(now + 7200).id == 2
+
+def test_empty_index_means_base_prices():
+    assert not EMPTY_PRICES
+    assert EMPTY_PRICES.at() is None
+    assert EMPTY_PRICES.at(10 ** 10) is None
+    assert _index(100)
+
+@pytest.mark.parametrize("value, ts", [
+    (None, None),
+    ("", None),
+    (1700000000, 1700000000.0),
+    ("2024-01-01T00:00:00Z", 1704067200.0),
+    ("2024-01-01T00:00:00", 1704067200.0),        # без зони — UTC
+    ("2024-01-01T02:00:00+02:00", 1704067200.0),
+])
+def test_as_timestamp(value, ts):
+    assert as_timestamp(value) == ts
+
+def test_as_timestamp_rejects_garbage():
+    with pytest.raises(ValueError):
+        as_timestamp("вчора")
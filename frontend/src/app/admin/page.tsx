@@ -6,6 +6,8 @@ import { api } from '@/lib/api';
 type BaseSettings = { rounding: string; price_high: number; price_low: number };
 type Mode = 'single'|'multi';
 type Op = 'mul'|'add'|'sub'|'div';
+// = backend/app/services/money.py::ROUNDING_MODES
+const ROUNDING_MODES = ['ceil10', 'ceil100', 'nearest10', 'nearest100', 'round', 'floor'];
 type GroupItem = { id: string; label: string; op: Op; value: number };
 type Group = { id: string; name: string; mode: Mode; items: GroupItem[] };
 
@@ -75,9 +77,12 @@ export default function AdminPage() {
           <div className="grid sm:grid-cols-3 gap-3">
             <label>
               <div className="text-sm text-gray-600 mb-1">Rounding</div>
-              <input className="border rounded px-3 py-2 w-full"
+              <select className="border rounded px-3 py-2 w-full"
                 value={base.rounding}
-                onChange={e=>setBase({...base, rounding: e.target.value})}/>
+                onChange={e=>setBase({...base, rounding: e.target.value})}>
+                {(ROUNDING_MODES.includes(base.rounding) ? ROUNDING_MODES : [base.rounding, ...ROUNDING_MODES])
+                  .map(m => <option key={m} value={m}>{m}</option>)}
+              </select>
             </label>
             <label>
               <div className="text-sm text-gray-600 mb-1">Ціна/м (High)</div>
@@ -1,7 +1,9 @@
 'use client';
 
 import { useEffect, useRef, useState } from 'react';
-import { api } from '@/lib/api';
+import { api, BASE } from '@/lib/api';
+import { LiveQuote } from '@/lib/liveQuote';
+import { loadLocalPricing, quoteLocal, type PricingBundle } from '@/lib/pricing';
 
 /* ================== Types ================== */
 type CalcConfig = {
@@ -37,6 +39,10 @@ const BTN = `${ROW_H} aspect-square p-0 grid place-items-center border rounded t
 const ICON = 'w-4 h-4 object-contain';
 
 const DEFAULTS = { L: 500, W: 500, H: 150 };
+/** сервер сам зливає пачки по WebSocket — пауза лише щоб не слати кожен символ */
+const DEBOUNCE_MS = 120;
+/** без сокета (фолбек на POST) — як раніше, довша пауза */
+const DEBOUNCE_HTTP_MS = 600;
 const BASE_KEY = 'базовий сірий колір';
 
 /* ================== Helpers ================== */
@@ -61,6 +67,8 @@ const parseFirstNumber = (s: string) => {
 export default function CalcPage() {
   // config
   const [cfg, setCfg] = useState<CalcConfig | null>(null);
+  // перевірений еталонними векторами bundle — тоді рахуємо без мережі
+  const [local, setLocal] = useState<PricingBundle | null>(null);
 
   // inputs (length як РЯДОК — дозволяє порожній стан)
   const [lengthStr, setLengthStr] = useState<string>(''); // пусто за замовчуванням
@@ -80,49 +88,91 @@ export default function CalcPage() {
   const ok = useFlash(900);
 
   /* ---------- load config + autofocus ---------- */
+  const loadConfig = async (keepPosition: boolean) => {
+    setLocal(null); // поки новий bundle не перевірено — рахує сервер
+    loadLocalPricing().then(setLocal);
+    try {
+      const c = await api.get<CalcConfig>('/api/calc/config');
+      setCfg(c);
+      const keys = Object.keys(c.positions ?? {});
+      const base = keys.find((k) => k === BASE_KEY) || keys[0] || '';
+      setPosition((cur) => (keepPosition && keys.includes(cur) ? cur : base));
+    } catch (e: any) {
+      setErr(String(e?.message || e));
+    }
+  };
+
   useEffect(() => {
-    (async () => {
-      try {
-        const c = await api.get<CalcConfig>('/api/calc/config');
-        setCfg(c);
-        const keys = Object.keys(c.positions ?? {});
-        const base = keys.find((k) => k === BASE_KEY) || keys[0] || '';
-        setPosition(base);
-        setLengthStr(''); // довжина лишається пустою
-      } catch (e: any) {
-        setErr(String(e?.message || e));
-      }
-    })();
+    loadConfig(false);
+    setLengthStr(''); // довжина лишається пустою
 
     // курсор одразу в полі L
     setTimeout(() => lengthRef.current?.focus(), 0);
   }, []);
 
+  /* ---------- зміни цін в адмінці: SSE /api/calc/config/events ---------- */
+  useEffect(() => {
+    if (typeof EventSource === 'undefined') return;
+    let etag: string | null = null;
+    const es = new EventSource(`${BASE}/api/calc/config/events`);
+    es.addEventListener('config', (e) => {
+      const next = JSON.parse((e as MessageEvent).data).etag as string;
+      // перша подія — стан на момент підключення; перезапит лише коли ETag змінився
+      if (etag !== null && next !== etag) loadConfig(true);
+      etag = next;
+    });
+    return () => es.close();
+  }, []);
+
+  /* ---------- живий розрахунок: WebSocket /ws/calc ---------- */
+  const live = useRef<LiveQuote<CalcOutput> | null>(null);
+  useEffect(() => {
+    const lq = new LiveQuote<CalcOutput>((r) => {
+      if (r.error) {
+        setErr(r.error);
+        setOut(null);
+      } else if (r.result) {
+        setErr('');
+        setOut(r.result);
+      }
+    });
+    live.current = lq;
+    return () => lq.close();
+  }, []);
+
   /* ---------- auto compute (debounce) ---------- */
   useEffect(() => {
     setErr('');
+    const L = Number(lengthStr);
+    if (local && lengthStr && !isNaN(L) && L > 0) {
+      setOut(quoteLocal(local, { L, W: width, H: height, position }));
+      return;
+    }
+    const viaWs = live.current?.ready ?? false;
     const handle = setTimeout(async () => {
-      const L = Number(lengthStr);
       if (!lengthStr || isNaN(L) || L <= 0) {
         setOut(null);
         return;
       }
+      const body = {
+        L: L,            // було length_mm
+        W: width,        // було width_mm
+        H: height,       // було height_mm
+        position,        // назва вибраної опції
+      };
+      // відповідь прийде в колбек LiveQuote; якщо сокета немає — звичайний POST
+      if (live.current?.send(body)) return;
       try {
-        const res = await api.post<CalcOutput>('/api/calc/compute', {
-          L: L,            // було length_mm
-          W: width,        // було width_mm
-          H: height,       // було height_mm
-          position,        // назва вибраної опції
-        });
+        const res = await api.post<CalcOutput>('/api/calc/compute', body);
         setOut(res);
       } catch (e: any) {
         setErr(String(e?.message || e));
         setOut(null);
       }
-    }, 1000); // ↑ зробив більшу паузу перед підрахунком
+    }, viaWs ? DEBOUNCE_MS : DEBOUNCE_HTTP_MS);
 
     return () => clearTimeout(handle);
-  }, [lengthStr, width, height, position]);
+  }, [lengthStr, width, height, position, cfg, local]); // cfg/local — перерахунок після зміни цін
 
   /* ---------- плавний перехід між повідомленнями ---------- */
   useEffect(() => {
@@ -1,5 +1,5 @@
 // frontend/src/lib/api.ts
-const BASE =
+export const BASE =
   process.env.NEXT_PUBLIC_API_BASE ||
   "https://web-dashboard-production.up.railway.app"; // ← ВСТАВ свій бекенд URL БЕЗ кінцевого '/'
 
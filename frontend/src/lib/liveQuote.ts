@@ -0,0 +1,68 @@
+// frontend/src/lib/liveQuote.ts
+// Живий розрахунок через WebSocket /ws/calc (backend/app/api/ws_calc.py).
+// Сервер зливає пачки оновлень і відповідає лише на останній стан; застарілі
+// відповіді (seq менший за вже показаний) тут відкидаємо. Поки сокет не
+// відкритий — send() повертає false, і сторінка рахує звичайним POST.
+import { BASE } from './api';
+
+export type LiveReply<T> = { seq: number; version?: number; result?: T; error?: string };
+
+const WS_URL = `${BASE.replace(/^http/, 'ws')}/ws/calc`;
+const RETRY_MAX_MS = 10000;
+
+export class LiveQuote<T> {
+  private ws: WebSocket | null = null;
+  private seq = 0;
+  private shown = 0;
+  private retryMs = 500;
+  private timer: ReturnType<typeof setTimeout> | null = null;
+  private closed = false;
+
+  constructor(private onReply: (r: LiveReply<T>) => void) {
+    this.connect();
+  }
+
+  get ready() {
+    return this.ws?.readyState === WebSocket.OPEN;
+  }
+
+  /** Надіслати повний стан (або патч); false — сокета немає, рахуйте через HTTP. */
+  send(state: Record<string, unknown>): boolean {
+    if (!this.ready) return false;
+    this.ws!.send(JSON.stringify({ seq: ++this.seq, ...state }));
+    return true;
+  }
+
+  close() {
+    this.closed = true;
+    if (this.timer) clearTimeout(this.timer);
+    this.ws?.close();
+  }
+
+  private connect() {
+    if (this.closed || typeof WebSocket === 'undefined') return;
+    const ws = new WebSocket(WS_URL);
+    this.ws = ws;
+    ws.onopen = () => {
+      this.retryMs = 500;
+    };
+    ws.onmessage = (e) => {
+      let r: LiveReply<T>;
+      try {
+        r = JSON.parse(e.data);
+      } catch {
+        return;
+      }
+      if (typeof r.seq !== 'number' || r.seq < this.shown) return;
+      this.shown = r.seq;
+      this.onReply(r);
+    };
+    ws.onclose = () => {
+      this.ws = null;
+      if (this.closed) return;
+      // перепідключення з експоненційною паузою; тим часом працює HTTP-фолбек
+      this.timer = setTimeout(() => this.connect(), this.retryMs);
+      this.retryMs = Math.min(this.retryMs * 2, RETRY_MAX_MS);
+    };
+  }
+}
@@ -0,0 +1,257 @@
+// frontend/src/lib/pricing.ts
+// Локальний розрахунок ціни за bundle з /api/calc/bundle — копія математики
+// backend/app/services/calc_engine.py::quote(): цілі копійки і базисні пункти,
+// ті самі округлення (BigInt, щоб добутки не виходили за 2^53). Перед
+// використанням bundle проганяємо еталонні вектори (/api/calc/bundle/vectors,
+// verifyVectors); якщо хоч один не збігся або format/engine невідомі —
+// рахуємо на сервері, як раніше.
+import { api } from './api';
+
+export const SUPPORTED_FORMAT = 3;
+export const SUPPORTED_ENGINE = 4; // = calc_engine.ENGINE_REVISION
+
+// [назва, bp, коп., dbp]: amount = running·(bp − dbp)/(10000 + dbp) + коп. (dbp — op=div)
+export type BundleGroup = { id: string; multi: boolean; items: [string, number, number, number][] };
+
+export type PricingBundle = {
+  format: number;
+  engine: number;
+  version: string;
+  length: { min: number; max: number };
+  price_per_meter: { high: number; low: number };
+  min_width: number;
+  min_height: number;
+  extra_kop: number;
+  rounding: string;
+  position_bp: Record<string, number>;
+  groups: BundleGroup[];
+};
+
+export type QuoteInput = {
+  L?: number;
+  W?: number;
+  H?: number;
+  position?: string;
+  options?: Record<string, string | string[] | null>;
+};
+
+export type Quote = {
+  price_per_meter: number;
+  price_base: number;
+  surcharge_width: number;
+  surcharge_height: number;
+  surcharge_color_percent: number;
+  surcharge_color_amount: number;
+  price_total: number;
+  surcharge_options: Record<string, number>;
+};
+
+export type GoldenVectors = {
+  bundle: string;
+  engine: number;
+  count: number;
+  vectors: { in: QuoteInput; out: Quote }[];
+};
+
+export function isSupported(b: PricingBundle) {
+  return b.format === SUPPORTED_FORMAT && b.engine === SUPPORTED_ENGINE && b.rounding in ROUNDING;
+}
+
+/* ================== Цілочисельне округлення (= money.py) ================== */
+
+const B0 = BigInt(0);
+const B1 = BigInt(1);
+const B2 = BigInt(2);
+
+/** floor(n / d) для d > 0 (BigInt ділить із відкиданням у бік нуля) */
+function floorDiv(n: bigint, d: bigint): bigint {
+  const q = n / d;
+  return n % d !== B0 && n < B0 ? q - B1 : q;
+}
+
+/** n / d до цілого, половини до парного (money.div_half_even); d > 0 */
+export function divHalfEven(n: bigint, d: bigint): bigint {
+  let q = floorDiv(n, d);
+  const r = (n - q * d) * B2;
+  if (r > d || (r === d && (q & B1) === B1)) q += B1;
+  return q;
+}
+
+const ceilTo = (step: number) => {
+  const k = BigInt(step * 100);
+  return (kop: bigint) => Number(-floorDiv(-kop, k)) * step;
+};
+
+/** половини від нуля */
+const nearestTo = (step: number) => {
+  const k = BigInt(step * 100);
+  const half = k / B2;
+  return (kop: bigint) =>
+    kop >= B0 ? Number(floorDiv(kop + half, k)) * step : -Number(floorDiv(half - kop, k)) * step;
+};
+
+/** копійки → цілі гривні; ключі = money.ROUNDING */
+const ROUNDING: Record<string, (kop: bigint) => number> = {
+  ceil10: ceilTo(10),
+  ceil100: ceilTo(100),
+  nearest10: nearestTo(10),
+  nearest100: nearestTo(100),
+  round: nearestTo(1),
+  floor: (kop) => Number(floorDiv(kop, BigInt(100))),
+};
+
+const uah = (kop: bigint) => Number(kop) / 100;
+
+/* ================== Опції ================== */
+
+function cmpStr(a: string, b: string) {
+  return a < b ? -1 : a > b ? 1 : 0;
+}
+
+/** normalize_options(): [[група, [пункти…]], …] — відсортовано, як у Python */
+function normalizeOptions(raw: QuoteInput['options']): [string, string[]][] {
+  if (!raw) return [];
+  const out: [string, string[]][] = [];
+  for (const [gid, sel] of Object.entries(raw)) {
+    if (sel === null || sel === undefined) continue;
+    const names = [...new Set((typeof sel === 'string' ? [sel] : sel).map((n) => String(n).trim()))]
+      .filter((n) => n !== '')
+      .sort(cmpStr);
+    if (names.length) out.push([gid.trim(), names]);
+  }
+  out.sort((a, b) => {
+    const c = cmpStr(a[0], b[0]);
+    if (c) return c;
+    for (let i = 0; i < Math.min(a[1].length, b[1].length); i++) {
+      const d = cmpStr(a[1][i], b[1][i]);
+      if (d) return d;
+    }
+    return a[1].length - b[1].length;
+  });
+  return out;
+}
+
+/** CompiledGroup.select(): (bp, коп., dbp) або null */
+function select(g: BundleGroup, names: string[]): [number, number, number] | null {
+  const index = new Map<string, number>();
+  g.items.forEach(([name], i) => index.set(name, i));
+  if (!g.multi) {
+    for (const nm of names) {
+      const i = index.get(nm);
+      if (i !== undefined) return [g.items[i][1], g.items[i][2], g.items[i][3]];
+    }
+    return null;
+  }
+  const hits = [...new Set(names.filter((n) => index.has(n)).map((n) => index.get(n)!))];
+  if (!hits.length) return null;
+  let bp = 0;
+  let kop = 0;
+  let dbp = 0;
+  for (const i of hits) {
+    bp += g.items[i][1];
+    kop += g.items[i][2];
+    dbp += g.items[i][3];
+  }
+  return [bp, kop, dbp];
+}
+
+/* ================== Розрахунок ================== */
+
+const toInt = (x: unknown) => {
+  const n = Math.trunc(Number(x));
+  return Number.isFinite(n) ? n : 0;
+};
+
+export function quoteLocal(b: PricingBundle, input: QuoteInput): Quote {
+  const L = BigInt(toInt(input.L));
+  const W = toInt(input.W);
+  const H = toInt(input.H);
+  const mn = BigInt(b.length.min);
+  const mx = BigInt(b.length.max);
+  const hi = BigInt(b.price_per_meter.high);
+  const lo = BigInt(b.price_per_meter.low);
+  const den = mx > mn ? mx - mn : B1; // як span_den: знаменник завжди > 0
+
+  // ціна за метр = num / den (точний дріб, як _ppm_num)
+  const num = L < mn ? hi * den : L <= mx ? hi * den - (L - mn) * (hi - lo) : lo * den;
+  const priceBase = divHalfEven(num * L, den * BigInt(1000));
+
+  const extra = BigInt(b.extra_kop);
+  const k1000 = BigInt(1000);
+  const sw = W > b.min_width ? divHalfEven(extra * BigInt(W - b.min_width) * L, k1000) : B0;
+  const sh = H > b.min_height ? divHalfEven(extra * BigInt(H - b.min_height) * L, k1000) : B0;
+
+  const subtotal = priceBase * BigInt(100) + sw + sh;
+  const pos = String(input.position ?? '').trim();
+  const bp = Object.prototype.hasOwnProperty.call(b.position_bp, pos) ? b.position_bp[pos] : 0;
+  const k10000 = BigInt(10000);
+  const color = bp ? divHalfEven(subtotal * BigInt(bp), k10000) : B0;
+  let running = subtotal + color;
+
+  const options: Record<string, number> = {};
+  const order = new Map(b.groups.map((g, i) => [g.id, i]));
+  const picked = normalizeOptions(input.options)
+    .filter(([gid]) => order.has(gid))
+    .sort((x, y) => order.get(x[0])! - order.get(y[0])!); // стабільне, як list.sort
+  for (const [gid, names] of picked) {
+    const f = select(b.groups[order.get(gid)!], names);
+    if (!f) continue;
+    const amount = divHalfEven(running * BigInt(f[0] - f[2]), k10000 + BigInt(f[2])) + BigInt(f[1]);
+    running += amount;
+    options[gid] = uah(amount);
+  }
+
+  return {
+    price_per_meter: uah(divHalfEven(num * BigInt(100), den)),
+    price_base: Number(priceBase),
+    surcharge_width: uah(sw),
+    surcharge_height: uah(sh),
+    surcharge_color_percent: bp / 100,
+    surcharge_color_amount: uah(color),
+    price_total: ROUNDING[b.rounding](running),
+    surcharge_options: options,
+  };
+}
+
+/** Номери векторів, де локальний розрахунок не збігся з сервером (порожньо — можна рахувати локально). */
+export function verifyVectors(b: PricingBundle, doc: GoldenVectors): number[] {
+  if (doc.bundle !== b.version || doc.engine !== b.engine) return [-1];
+  const bad: number[] = [];
+  doc.vectors.forEach((v, i) => {
+    const got = quoteLocal(b, v.in);
+    const want = v.out;
+    const same =
+      (Object.keys(want) as (keyof Quote)[]).every(
+        (k) => k === 'surcharge_options' || got[k] === want[k],
+      ) &&
+      Object.keys(want.surcharge_options).length === Object.keys(got.surcharge_options).length &&
+      Object.entries(want.surcharge_options).every(([k, v2]) => got.surcharge_options[k] === v2);
+    if (!same) bad.push(i);
+  });
+  return bad;
+}
+
+const VERIFIED_KEY = 'pricing:verified';
+
+/**
+ * Bundle, якому можна довіряти локально, або null (тоді — сервер).
+ * Вектори качаємо лише для ще не перевіреної версії bundle.
+ */
+export async function loadLocalPricing(): Promise<PricingBundle | null> {
+  try {
+    const b = await api.get<PricingBundle>('/api/calc/bundle');
+    if (!isSupported(b)) return null;
+    const stamp = `${SUPPORTED_ENGINE}:${b.version}`;
+    if (localStorage.getItem(VERIFIED_KEY) === stamp) return b;
+    const doc = await api.get<GoldenVectors>('/api/calc/bundle/vectors');
+    const bad = verifyVectors(b, doc);
+    if (bad.length) {
+      console.warn(`pricing bundle ${b.version}: ${bad.length} vectors mismatched, using server`);
+      return null;
+    }
+    localStorage.setItem(VERIFIED_KEY, stamp);
+    return b;
+  } catch {
+    return null;
+  }
+}